@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+ADL Incident Archive
+Append-only, gzip-compressed NDJSON archive of collected ADL incidents,
+one incident per line with the page and run it came from
+"""
+
+import json
+import gzip
+import time
+import zlib
+import threading
+from pathlib import Path
+from datetime import datetime
+import logging
+from typing import Callable, Dict, Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_NAME = "adl_incidents.ndjson.gz"
+
+# Compressed bytes read at a time; incident text compresses well, so keep it small
+READ_SIZE = 1 << 16
+
+_append_lock = threading.Lock()
+
+def append_page(path: Union[str, Path], run: str, page: int, incidents: List[Dict]):
+    """Append one page of incidents to the archive
+
+    Each call adds a complete gzip member in a single write, so a reader
+    following the file never sees half a page for long, and an
+    interrupted run leaves every earlier page readable.
+    """
+    collected_at = datetime.now().isoformat()
+    lines = ''.join(
+        json.dumps({'run': run, 'page': page, 'collected_at': collected_at, 'incident': incident},
+                   ensure_ascii=False) + '\n'
+        for incident in incidents
+    )
+    member = gzip.compress(lines.encode('utf-8'))
+    with _append_lock:
+        with open(path, 'ab') as f:
+            f.write(member)
+            f.flush()
+
+def read_archive(path: Union[str, Path], follow: bool = False, finished: Callable[[], bool] = None,
+                 poll_seconds: float = 1.0, idle_timeout: float = 300.0) -> Iterator[Dict]:
+    """Stream archive records (``run``, ``page``, ``collected_at``, ``incident``)
+
+    Only one line is decoded at a time.  With ``follow`` the reader keeps
+    waiting for pages the collector is still appending until ``finished()``
+    returns True or nothing new arrives for ``idle_timeout`` seconds.
+    """
+    path = Path(path)
+    if not follow and not path.exists():
+        return
+
+    while follow and not path.exists():
+        if finished is not None and finished():
+            return
+        time.sleep(poll_seconds)
+
+    decompressor = zlib.decompressobj(wbits=31)
+    pending = b''
+    in_member = False
+    idle_since = time.monotonic()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                # Check finished() before the last read so a page appended in between is not lost
+                done = not follow or (finished is not None and finished())
+                if follow and not done and time.monotonic() - idle_since > idle_timeout:
+                    logger.warning(f"No new pages in {path.name} for {idle_timeout:.0f}s, stopping")
+                    done = True
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    if done:
+                        break
+                    time.sleep(poll_seconds)
+                    continue
+            idle_since = time.monotonic()
+
+            data = chunk
+            while data:
+                pending += decompressor.decompress(data)
+                in_member = not decompressor.eof
+                if in_member:
+                    break
+                # A member ended; the next one starts in its unused data
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=31)
+
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+
+    if pending.strip() or in_member:
+        logger.warning(f"{path.name} ends in an incomplete page; its unfinished part was skipped")
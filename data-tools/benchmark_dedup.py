@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Deduplication Benchmark
+Generates synthetic NYPD/LAPD/ADL/FBI incidents with injected duplicates and
+measures how MultiSourceIntegrator deduplication scales
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import sys
+import time
+import argparse
+import platform
+import resource
+import tempfile
+from datetime import datetime
+from pathlib import Path
+import logging
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+
+from bias_classifier import BiasClassifier
+from multi_source_integrator import MultiSourceIntegrator
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Share of generated incidents per source
+SOURCE_MIX = {'NYPD': 0.35, 'LAPD': 0.15, 'ADL': 0.40, 'FBI': 0.10}
+
+# (county, borough, lat, lon) for NYPD precincts
+NYPD_BOROUGHS = [
+    ('KINGS', 'Brooklyn', 40.6782, -73.9442),
+    ('NEW YORK', 'Manhattan', 40.7831, -73.9712),
+    ('QUEENS', 'Queens', 40.7282, -73.7949),
+    ('BRONX', 'Bronx', 40.8448, -73.8648),
+    ('RICHMOND', 'Staten Island', 40.5795, -74.1502),
+]
+
+NYPD_BIASES = ['ANTI-JEWISH', 'ANTI-ASIAN', 'ANTI-BLACK', 'ANTI-MALE HOMOSEXUAL (GAY)', 'ANTI-MUSLIM',
+               'ANTI-WHITE', 'ANTI-TRANSGENDER', 'ANTI-HISPANIC']
+NYPD_OFFENSES = ['MISCELLANEOUS PENAL LAW', 'CRIMINAL MISCHIEF & RELATED OF', 'ASSAULT 3 & RELATED OFFENSES',
+                 'FELONY ASSAULT', 'HARRASSMENT 2']
+
+LAPD_BIASES = ['Anti-Jewish', 'Anti-Black or African American', 'Anti-Hispanic or Latino', 'Anti-Gay (Male)',
+               'Anti-Asian', 'Anti-Islamic (Muslim)']
+LAPD_OFFENSES = ['VANDALISM - FELONY', 'BATTERY - SIMPLE ASSAULT', 'ASSAULT WITH DEADLY WEAPON',
+                 'CRIMINAL THREATS - NO WEAPON DISPLAYED']
+
+ADL_CATEGORIES = ['Harassment', 'Vandalism', 'Assault', 'White Supremacist Propaganda']
+ADL_BIASES = ['ANTISEMITISM', 'ANTI-JEWISH', 'HOLOCAUST DENIAL']
+
+# (state, city, county, lat, lon) anchors for ADL records; each record gets
+# its own town and county names near one of them
+ADL_PLACES = [
+    ('NY', 'New York', 'KINGS', 40.6782, -73.9442),
+    ('NY', 'New York', 'NEW YORK', 40.7831, -73.9712),
+    ('CA', 'Los Angeles', 'Los Angeles County', 34.0522, -118.2437),
+    ('NJ', 'Newark', 'Essex County', 40.7357, -74.1724),
+    ('FL', 'Miami', 'Miami-Dade County', 25.7617, -80.1918),
+    ('IL', 'Chicago', 'Cook County', 41.8781, -87.6298),
+    ('MA', 'Boston', 'Suffolk County', 42.3601, -71.0589),
+    ('TX', 'Houston', 'Harris County', 29.7604, -95.3698),
+    ('PA', 'Philadelphia', 'Philadelphia County', 39.9526, -75.1652),
+    ('WA', 'Seattle', 'King County', 47.6062, -122.3321),
+]
+
+# Syllables for synthetic town and county names
+PLACE_SYLLABLES = ['ab', 'bel', 'cor', 'dun', 'el', 'fair', 'gal', 'hol', 'ing', 'jor', 'kel', 'lan', 'mor',
+                   'nor', 'ol', 'pem', 'quin', 'ros', 'sel', 'tor', 'ul', 'ver', 'wes', 'yar', 'zan', 'brook',
+                   'field', 'ford', 'ham', 'ton', 'ville', 'wood', 'dale', 'port', 'mont', 'burg']
+
+# States with FBI monthly totals
+FBI_STATES = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA',
+              'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM',
+              'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA',
+              'WV', 'WI', 'WY']
+
+DESCRIPTION_WORDS = ['swastika', 'graffiti', 'synagogue', 'school', 'found', 'painted', 'on', 'a', 'the', 'wall',
+                     'flyers', 'distributed', 'outside', 'jewish', 'student', 'harassed', 'near', 'campus',
+                     'antisemitic', 'slurs', 'shouted', 'at', 'man', 'wearing', 'kippah', 'home', 'car',
+                     'vandalized', 'with', 'messages', 'written', 'park', 'bench', 'threatening', 'voicemail']
+
+DUPLICATE_KINDS = ['reload', 'revision', 'cross_report']
+
+def random_dates(rng: np.random.RandomState, n: int, start: str, end: str) -> pd.DatetimeIndex:
+    """Uniform random dates between start and end"""
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    offsets = rng.randint(0, (end_ts - start_ts).days + 1, size=n)
+    return start_ts + pd.to_timedelta(offsets, unit='D')
+
+def random_descriptions(rng: np.random.RandomState, n: int) -> List[str]:
+    """Short ADL-style incident descriptions"""
+    lengths = rng.randint(6, 16, size=n)
+    words = rng.randint(0, len(DESCRIPTION_WORDS), size=int(lengths.sum()))
+    out, start = [], 0
+    for length in lengths:
+        text = ' '.join(DESCRIPTION_WORDS[w] for w in words[start:start + length])
+        out.append(text[0].upper() + text[1:] + '.')
+        start += length
+    return out
+
+def random_place_names(rng: np.random.RandomState, n: int, syllables: int) -> List[str]:
+    """Capitalized names of ``syllables`` random syllables, so unrelated records rarely share a place"""
+    picks = rng.randint(0, len(PLACE_SYLLABLES), size=(n, syllables))
+    return [''.join(PLACE_SYLLABLES[k] for k in row).capitalize() for row in picks]
+
+def unique_ids(rng: np.random.RandomState, n: int, low: int) -> np.ndarray:
+    """``n`` distinct integer IDs from ``low`` upwards, in random order"""
+    return low + rng.permutation(n)
+
+def jitter(rng: np.random.RandomState, values: np.ndarray, miles: float) -> np.ndarray:
+    """Move coordinates by up to ``miles`` (roughly, in degrees)"""
+    return np.round(values + rng.uniform(-miles, miles, size=len(values)) / 69.0, 6)
+
+def generate_nypd(rng: np.random.RandomState, n: int, start: str, end: str) -> pd.DataFrame:
+    """NYPD-shaped complaint records"""
+    borough = rng.randint(0, len(NYPD_BOROUGHS), size=n)
+    places = [NYPD_BOROUGHS[b] for b in borough]
+    return pd.DataFrame({
+        'date': random_dates(rng, n, start, end).strftime('%m/%d/%Y'),
+        'state': 'NY',
+        'county': [p[0] for p in places],
+        'bias_motivation': rng.choice(NYPD_BIASES, size=n),
+        'source': 'NYPD',
+        'incident_id': [str(x) for x in unique_ids(rng, n, 10 ** 14)],
+        'offense_type': rng.choice(NYPD_OFFENSES, size=n),
+        'incidents_corrected': 1.45,
+        'city': 'New York',
+        'latitude': jitter(rng, np.array([p[2] for p in places]), 5.0),
+        'longitude': jitter(rng, np.array([p[3] for p in places]), 5.0),
+        'borough': [p[1] for p in places],
+    })
+
+def generate_lapd(rng: np.random.RandomState, n: int, start: str, end: str) -> pd.DataFrame:
+    """LAPD-shaped crime records"""
+    return pd.DataFrame({
+        'date': random_dates(rng, n, start, end).strftime('%m/%d/%Y 12:00:00 AM'),
+        'state': 'CA',
+        'county': 'Los Angeles County',
+        'bias_motivation': rng.choice(LAPD_BIASES, size=n),
+        'source': 'LAPD',
+        'incident_id': [str(x) for x in unique_ids(rng, n, 10 ** 7)],
+        'offense_type': rng.choice(LAPD_OFFENSES, size=n),
+        'incidents_corrected': 1.0,
+        'city': 'Los Angeles',
+        'latitude': jitter(rng, np.full(n, 34.0522), 15.0),
+        'longitude': jitter(rng, np.full(n, -118.2437), 15.0),
+    })
+
+def generate_adl(rng: np.random.RandomState, n: int, start: str, end: str) -> pd.DataFrame:
+    """ADL H.E.A.T. map-shaped incidents"""
+    place = rng.randint(0, len(ADL_PLACES), size=n)
+    places = [ADL_PLACES[p] for p in place]
+    return pd.DataFrame({
+        'date': random_dates(rng, n, start, end).strftime('%m/%d/%Y'),
+        'state': [p[0] for p in places],
+        'county': [f"{name} County" for name in random_place_names(rng, n, 2)],
+        'city': random_place_names(rng, n, 3),
+        'bias_motivation': rng.choice(ADL_BIASES, size=n),
+        'source': 'ADL',
+        'incident_id': [f"adl_{x}" for x in unique_ids(rng, n, 10 ** 5)],
+        'description': random_descriptions(rng, n),
+        'adl_category': rng.choice(ADL_CATEGORIES, size=n),
+        'latitude': jitter(rng, np.array([p[3] for p in places]), 10.0),
+        'longitude': jitter(rng, np.array([p[4] for p in places]), 10.0),
+        'verified': True,
+    })
+
+def generate_fbi(rng: np.random.RandomState, n: int, start: str, end: str) -> pd.DataFrame:
+    """FBI CDE-shaped monthly state totals, one per (state, month)
+
+    When ``n`` is more than the states have months between start and end,
+    the months reach back before ``start``.
+    """
+    n_months = max(len(pd.period_range(start, end, freq='M')), -(-n // len(FBI_STATES)))
+    cells = rng.choice(n_months * len(FBI_STATES), size=n, replace=False)
+    months = pd.period_range(end=end, periods=n_months, freq='M')[cells // len(FBI_STATES)].to_timestamp()
+    return pd.DataFrame({
+        'date': months.strftime('%m/%d/%Y'),
+        'month_year': months.strftime('%m-%Y'),
+        'state': [FBI_STATES[c] for c in cells % len(FBI_STATES)],
+        'incident_count': rng.randint(1, 60, size=n).astype(float),
+        'source': 'FBI',
+        'data_type': 'monthly_total',
+        'bias_motivation': 'ALL_HATE_CRIMES',
+    })
+
+GENERATORS = {'NYPD': generate_nypd, 'LAPD': generate_lapd, 'ADL': generate_adl, 'FBI': generate_fbi}
+
+def inject_duplicates(rng: np.random.RandomState, frames: Dict[str, pd.DataFrame],
+                      n_duplicates: int) -> Dict[str, pd.DataFrame]:
+    """Append duplicates of existing records and label every record's true cluster
+
+    ``reload`` re-collects a record unchanged, ``revision`` re-collects it
+    under the same ID with edited fields and ``cross_report`` files a police
+    incident with ADL as well (date, location and bias agree).
+    """
+    offset = 0
+    for source, frame in frames.items():
+        frame['benchmark_cluster'] = np.arange(offset, offset + len(frame))
+        offset += len(frame)
+
+    kinds = rng.choice(DUPLICATE_KINDS, size=n_duplicates, p=[0.3, 0.3, 0.4])
+    additions = {source: [] for source in frames}
+    for kind, count in zip(*np.unique(kinds, return_counts=True)):
+        if kind == 'cross_report':
+            police = pd.concat([frames[s] for s in ['NYPD', 'LAPD'] if s in frames], ignore_index=True)
+            if police.empty:
+                continue
+            picked = police.iloc[rng.randint(0, len(police), size=count)].reset_index(drop=True)
+            shifted = pd.to_datetime(picked['date'].str[:10], format='%m/%d/%Y') + pd.to_timedelta(rng.randint(-1, 2, size=count), unit='D')
+            bias = picked['bias_motivation'].str.upper()
+            additions['ADL'].append(pd.DataFrame({
+                'date': shifted.dt.strftime('%m/%d/%Y'),
+                'state': picked['state'],
+                'county': picked['county'],
+                'city': picked['city'],
+                'bias_motivation': np.where(bias.str.contains('JEWISH'), 'ANTISEMITISM', bias),
+                'source': 'ADL',
+                'incident_id': [f"adl_x{x}" for x in unique_ids(rng, count, 10 ** 5)],
+                'description': random_descriptions(rng, count),
+                'adl_category': rng.choice(ADL_CATEGORIES, size=count),
+                'latitude': jitter(rng, picked['latitude'].to_numpy(), 0.5),
+                'longitude': jitter(rng, picked['longitude'].to_numpy(), 0.5),
+                'verified': True,
+                'benchmark_cluster': picked['benchmark_cluster'],
+            }))
+            continue
+
+        # Re-collected records stay within their own source
+        weights = np.array([len(frames[s]) for s in frames], dtype=float)
+        per_source = rng.multinomial(count, weights / weights.sum())
+        for source, k in zip(frames, per_source):
+            if k == 0:
+                continue
+            copies = frames[source].iloc[rng.randint(0, len(frames[source]), size=k)].copy()
+            if kind == 'revision':
+                if 'description' in copies:
+                    copies['description'] = copies['description'] + ' Updated.'
+                if 'offense_type' in copies:
+                    copies['offense_type'] = rng.choice(NYPD_OFFENSES if source == 'NYPD' else LAPD_OFFENSES, size=k)
+                if 'incident_count' in copies:
+                    copies['incident_count'] = copies['incident_count'] + 1
+            additions[source].append(copies)
+
+    return {source: pd.concat([frames[source]] + additions[source], ignore_index=True) for source in frames}
+
+def generate_incidents(n_rows: int, duplicate_rate: float = 0.1, seed: int = 42,
+                       start: str = '2019-01-01', end: str = '2024-12-31') -> Dict[str, pd.DataFrame]:
+    """Synthetic per-source frames of about ``n_rows`` records in total
+
+    ``duplicate_rate`` of the rows are injected duplicates; every frame has
+    a ``benchmark_cluster`` column naming the original incident each record
+    belongs to.
+    """
+    rng = np.random.RandomState(seed)
+    n_duplicates = int(n_rows * duplicate_rate)
+    counts = rng.multinomial(n_rows - n_duplicates, list(SOURCE_MIX.values()))
+    frames = {source: GENERATORS[source](rng, int(count), start, end)
+              for source, count in zip(SOURCE_MIX, counts)}
+    return inject_duplicates(rng, frames, n_duplicates)
+
+def pairwise_scores(predicted: np.ndarray, truth: np.ndarray) -> Dict:
+    """Pairwise precision and recall of predicted clusters against the truth"""
+    def pairs(sizes: pd.Series) -> int:
+        return int((sizes * (sizes - 1) // 2).sum())
+
+    labels = pd.DataFrame({'predicted': predicted, 'truth': truth})
+    predicted_pairs = pairs(labels.groupby('predicted').size())
+    true_pairs = pairs(labels.groupby('truth').size())
+    correct_pairs = pairs(labels.groupby(['predicted', 'truth']).size())
+    return {
+        'predicted_pairs': predicted_pairs,
+        'true_pairs': true_pairs,
+        'correct_pairs': correct_pairs,
+        'precision': correct_pairs / predicted_pairs if predicted_pairs else 1.0,
+        'recall': correct_pairs / true_pairs if true_pairs else 1.0,
+    }
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_benchmark(n_rows: int, duplicate_rate: float, seed: int, workers: int) -> Dict:
+    """Generate one dataset and time a full deduplication over it"""
+    started = time.perf_counter()
+    frames = generate_incidents(n_rows, duplicate_rate, seed)
+    generation_seconds = time.perf_counter() - started
+
+    integrator = MultiSourceIntegrator()
+    integrator.dedup_workers = workers
+
+    started = time.perf_counter()
+    police = pd.concat([frames['NYPD'], frames['LAPD']], ignore_index=True)
+    # Synthetic bias values are cached apart from the real classifications
+    with tempfile.TemporaryDirectory() as cache_dir:
+        integrator.bias_classifier = BiasClassifier(Path(cache_dir) / "bias_classifications.json")
+        police, adl, fbi = integrator.standardize_schemas(police, frames['ADL'], frames['FBI'])
+    table = integrator.build_incident_table([df for df in [police, adl, fbi] if not df.empty])
+    truth = table.pop('benchmark_cluster').to_numpy()
+    prepare_seconds = time.perf_counter() - started
+
+    # advanced_deduplication re-sorts stably, so the state rows line up with table rows
+    started = time.perf_counter()
+    deduplicated, state = integrator.advanced_deduplication(table)
+    dedup_seconds = time.perf_counter() - started
+
+    pair_counts = integrator.dedup_pair_counts
+    return {
+        'rows': len(table),
+        'injected_duplicates': len(table) - len(np.unique(truth)),
+        'rows_per_source': table['source'].value_counts().astype(int).to_dict(),
+        'workers': workers,
+        'generation_seconds': round(generation_seconds, 3),
+        'prepare_seconds': round(prepare_seconds, 3),
+        'dedup_seconds': round(dedup_seconds, 3),
+        'peak_memory_mb': round(peak_memory_mb(), 1),
+        'exact_duplicates_removed': {k: int(v) for k, v in integrator.exact_duplicate_counts.items()},
+        'compared_pairs': sum(c['compared_pairs'] for c in pair_counts.values()),
+        'policy_skipped_pairs': sum(integrator.policy_skipped_pairs.values()),
+        'pair_counts': pair_counts,
+        'duplicates_removed': len(table) - len(deduplicated),
+        'accuracy': pairwise_scores(state['cluster'].to_numpy(), truth),
+    }
+
+def main():
+    """Main function to run the deduplication benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark multi-source deduplication on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Dataset sizes (rows) to benchmark')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Share of rows that are injected duplicates')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generator')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for partitioned deduplication')
+    parser.add_argument('--output', default=None, help='Results file (default: data/benchmarks/dedup_<timestamp>.json)')
+    args = parser.parse_args()
+
+    print("Deduplication Benchmark")
+    print("=======================")
+
+    results = []
+    for n_rows in args.sizes:
+        print(f"\n⏱️  {n_rows:,} rows ({args.duplicate_rate:.0%} duplicates)")
+        # A fresh process per size keeps peak memory readings independent
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_benchmark, n_rows, args.duplicate_rate, args.seed, args.workers).result()
+        results.append(result)
+
+        accuracy = result['accuracy']
+        print(f"   Dedup: {result['dedup_seconds']:.2f}s, peak memory {result['peak_memory_mb']:.0f} MB")
+        print(f"   Pairs: {result['compared_pairs']:,} compared, {result['policy_skipped_pairs']:,} skipped by policy")
+        print(f"   Precision: {accuracy['precision']:.3f}, recall: {accuracy['recall']:.3f}")
+
+    output_file = Path(args.output) if args.output else \
+        Path("data/benchmarks") / f"dedup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'run_date': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'duplicate_rate': args.duplicate_rate,
+            'seed': args.seed,
+            'results': results,
+        }, f, indent=2)
+
+    print(f"\n📁 Results saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
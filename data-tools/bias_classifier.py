@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Bias Classifier
+Maps free-text bias motivations and categories to the standard categories
+shared by the ADL processor and the integrator
+"""
+
+import re
+import json
+import hashlib
+import pandas as pd
+from pathlib import Path
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Categories in order of precedence: a value mentioning several takes the first
+BIAS_RULES = [
+    ('ANTI-JEWISH', ['JEWISH', 'JUDAISM', 'ANTISEMIT', 'ANTI-SEMIT']),
+    ('ANTI-ISLAMIC', ['MUSLIM', 'ISLAM']),
+    ('ANTI-BLACK', ['BLACK', 'AFRICAN']),
+    ('ANTI-HISPANIC', ['HISPANIC', 'LATINO']),
+    ('ANTI-ASIAN', ['ASIAN', 'PACIFIC']),
+    ('ANTI-WHITE', ['WHITE', 'CAUCASIAN']),
+    ('ANTI-LGBTQ', ['GAY', 'LESBIAN', 'LGBTQ', 'TRANSGENDER', 'BISEXUAL']),
+    ('ANTI-CHRISTIAN', ['CATHOLIC', 'CHRISTIAN', 'PROTESTANT']),
+]
+
+def compile_rules(rules=BIAS_RULES) -> re.Pattern:
+    """One anchored pattern with a lookahead branch per category, tried in precedence order"""
+    branches = [
+        f"(?=.*?(?P<rule{i}>{'|'.join(re.escape(term) for term in terms)}))"
+        for i, (_, terms) in enumerate(rules)
+    ]
+    return re.compile('^(?:' + '|'.join(branches) + ')', re.DOTALL)
+
+class BiasClassifier:
+    """Classifies bias values, each distinct value once, remembering results across runs
+
+    A value matching no rule keeps its upper-cased, stripped text, so a
+    value of only whitespace classifies as ''.  Missing values and empty
+    strings classify as None.  Results are cached in
+    ``cache_file`` together with a hash of the rules, so editing the rules
+    discards the old results.
+    """
+
+    def __init__(self, cache_file: str = "data/cache/bias_classifications.json"):
+        self.cache_file = Path(cache_file)
+        self.pattern = compile_rules()
+        self.categories = [category for category, _ in BIAS_RULES]
+        self.rules_version = hashlib.sha256(json.dumps(BIAS_RULES).encode('utf-8')).hexdigest()[:16]
+        self.known = self.load_cache()
+        self.new_values = 0
+
+    def load_cache(self) -> Dict[str, str]:
+        """Earlier classifications, if they were made with the current rules"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('rules_version') == self.rules_version:
+                return cache['classifications']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        return {}
+
+    def save(self):
+        """Write the classifications made so far, if there are new ones"""
+        if not self.new_values:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'rules_version': self.rules_version, 'classifications': self.known}, f,
+                      indent=2, ensure_ascii=False)
+        tmp_file.replace(self.cache_file)
+        logger.info(f"Cached {self.new_values} new bias classifications ({len(self.known)} total)")
+        self.new_values = 0
+
+    def classify(self, value) -> Optional[str]:
+        """Standard category for one value"""
+        if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)) or value == '':
+            return None
+        text = str(value).upper().strip()
+        if text not in self.known:
+            match = self.pattern.match(text)
+            self.known[text] = self.categories[int(match.lastgroup[4:])] if match else text
+            self.new_values += 1
+        return self.known[text]
+
+    def merge(self, classifications: Dict[str, str]):
+        """Adopt classifications made by another instance, such as one in a worker process"""
+        for text, category in classifications.items():
+            if text not in self.known:
+                self.known[text] = category
+                self.new_values += 1
+
+    def classify_column(self, values: pd.Series) -> pd.Series:
+        """Classify a column, running the classifier once per distinct value"""
+        codes, uniques = pd.factorize(values)
+        # Missing values get code -1, which picks the trailing None
+        labels = pd.Series([self.classify(value) for value in uniques] + [None], dtype=object)
+        return pd.Series(labels.to_numpy()[codes], index=values.index, dtype=object)
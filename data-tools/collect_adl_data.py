@@ -12,19 +12,46 @@ import sys
 from pathlib import Path
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from rate_limiter import TokenBucket
+from known_ids import KnownIdFilter, record_id
+from adl_archive import ARCHIVE_NAME, append_page
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://www.adl.org/apps/heatmap/json"
+HEATMAP_PAGE = "https://www.adl.org/resources/tools-to-track-hate/heat-map"
+
 class ADLDataCollector:
     """Automated ADL data collection with multiple fallback methods"""
     
-    def __init__(self):
-        self.base_url = "https://www.adl.org/apps/heatmap/json"
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, heatmap_page: str = HEATMAP_PAGE,
+                 max_in_flight: int = 4, requests_per_second: float = 2.0):
+        self.base_url = base_url
+        self.heatmap_page = heatmap_page
         self.output_dir = Path("data/adl")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Pagination: pages hold page_size incidents until the last one
+        self.page_size = 50
+        self.max_pages = 200
+        self.checkpoint_file = self.output_dir / "collection_checkpoint.json"
+        self.archive_file = self.output_dir / ARCHIVE_NAME
+        self.run_started = datetime.now().isoformat()
+        self.restart = False
+        
+        # Concurrent page fetching, kept polite by a shared token bucket
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.page_retries = 3
+        self.backoff_seconds = 1.0
+        
+        # IDs the processor has already ingested; None collects every page in full
+        self.known_ids = KnownIdFilter(self.output_dir / "known_ids.npz")
+        
         # Default headers
         self.headers = {
             'Accept': '*/*',
@@ -36,7 +63,7 @@ class ADLDataCollector:
 
     def log_endpoints(self):
         """Log the main endpoints used for collection."""
-        logger.info(f"Heatmap page: https://www.adl.org/resources/tools-to-track-hate/heat-map")
+        logger.info(f"Heatmap page: {self.heatmap_page}")
         logger.info(f"JSON endpoint base: {self.base_url}")
 
     def fetch_page(self, session: requests.Session, page: int) -> requests.Response:
@@ -60,10 +87,11 @@ class ADLDataCollector:
         # Visiting the heatmap page seeds session cookies that are
         # required to access the JSON API.  Ignore any errors here and
         # continue with whatever cookies we obtain.
-        try:
-            session.get("https://www.adl.org/resources/tools-to-track-hate/heat-map", timeout=10)
-        except Exception:
-            pass
+        if self.heatmap_page:
+            try:
+                session.get(self.heatmap_page, timeout=10)
+            except Exception:
+                pass
 
         return session
 
@@ -136,63 +164,180 @@ class ADLDataCollector:
             logger.error(f"❌ Collection failed: {e}")
             return False
     
+    def load_checkpoint(self) -> dict:
+        """Progress of the current sweep; a finished or missing checkpoint starts a new one"""
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+            if not checkpoint.get('complete'):
+                checkpoint['pages'] = {int(p): n for p, n in checkpoint['pages'].items()}
+                logger.info(f"Resuming collection: {len(checkpoint['pages'])} pages already saved")
+                return checkpoint
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        return {'run_started': datetime.now().isoformat(), 'pages': {}, 'end_page': None,
+                'failed_pages': [], 'complete': False, 'collecting': False}
+    
+    def save_checkpoint(self, checkpoint: dict):
+        """Write sweep progress (atomically, so an interrupted run leaves a valid file)"""
+        tmp_file = self.checkpoint_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        tmp_file.replace(self.checkpoint_file)
+    
+    def collect_page(self, session, page: int):
+        """Fetch one page and pick out its new incidents
+
+        Returns ``(incidents on the page, new incidents)``, or None if the
+        page failed.  Incidents without an ID always count as new.
+        """
+        self.rate_limiter.acquire()
+        try:
+            response = self.fetch_page(session, page)
+            if response.status_code != 200:
+                logger.warning(f"Failed to get page {page}: HTTP {response.status_code}")
+                return None
+            data = response.json()
+        except Exception as e:
+            logger.warning(f"Error collecting page {page}: {e}")
+            return None
+        
+        incidents = data.get('incidents') or []
+        new_incidents = incidents
+        if self.known_ids is not None:
+            new_incidents = [i for i in incidents if not record_id(i) or record_id(i) not in self.known_ids]
+        return len(incidents), new_incidents
+    
     def collect_all_pages(self, session):
-        """Collect all available pages"""
+        """Collect all available pages
+
+        Progress is checkpointed after every page, so an interrupted sweep
+        resumes with the pages it has not saved yet.  A fetched page is only
+        appended to the archive (and checkpointed, even with no new
+        incidents) once every page before it is saved and the sweep is
+        known not to end before it; pages still waiting on an earlier
+        failed page are fetched again by the next run.  The first pending page
+        is fetched alone to confirm the session works; after that up to
+        ``max_in_flight`` pages are fetched at once.  The sweep ends at the
+        first page with fewer than ``page_size`` incidents, or at the first
+        page whose incidents are all known from earlier runs (the feed lists
+        the newest incidents first).  Failed pages are retried on their own
+        at the end instead of stopping the sweep.  The checkpoint's
+        ``collecting`` flag is set while this runs, so processors following
+        the archive know when the collector has stopped, finished or not.
+        Set ``restart`` to ignore an unfinished checkpoint.
+        """
+        if self.restart and self.checkpoint_file.exists():
+            self.checkpoint_file.unlink()
+        checkpoint = self.load_checkpoint()
+        pages = checkpoint['pages']
+        failed = set(checkpoint['failed_pages'])
+        self.run_started = checkpoint['run_started']
+        # Marks the sweep as running for processors following the archive
+        checkpoint['collecting'] = True
+        self.save_checkpoint(checkpoint)
         
-        page = 0
-        total_incidents = 0
+        def last_page():
+            end = checkpoint['end_page']
+            return self.max_pages if end is None else min(end, self.max_pages)
         
-        while True:
-            try:
-                logger.info(f"Collecting page {page}...")
-                
-                response = self.fetch_page(session, page)
-                
-                if response.status_code != 200:
-                    logger.warning(f"Failed to get page {page}: HTTP {response.status_code}")
-                    break
-                
-                data = response.json()
-                
-                if not data.get('incidents') or len(data['incidents']) == 0:
-                    logger.info(f"No more data at page {page}, stopping")
+        # Fetched pages waiting for the pages before them
+        unsaved = {}
+        
+        def save_ready_pages():
+            for page in sorted(unsaved):
+                if any(p not in pages for p in range(page)) or page > last_page():
                     break
-                
-                # Save page data
-                page_file = self.output_dir / f"adl_page_{page}.json"
-                with open(page_file, 'w') as f:
-                    json.dump(data, f, indent=2)
-                
-                incidents_count = len(data['incidents'])
-                total_incidents += incidents_count
-                logger.info(f"✅ Saved page {page}: {incidents_count} incidents")
-                
-                # Check if we've reached the end (no more pages)
-                if incidents_count < 50:  # Assuming 50 per page is normal
-                    logger.info("Reached end of data (partial page)")
+                new_incidents = unsaved.pop(page)
+                if new_incidents:
+                    append_page(self.archive_file, self.run_started, page, new_incidents)
+                    logger.info(f"✅ Saved page {page}: {len(new_incidents)} new incidents")
+                pages[page] = len(new_incidents)
+        
+        def record(page, result):
+            if result is None:
+                failed.add(page)
+            else:
+                failed.discard(page)
+                count, new_incidents = result
+                unsaved[page] = new_incidents
+                all_known = count > 0 and not new_incidents
+                if (count < self.page_size or all_known) and \
+                        (checkpoint['end_page'] is None or page < checkpoint['end_page']):
+                    logger.info(f"Reached {'already collected incidents' if all_known else 'end of data'} "
+                                f"at page {page}")
+                    checkpoint['end_page'] = page
+                save_ready_pages()
+            checkpoint['failed_pages'] = sorted(failed)
+            self.save_checkpoint(checkpoint)
+        
+        def pending():
+            return [p for p in range(last_page() + 1) if p not in pages and p not in unsaved and p not in failed]
+        
+        # The first page confirms the session before going concurrent
+        todo = pending()
+        if todo:
+            result = self.collect_page(session, todo[0])
+            if result is None and not pages:
+                logger.error("❌ First page failed, session is not working")
+                failed.add(todo[0])
+                checkpoint['failed_pages'] = sorted(failed)
+                checkpoint['collecting'] = False
+                self.save_checkpoint(checkpoint)
+                return False
+            record(todo[0], result)
+        
+        with ThreadPoolExecutor(max_workers=max(self.max_in_flight, 1)) as pool:
+            running = {}
+            while True:
+                for page in pending():
+                    if len(running) >= self.max_in_flight:
+                        break
+                    if page not in running.values():
+                        running[pool.submit(self.collect_page, session, page)] = page
+                if not running:
                     break
-                
-                page += 1
-                time.sleep(0.5)  # Be respectful to the server
-                
-                # Safety limit
-                if page > 200:
-                    logger.warning("Reached safety limit of 200 pages")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(running.pop(future), future.result())
+        
+        # Failed pages get a few more tries each, with backoff
+        for page in sorted(failed):
+            if page > last_page():
+                failed.discard(page)
+                continue
+            for attempt in range(self.page_retries):
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+                logger.info(f"Retrying page {page} (attempt {attempt + 1})")
+                result = self.collect_page(session, page)
+                if result is not None:
+                    record(page, result)
                     break
-                    
-            except Exception as e:
-                logger.error(f"Error collecting page {page}: {e}")
-                break
         
-        if total_incidents > 0:
-            logger.info(f"🎉 Collection complete: {total_incidents} total incidents across {page + 1} pages")
+        total_incidents = sum(pages.values())
+        checkpoint['failed_pages'] = sorted(failed)
+        checkpoint['complete'] = not failed and checkpoint['end_page'] is not None
+        checkpoint['collecting'] = False
+        self.save_checkpoint(checkpoint)
+        
+        if failed:
+            logger.warning(f"Pages still failing: {sorted(failed)} (run again to resume)")
+        if checkpoint['end_page'] is None:
+            logger.warning(f"Reached safety limit of {self.max_pages} pages")
+        
+        if total_incidents > 0 or (checkpoint['complete'] and self.known_ids is not None and self.known_ids.count):
+            logger.info(f"🎉 Collection complete: {total_incidents} new incidents across {len(pages)} pages")
             
             # Create collection summary
             summary = {
                 'collection_date': datetime.now().isoformat(),
-                'total_pages': page + 1,
+                'run_started': checkpoint['run_started'],
+                'total_pages': len(pages),
                 'total_incidents': total_incidents,
-                'status': 'success'
+                'pages_walked': checkpoint['end_page'] + 1 if checkpoint['end_page'] is not None else self.max_pages + 1,
+                'failed_pages': sorted(failed),
+                'known_id_filter': self.known_ids.report() if self.known_ids is not None else None,
+                'status': 'success' if not failed else 'partial'
             }
             
             with open(self.output_dir / 'collection_summary.json', 'w') as f:
@@ -275,10 +420,22 @@ def main():
                         help='Fetch fresh cookies and store them to adl_cookies.txt before collecting')
     parser.add_argument('--instructions', action='store_true', help='Show manual collection instructions')
     parser.add_argument('--print-endpoints', action='store_true', help='Print endpoints used and exit')
+    parser.add_argument('--base-url', help='Heatmap JSON endpoint (e.g. a local mock server)')
+    parser.add_argument('--max-in-flight', type=int, default=4, help='Pages to request at the same time')
+    parser.add_argument('--restart', action='store_true', help='Ignore an unfinished checkpoint and start from page 0')
+    parser.add_argument('--all-pages', action='store_true',
+                        help='Collect every page in full instead of stopping at already ingested incidents')
     
     args = parser.parse_args()
     
-    collector = ADLDataCollector()
+    if args.base_url:
+        # A mock endpoint has no heat map page to seed cookies from
+        collector = ADLDataCollector(args.base_url, None, args.max_in_flight)
+    else:
+        collector = ADLDataCollector(max_in_flight=args.max_in_flight)
+    collector.restart = args.restart
+    if args.all_pages:
+        collector.known_ids = None
 
     if args.print_endpoints:
         collector.log_endpoints()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Batch Date Parser
+Parses whole date columns at once: the formats a source uses are detected
+on a sample, each format parses every row it fits in one vectorized pass
+(in preference order), and only the leftovers go to the free-form parser
+"""
+
+import pandas as pd
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Known formats in order of preference; values are cut to 19 characters first,
+# so ISO timestamps with fractions or zones match the plain timestamp format.
+# 12-hour timestamps (LAPD's 03/15/2023 12:00:00 AM) are matched uncut.
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S',
+                '%m/%d/%Y %I:%M:%S %p']
+MONTH_FIRST, DAY_FIRST = '%m/%d/%Y', '%d/%m/%Y'
+
+# pandas 2 infers one format for a whole column unless told the values are mixed
+FREE_FORM = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+TIME_ZONE_SUFFIX = r'\s*(?:Z|UTC|GMT|[+-]\d{2}:?\d{2})$'
+
+def clip(values: pd.Series, fmt: str) -> pd.Series:
+    """Values as matched against a format: cut to 19 characters unless it reads AM/PM"""
+    return values if '%p' in fmt else values.str.slice(0, 19)
+
+def detect_formats(values: pd.Series, formats: List[str] = DATE_FORMATS, sample_size: int = 500) -> List[str]:
+    """Formats in preference order, with those that parse no distinct sampled value moved last
+
+    An ambiguous date like 01/06/2023 takes the first format that fits, so
+    a source is only read day-first when none of its sampled dates parse
+    month-first.
+    """
+    sample = values.drop_duplicates().head(sample_size).astype(str)
+    hits = {fmt: int(pd.to_datetime(clip(sample, fmt), format=fmt, errors='coerce').notna().sum()) for fmt in formats}
+    ordered = sorted(formats, key=lambda fmt: hits[fmt] == 0)
+    if {MONTH_FIRST, DAY_FIRST} <= set(formats) and ordered.index(DAY_FIRST) < ordered.index(MONTH_FIRST):
+        logger.info(f"No sampled date parses as {MONTH_FIRST}, reading ambiguous dates as {DAY_FIRST}")
+    return ordered
+
+def parse_dates(values: pd.Series, formats: List[str] = DATE_FORMATS) -> Tuple[pd.Series, Dict]:
+    """Parse a column of date values to timestamps (NaT where they cannot be parsed)
+
+    Returns the parsed column and a report of how many rows each format
+    parsed, how many needed free-form parsing and how many failed.
+    Missing and empty values are counted separately and never fail.
+    """
+    text = values.astype(object).where(values.notna(), None)
+    present = text.map(lambda v: v is not None and str(v).strip() != '')
+    text = text[present].astype(str)
+
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    remaining = pd.Series(True, index=text.index)
+    counts = {}
+    for fmt in detect_formats(text, formats):
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(clip(text[remaining], fmt), format=fmt, errors='coerce')
+        matched = attempt[attempt.notna()]
+        if len(matched):
+            parsed[matched.index] = matched
+            remaining[matched.index] = False
+            counts[fmt] = len(matched)
+
+    # Anything else gets the free-form parser in one pass; a zone suffix is
+    # dropped first, which keeps the wall-clock time
+    leftovers = text[remaining]
+    inferred = 0
+    if len(leftovers):
+        wall_clock = leftovers.str.strip().str.replace(TIME_ZONE_SUFFIX, '', regex=True)
+        guessed = pd.to_datetime(wall_clock, errors='coerce', **FREE_FORM)
+        if guessed.dt.tz is not None:
+            guessed = guessed.dt.tz_localize(None)
+        guessed = guessed[guessed.notna()]
+        if len(guessed):
+            parsed[guessed.index] = guessed
+            inferred = len(guessed)
+
+    report = {
+        'rows': len(values),
+        'missing': int(len(values) - len(text)),
+        'formats': counts,
+        'inferred': inferred,
+        'failed': int(len(leftovers) - inferred),
+    }
+    return parsed, report
+
+def format_dates(parsed: pd.Series, fmt: str) -> pd.Series:
+    """Format timestamps as strings (NaN where missing), formatting each distinct date once"""
+    codes, uniques = pd.factorize(parsed)
+    if not len(uniques):
+        return pd.Series(float('nan'), index=parsed.index, dtype=object)
+    labels = pd.Index(uniques).strftime(fmt)
+    formatted = pd.Series(labels.take(codes), index=parsed.index, dtype=object)
+    return formatted.where(codes >= 0)
+
+def merge_reports(total: Dict, report: Dict) -> Dict:
+    """Add one parse report's counts to a running total"""
+    for key in ['rows', 'missing', 'inferred', 'failed']:
+        total[key] = total.get(key, 0) + report[key]
+    formats = total.setdefault('formats', {})
+    for fmt, count in report['formats'].items():
+        formats[fmt] = formats.get(fmt, 0) + count
+    return total
+
+def describe_report(report: Dict) -> str:
+    """One-line summary of a parse report"""
+    parts = [f"{fmt}: {count}" for fmt, count in report['formats'].items()]
+    if report['inferred']:
+        parts.append(f"free-form: {report['inferred']}")
+    parts.append(f"failed: {report['failed']}")
+    return ', '.join(parts)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Description Similarity Index
+MinHash/LSH index over incident descriptions for batched fuzzy matching
+"""
+
+import zlib
+import numpy as np
+import pandas as pd
+import logging
+from typing import Dict, List, Tuple
+from fuzzywuzzy import fuzz
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+def ratio_scores(texts: List[str], codes_a: np.ndarray, codes_b: np.ndarray,
+                 cache: Dict[Tuple[int, int], int] = None) -> np.ndarray:
+    """Score fuzz.ratio for pairs of text codes, once per distinct pair"""
+    scores = np.zeros(len(codes_a), dtype=np.int16)
+    if len(codes_a) == 0:
+        return scores
+
+    cache = {} if cache is None else cache
+    unique_pairs, inverse = np.unique(np.stack([codes_a, codes_b], axis=1), axis=0, return_inverse=True)
+    unique_scores = np.empty(len(unique_pairs), dtype=np.int16)
+    for k, (a, b) in enumerate(unique_pairs):
+        key = (int(a), int(b))
+        if key not in cache:
+            cache[key] = 100 if a == b else fuzz.ratio(texts[a], texts[b])
+        unique_scores[k] = cache[key]
+
+    scores[:] = unique_scores[inverse.ravel()]
+    return scores
+
+class DescriptionIndex:
+    """MinHash signatures for each distinct description with banded LSH lookup
+
+    Descriptions are lowercased, split into character shingles and
+    MinHashed once.  Two descriptions are likely similar when any LSH band
+    of their signatures agrees; only those pairs get an exact fuzz.ratio.
+    """
+
+    def __init__(self, descriptions: pd.Series, shingle_size: int = 3, num_perm: int = 64,
+                 bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        # One entry per distinct lowercased description
+        codes, uniques = pd.factorize(pd.Series([str(d).lower() for d in descriptions], dtype=object))
+        self.codes = codes
+        self.texts = list(uniques)
+        self.lengths = np.array([len(t) for t in self.texts], dtype=np.int32)
+        self._scores = {}
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+        self.signatures = np.array([self.minhash(t) for t in self.texts], dtype=np.uint64).reshape(-1, num_perm)
+        self._band_keys = self._band_hashes(self.signatures)
+
+        logger.debug(f"Description index: {len(self.texts)} distinct descriptions from {len(descriptions)} records")
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Hash the character shingles of a description"""
+        k = self.shingle_size
+        grams = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        return np.array([zlib.crc32(g.encode('utf-8')) % MERSENNE_PRIME for g in grams], dtype=np.uint64)
+
+    def minhash(self, text: str) -> np.ndarray:
+        """MinHash signature of a description"""
+        hashed = (self._a[:, None] * self.shingles(text)[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """Collapse each LSH band of the signatures to a single key"""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows_per_band)
+        keys = np.zeros(banded.shape[:2], dtype=np.uint64)
+        for r in range(self.rows_per_band):
+            keys = keys * np.uint64(MERSENNE_PRIME) + banded[:, :, r]
+        return keys
+
+    def likely_similar(self, codes_a: np.ndarray, codes_b: np.ndarray) -> np.ndarray:
+        """Mask of description pairs that share at least one LSH band bucket"""
+        return (self._band_keys[codes_a] == self._band_keys[codes_b]).any(axis=1)
+
+    def similar(self, pos_a: np.ndarray, pos_b: np.ndarray, threshold=80, min_length: int = 20) -> np.ndarray:
+        """Mask of record pairs whose descriptions score above ``threshold``
+
+        Records are addressed by position in the series the index was built
+        from.  ``threshold`` may be a scalar or one threshold per pair.
+        Descriptions of ``min_length`` characters or fewer never match.
+        """
+        threshold = np.asarray(threshold)
+        codes_a, codes_b = self.codes[pos_a], self.codes[pos_b]
+        matches = np.zeros(len(pos_a), dtype=bool)
+
+        long_enough = (self.lengths[codes_a] > min_length) & (self.lengths[codes_b] > min_length)
+        candidates = np.flatnonzero(long_enough & self.likely_similar(codes_a, codes_b))
+        scores = ratio_scores(self.texts, codes_a[candidates], codes_b[candidates], self._scores)
+        matches[candidates] = scores > (threshold[candidates] if threshold.ndim else threshold)
+
+        logger.debug(f"Description LSH: {len(candidates)} of {int(long_enough.sum())} comparable pairs scored, "
+                    f"{int(matches.sum())} above threshold")
+        return matches
@@ -5,25 +5,127 @@ Collects hate crime data from the official FBI CDE API for all states
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import pandas as pd
 import time
+import hashlib
+import argparse
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from incident_store import write_incidents, read_incidents, load_incidents, store_path
+from rate_limiter import TokenBucket
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://cde.ucr.cjis.gov/LATEST/hate-crime/state"
+
+# Responses worth retrying; anything else is a final answer
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def parse_month(value):
+    """Month period for a CDE date such as '12/2023', '12-2023' or '2023-12-01' (None if unknown)"""
+    if value in (None, '', 'Unknown'):
+        return None
+    for fmt in ('%m/%Y', '%m-%Y', '%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return pd.Period(datetime.strptime(str(value), fmt), 'M')
+        except ValueError:
+            continue
+    try:
+        return pd.Period(pd.to_datetime(value), 'M')
+    except (ValueError, TypeError):
+        return None
+
+class ResponseCache:
+    """On-disk cache of JSON responses keyed by URL, with their ETag/Last-Modified validators"""
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.lock = threading.Lock()
+        self.not_modified = 0
+        self.downloaded = 0
+        try:
+            with open(self.index_file, 'r') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+    
+    def body_file(self, url: str) -> Path:
+        """File holding the cached body for a URL"""
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]}.json"
+    
+    def conditional_headers(self, url: str) -> dict:
+        """If-None-Match/If-Modified-Since headers for a cached URL (empty if not cached)"""
+        entry = self.index.get(url)
+        if entry is None or not self.body_file(url).exists():
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def load(self, url: str):
+        """Cached body for a URL"""
+        with open(self.body_file(url), 'r') as f:
+            data = json.load(f)
+        with self.lock:
+            self.not_modified += 1
+        return data
+    
+    def store(self, url: str, data, headers):
+        """Cache a response body with its validators"""
+        with open(self.body_file(url), 'w') as f:
+            json.dump(data, f)
+        with self.lock:
+            self.downloaded += 1
+            self.index[url] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'fetched': datetime.now().isoformat()
+            }
+            with open(self.index_file, 'w') as f:
+                json.dump(self.index, f, indent=2)
+
 class FBIDataCollector:
     """Collects hate crime data from FBI Crime Data Explorer API"""
     
-    def __init__(self):
-        self.base_url = "https://cde.ucr.cjis.gov/LATEST/hate-crime/state"
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_in_flight: int = 4, requests_per_second: float = 2.0):
+        self.base_url = base_url.rstrip('/')
         self.output_dir = Path("data/fbi")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Pooled connections shared by all requests; the token bucket keeps
+        # the overall request rate polite however many are in flight
+        self.max_in_flight = max_in_flight
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_in_flight, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = TokenBucket(requests_per_second)
+        
+        # Per-state retries with exponential backoff
+        self.max_retries = 3
+        self.backoff_seconds = 1.0
+        self.timeout = 10
+        
+        # Responses are revalidated with conditional requests on later runs
+        self.response_cache = ResponseCache(self.output_dir / "http_cache")
+        self.summary_file = self.output_dir / "fbi_collection_summary.json"
+        
+        # Monthly totals for every state, extended a few months at a time
+        self.dataset_file = self.output_dir / "fbi_hate_crimes_monthly"
+        
         # US State codes
         self.state_codes = [
             'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
@@ -50,19 +152,59 @@ class FBIDataCollector:
             'WI': 'Wisconsin', 'WY': 'Wyoming', 'DC': 'District of Columbia'
         }
     
+    def fetch(self, url: str, headers: dict = None) -> requests.Response:
+        """GET a URL through the rate limiter, retrying transient failures with backoff
+
+        Returns the last response (which may be an error status), or raises
+        the last connection error once retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                reason = str(e)
+            
+            delay = self.backoff_seconds * 2 ** attempt
+            logger.warning(f"Retrying {url} in {delay:.1f}s ({reason})")
+            time.sleep(delay)
+    
+    def get_json(self, url: str):
+        """Fetch a JSON response, revalidating a cached copy when there is one
+
+        Returns ``(status_code, data)``; a 304 Not Modified is served from
+        the cache as a 200.  ``data`` is None for error responses.
+        """
+        response = self.fetch(url, self.response_cache.conditional_headers(url))
+        if response.status_code == 304:
+            return 200, self.response_cache.load(url)
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        data = response.json()
+        self.response_cache.store(url, data, response.headers)
+        return 200, data
+    
     def collect_state_data(self, state_code, from_date="01-2022", to_date="12-2023", data_type="counts"):
-        """Collect data for a specific state"""
+        """Collect data for a specific state
+
+        Returns the state's monthly data points, which may be none when CDE
+        has not published the window yet, or None if the request failed.
+        """
         
         url = f"{self.base_url}/{state_code}/?from={from_date}&to={to_date}&type={data_type}"
         
         try:
             logger.info(f"Collecting {state_code} data from {from_date} to {to_date}")
             
-            response = requests.get(url, timeout=10)
+            status_code, data = self.get_json(url)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Save raw response
                 state_file = self.output_dir / f"fbi_{state_code}_{from_date.replace('-', '')}_{to_date.replace('-', '')}.json"
                 with open(state_file, 'w') as f:
@@ -75,12 +217,12 @@ class FBIDataCollector:
                 return incidents_data
                 
             else:
-                logger.warning(f"❌ {state_code}: HTTP {response.status_code}")
-                return []
+                logger.warning(f"❌ {state_code}: HTTP {status_code}")
+                return None
                 
         except Exception as e:
             logger.error(f"❌ {state_code}: {e}")
-            return []
+            return None
     
     def extract_incidents(self, data, state_code):
         """Extract incident data from FBI API response"""
@@ -115,67 +257,131 @@ class FBIDataCollector:
         
         return incidents
     
-    def collect_all_states(self, from_date="01-2022", to_date="12-2023"):
-        """Collect data for all states"""
+    def load_monthly_dataset(self) -> pd.DataFrame:
+        """Monthly totals collected so far (seeded from the newest range file if needed)"""
+        if store_path(self.dataset_file).exists():
+            return read_incidents(self.dataset_file)
         
-        logger.info(f"🇺🇸 Starting FBI data collection for all states ({from_date} to {to_date})")
+        older = sorted(self.output_dir.glob("fbi_hate_crimes_*.*"), key=lambda x: x.stat().st_mtime)
+        older = [f for f in older if f.suffix in ('.parquet', '.csv')]
+        if older:
+            logger.info(f"Seeding monthly dataset from {older[-1].name}")
+            return load_incidents(older[-1])
+        return pd.DataFrame()
+    
+    def month_windows(self, existing: pd.DataFrame, max_date, default_from="01-2022", default_to="12-2023") -> dict:
+        """(from, to) months still missing per state, up to ``max_date``
+
+        States with stored months start the month after their latest one;
+        others start at ``default_from``.  Every window runs to ``max_date``,
+        or to ``default_to`` if that cannot be parsed.  States that are up to
+        date are left out.
+        """
+        end = parse_month(max_date) or parse_month(default_to)
+        latest = {}
+        if not existing.empty:
+            months = pd.to_datetime(existing['month_year'], format='%m-%Y').dt.to_period('M')
+            latest = months.groupby(existing['state']).max().to_dict()
+        
+        windows = {}
+        for state_code in self.state_codes:
+            start = latest[state_code] + 1 if state_code in latest else parse_month(default_from)
+            if start <= end:
+                windows[state_code] = (start.strftime('%m-%Y'), end.strftime('%m-%Y'))
+        return windows
+    
+    def merge_months(self, existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """Add newly collected months to the dataset (new rows win on overlap)"""
+        merged = pd.concat([existing, new], ignore_index=True)
+        merged = merged.drop_duplicates(subset=['state', 'month_year'], keep='last')
+        order = pd.DataFrame({
+            'state': pd.Categorical(merged['state'], categories=self.state_codes, ordered=True),
+            'month': pd.to_datetime(merged['month_year'], format='%m-%Y'),
+        }, index=merged.index)
+        return merged.loc[order.sort_values(['state', 'month']).index].reset_index(drop=True)
+    
+    def collect_all_states(self, from_date="01-2022", to_date="12-2023", last_refresh=None,
+                           windows: dict = None, existing: pd.DataFrame = None):
+        """Collect data for all states
+
+        Up to ``max_in_flight`` states are fetched at once; results are
+        gathered in state order either way.  ``windows`` maps state codes to
+        their own (from, to) month range and limits the sweep to those
+        states; the months collected are merged into ``existing``.
+        ``last_refresh`` is the CDE refresh date the sweep ran against,
+        recorded in the summary.
+        """
+        windows = windows or {code: (from_date, to_date) for code in self.state_codes}
+        existing = existing if existing is not None else pd.DataFrame()
+        states = list(windows)
+        
+        logger.info(f"🇺🇸 Starting FBI data collection for {len(states)} states "
+                    f"({self.max_in_flight} in flight)")
         
         all_incidents = []
         successful_states = []
         failed_states = []
         
-        for i, state_code in enumerate(self.state_codes):
+        with ThreadPoolExecutor(max_workers=max(self.max_in_flight, 1)) as pool:
+            results = pool.map(lambda code: self.collect_state_data(code, *windows[code]), states)
+        
+        for i, (state_code, incidents) in enumerate(zip(states, results)):
             try:
-                incidents = self.collect_state_data(state_code, from_date, to_date)
-                
-                if incidents:
+                # An empty window is a success: the state has no new months yet
+                if incidents is None:
+                    failed_states.append(state_code)
+                else:
                     all_incidents.extend(incidents)
                     successful_states.append(state_code)
-                else:
-                    failed_states.append(state_code)
-                
-                # Be respectful to the API
-                time.sleep(0.5)
                 
                 # Progress update
                 if (i + 1) % 10 == 0:
-                    logger.info(f"Progress: {i + 1}/{len(self.state_codes)} states processed")
+                    logger.info(f"Progress: {i + 1}/{len(states)} states processed")
                     
             except Exception as e:
                 logger.error(f"Failed to process {state_code}: {e}")
                 failed_states.append(state_code)
         
         # Save combined data
-        if all_incidents:
-            # Convert to DataFrame and save
-            df = pd.DataFrame(all_incidents)
-            
-            # Save as CSV
-            csv_file = self.output_dir / f"fbi_hate_crimes_{from_date.replace('-', '')}_{to_date.replace('-', '')}.csv"
-            df.to_csv(csv_file, index=False)
+        if all_incidents or not existing.empty:
+            # Merge the new months into the stored dataset; with none, it is only
+            # written if it was seeded from elsewhere
+            if all_incidents or not store_path(self.dataset_file).exists():
+                df = self.merge_months(existing, pd.DataFrame(all_incidents) if all_incidents else existing.iloc[:0])
+                store_file = write_incidents(df, self.dataset_file)
+            else:
+                df, store_file = existing, store_path(self.dataset_file)
             
             # Save summary
+            months = pd.to_datetime(df['month_year'], format='%m-%Y')
             summary = {
                 'collection_timestamp': datetime.now().isoformat(),
-                'date_range': f"{from_date} to {to_date}",
-                'total_incidents': len(all_incidents),
+                'date_range': f"{months.min().strftime('%m-%Y')} to {months.max().strftime('%m-%Y')}",
+                'total_incidents': len(df),
                 'successful_states': len(successful_states),
                 'failed_states': len(failed_states),
                 'successful_state_codes': successful_states,
                 'failed_state_codes': failed_states,
-                'monthly_data_points': len(all_incidents),
-                'states_covered': len(successful_states)
+                'monthly_data_points': len(df),
+                'new_monthly_data_points': len(all_incidents),
+                'requested_windows': {code: f"{w[0]} to {w[1]}" for code, w in windows.items()},
+                'states_covered': df['state'].nunique(),
+                'last_refresh_date': last_refresh,
+                'output_file': str(store_file),
+                'responses_not_modified': self.response_cache.not_modified,
+                'responses_downloaded': self.response_cache.downloaded
             }
             
-            summary_file = self.output_dir / "fbi_collection_summary.json"
-            with open(summary_file, 'w') as f:
+            with open(self.summary_file, 'w') as f:
                 json.dump(summary, f, indent=2)
             
             logger.info(f"🎉 FBI Collection Complete!")
             logger.info(f"   ✅ {len(successful_states)} states successful")
             logger.info(f"   ❌ {len(failed_states)} states failed")
-            logger.info(f"   📊 {len(all_incidents)} total monthly data points")
-            logger.info(f"   💾 Saved to: {csv_file}")
+            logger.info(f"   📊 {len(all_incidents)} new monthly data points, {len(df)} in total")
+            logger.info(f"   ♻️ {self.response_cache.not_modified} responses not modified, "
+                        f"{self.response_cache.downloaded} downloaded")
+            logger.info(f"   💾 Saved to: {store_file}")
             
             return df
         else:
@@ -188,11 +394,9 @@ class FBIDataCollector:
         # Test with NY to see latest available data
         try:
             url = f"{self.base_url}/NY/?from=01-2023&to=12-2023&type=counts"
-            response = requests.get(url, timeout=10)
+            status_code, data = self.get_json(url)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 if 'cde_properties' in data:
                     max_date = data['cde_properties'].get('max_data_date', {}).get('UCR', 'Unknown')
                     last_refresh = data['cde_properties'].get('last_refresh_date', {}).get('UCR', 'Unknown')
@@ -206,21 +410,60 @@ class FBIDataCollector:
             logger.warning(f"Could not check latest data info: {e}")
         
         return None, None
+    
+    def sweep_is_current(self, last_refresh) -> bool:
+        """True if CDE has not refreshed since the last sweep, which completed and whose output is still there
+
+        A sweep with failed states is never current, so the next run
+        requests the months those states are still missing.
+        """
+        if last_refresh in (None, 'Unknown'):
+            return False
+        try:
+            with open(self.summary_file, 'r') as f:
+                summary = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if summary.get('failed_state_codes'):
+            logger.info(f"Last sweep failed for {len(summary['failed_state_codes'])} states, retrying them")
+            return False
+        return summary.get('last_refresh_date') == last_refresh and Path(summary.get('output_file', '')).exists()
 
 def main():
     """Main collection function"""
     
+    parser = argparse.ArgumentParser(description='FBI Crime Data Explorer Collector')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='CDE hate crime state endpoint (e.g. a local stand-in server)')
+    parser.add_argument('--max-in-flight', type=int, default=4, help='States to request at the same time')
+    parser.add_argument('--rate', type=float, default=2.0, help='Maximum requests per second')
+    parser.add_argument('--force', action='store_true', help='Sweep all states even if CDE has not refreshed')
+    parser.add_argument('--full-range', action='store_true',
+                        help='Ignore stored months and collect again from 01-2022 through the latest CDE month')
+    args = parser.parse_args()
+    
     print("🏛️ FBI Crime Data Explorer Collector")
     print("=" * 40)
     
-    collector = FBIDataCollector()
+    collector = FBIDataCollector(args.base_url, args.max_in_flight, args.rate)
     
     # Check latest data availability
     max_date, last_refresh = collector.get_latest_data_info()
     
-    # Collect data
-    # Default: collect 2022-2023 data (adjust based on availability)
-    df = collector.collect_all_states(from_date="01-2022", to_date="12-2023")
+    # Nothing to do if CDE has not refreshed since the last sweep
+    if not args.force and collector.sweep_is_current(last_refresh):
+        print(f"\n✅ FBI data unchanged since last refresh ({last_refresh}), skipping state sweep")
+        return
+    
+    # Only request the months after each state's latest stored month,
+    # up to the latest month CDE has (from 01-2022 when starting from scratch)
+    existing = pd.DataFrame() if args.full_range else collector.load_monthly_dataset()
+    windows = collector.month_windows(existing, max_date)
+    if not windows:
+        print(f"\n✅ FBI data already current through {max_date}")
+        return
+    print(f"📥 Requesting new months for {len(windows)} states")
+    
+    df = collector.collect_all_states(last_refresh=last_refresh, windows=windows, existing=existing)
     
     if df is not None:
         print(f"\n📊 Collection Summary:")
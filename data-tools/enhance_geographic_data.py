@@ -8,6 +8,8 @@ import pandas as pd
 import json
 from pathlib import Path
 
+from incident_store import load_incidents, write_incidents, export_csv
+
 def enhance_geographic_data():
     """Enhance the integrated dataset with proper geographic information"""
     
@@ -15,7 +17,7 @@ def enhance_geographic_data():
     print("=" * 50)
     
     # Load current dataset
-    df = pd.read_csv('data/integrated/integrated_hate_crimes.csv')
+    df = load_incidents('data/integrated/integrated_hate_crimes')
     print(f"📊 Processing {len(df):,} incidents")
     
     # Create enhanced copy
@@ -133,8 +135,7 @@ def enhance_geographic_data():
         print(f"   {row['city']}, {row['state']}: {row['incident_count']:,} incidents @ ({row['latitude']:.4f}, {row['longitude']:.4f})")
     
     # 5. Save enhanced data
-    output_file = 'data/integrated/integrated_hate_crimes_enhanced.csv'
-    enhanced_df.to_csv(output_file, index=False)
+    output_file = export_csv(write_incidents(enhanced_df, 'data/integrated/integrated_hate_crimes_enhanced'))
     print(f"\n💾 Enhanced dataset saved to: {output_file}")
     
     # Save geographic summary for mapping
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Incident Store
+Columnar Parquet storage shared by the collectors, the integrator and the
+geographic enhancer, with CSV exports for the website
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+import logging
+from typing import Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIX = '.parquet'
+
+# Low-cardinality text is dictionary encoded, free text stays plain
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+INCIDENT_SCHEMA = pa.schema([
+    ('date', pa.string()),
+    ('month_year', DICTIONARY),
+    ('state', DICTIONARY),
+    ('state_name', DICTIONARY),
+    ('county', DICTIONARY),
+    ('city', DICTIONARY),
+    ('borough', DICTIONARY),
+    ('bias_motivation', DICTIONARY),
+    ('bias_motivation_cleaned', DICTIONARY),
+    ('source', DICTIONARY),
+    ('incident_id', pa.string()),
+    ('offense_type', DICTIONARY),
+    ('victim_type', DICTIONARY),
+    ('adl_category', DICTIONARY),
+    ('data_type', DICTIONARY),
+    ('incidents_corrected', pa.float64()),
+    ('incident_count', pa.int64()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('description', pa.string()),
+    ('verified', DICTIONARY),
+    ('raw_data', pa.string()),
+    ('raw_ref', pa.string()),
+    ('collection_date', pa.string()),
+])
+
+def store_path(path: Union[str, Path]) -> Path:
+    """Store file for a table path, whatever suffix it was given with"""
+    return Path(path).with_suffix(STORE_SUFFIX)
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert an incident frame to an Arrow table with the fixed schema
+
+    Columns keep their frame order.  Known columns are cast to their schema
+    type, except that integer frame columns stay integers where the schema
+    has a float (FBI counts in incidents_corrected).  Extra numeric and
+    boolean columns keep their type and other extra columns are stored as
+    plain strings.  Empty strings become nulls, as they would after a CSV
+    round trip.
+    """
+    arrays, fields = [], []
+    for col in df.columns:
+        name = str(col)
+        if name in INCIDENT_SCHEMA.names:
+            field = INCIDENT_SCHEMA.field(name)
+            if pa.types.is_floating(field.type) and pd.api.types.is_integer_dtype(df[col]):
+                field = pa.field(name, pa.int64())
+        elif pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+            array = pa.array(df[col], from_pandas=True)
+            arrays.append(array)
+            fields.append(pa.field(name, array.type))
+            continue
+        else:
+            field = pa.field(name, pa.string())
+
+        if pa.types.is_integer(field.type):
+            values = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(df[col], errors='coerce').astype('float64')
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        else:
+            values = df[col].astype(object)
+            missing = (values.isna() | (values == '')).to_numpy()
+            values = values.astype(str).astype(object)
+            values[missing] = None
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+            arrays.append(array.dictionary_encode() if pa.types.is_dictionary(field.type) else array)
+        fields.append(field)
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def write_incidents(df: pd.DataFrame, path: Union[str, Path]) -> Path:
+    """Write an incident frame to the store and return the file written"""
+    output_file = store_path(path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(to_arrow(df), output_file, compression='zstd')
+    logger.debug(f"Stored {len(df)} incidents in {output_file}")
+    return output_file
+
+def to_frame(table: Union[pa.Table, pa.RecordBatch], categorical: bool = False) -> pd.DataFrame:
+    """Convert stored rows back to an incident frame
+
+    Integer columns with missing values come back as nullable Int64 so
+    counts are not turned into floats.  Dictionary columns come back as
+    plain object columns unless ``categorical`` is set.
+    """
+    df = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    for col in df.columns[df.dtypes == 'Int64']:
+        if not df[col].isna().any():
+            df[col] = df[col].astype('int64')
+    if not categorical:
+        for col in df.columns[df.dtypes == 'category']:
+            df[col] = df[col].astype(object)
+    return df
+
+def read_incidents(path: Union[str, Path], columns: List[str] = None, categorical: bool = False) -> pd.DataFrame:
+    """Read an incident table from the store (see to_frame for column types)"""
+    return to_frame(pq.read_table(store_path(path), columns=columns), categorical=categorical)
+
+def iter_incident_batches(path: Union[str, Path], batch_size: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Read a stored table (or its legacy CSV) in frames of at most ``batch_size`` rows"""
+    path = Path(path)
+    if store_path(path).exists():
+        for batch in pq.ParquetFile(store_path(path)).iter_batches(batch_size=batch_size):
+            yield to_frame(batch)
+    elif path.with_suffix('.csv').exists():
+        yield from pd.read_csv(path.with_suffix('.csv'), chunksize=batch_size)
+
+class IncidentWriter:
+    """Writes an incident table one batch (row group) at a time
+
+    The first batch fixes the columns; later batches are aligned to them,
+    with missing columns left empty.  The file only replaces ``path`` once
+    the writer is closed without an error.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = store_path(path)
+        self.tmp_file = self.path.with_suffix('.tmp' + STORE_SUFFIX)
+        self.writer = None
+        self.columns = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        """Append a batch of incidents"""
+        if df.empty:
+            return
+        if self.writer is None:
+            self.columns = list(df.columns)
+            table = to_arrow(df)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.writer = pq.ParquetWriter(self.tmp_file, table.schema, compression='zstd')
+        else:
+            table = to_arrow(df.reindex(columns=self.columns)).cast(self.writer.schema)
+        self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self, commit: bool = True):
+        """Finish the file and move it into place (or discard it)"""
+        if self.writer is not None:
+            self.writer.close()
+            if commit:
+                self.tmp_file.replace(self.path)
+            else:
+                self.tmp_file.unlink()
+        logger.debug(f"Stored {self.rows} incidents in {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+def load_incidents(path: Union[str, Path], categorical: bool = False) -> pd.DataFrame:
+    """Read a table from the store, falling back to a legacy CSV of the same name
+
+    Returns an empty frame when neither file exists.
+    """
+    path = Path(path)
+    if store_path(path).exists():
+        return read_incidents(path, categorical=categorical)
+    csv_file = path.with_suffix('.csv')
+    if csv_file.exists():
+        logger.info(f"No store file for {csv_file.name}, reading legacy CSV")
+        return pd.read_csv(csv_file)
+    return pd.DataFrame()
+
+def export_csv(path: Union[str, Path], csv_file: Union[str, Path] = None) -> Path:
+    """Export a stored table to CSV (next to it unless ``csv_file`` is given)"""
+    csv_file = Path(csv_file) if csv_file else store_path(path).with_suffix('.csv')
+    read_incidents(path).to_csv(csv_file, index=False, encoding='utf-8')
+    return csv_file
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Known Incident IDs
+Persisted Bloom filter of incident IDs already ingested, so collectors can
+stop paging once they reach data they have seen before
+"""
+
+import math
+import uuid
+import hashlib
+import numpy as np
+from pathlib import Path
+import logging
+from typing import Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+# Fields that carry an ADL incident's ID, in order of preference
+ADL_ID_FIELDS = ['id', 'incident_id', 'ID']
+
+def record_id(record: dict, fields: List[str] = ADL_ID_FIELDS) -> str:
+    """First non-empty ID field of a record, or '' if it has none"""
+    for field in fields:
+        value = record.get(field)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ''
+
+class KnownIdFilter:
+    """Bloom filter of incident IDs, saved to an ``.npz`` file
+
+    The filter is sized for ``capacity`` IDs at ``error_rate``.  A lookup
+    never misses an ID that was added; it can report an unseen ID as known
+    with roughly the estimated false-positive rate, and that rate grows once
+    more than ``capacity`` IDs are added.  The sizing of an existing file
+    wins over the arguments.
+    """
+
+    def __init__(self, path: Union[str, Path], capacity: int = 200_000, error_rate: float = 1e-6):
+        self.path = Path(path)
+        if self.path.exists():
+            with np.load(self.path) as saved:
+                self.bits = saved['bits']
+                self.num_bits = int(saved['num_bits'])
+                self.num_hashes = int(saved['num_hashes'])
+                self.capacity = int(saved['capacity'])
+                self.count = int(saved['count'])
+        else:
+            self.capacity = capacity
+            self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+            self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+            self.count = 0
+
+    def positions(self, incident_id) -> List[int]:
+        """Bit positions for an ID (double hashing over one BLAKE2 digest)"""
+        digest = hashlib.blake2b(str(incident_id).strip().encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, incident_id) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self.positions(incident_id))
+
+    def add(self, incident_id) -> bool:
+        """Add an ID; returns False if it was (probably) known already"""
+        new = False
+        for p in self.positions(incident_id):
+            if not self.bits[p >> 3] & (1 << (p & 7)):
+                self.bits[p >> 3] |= np.uint8(1 << (p & 7))
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def update(self, incident_ids: Iterable) -> int:
+        """Add IDs and return how many were new"""
+        added = sum(self.add(i) for i in incident_ids)
+        if self.count > self.capacity:
+            logger.warning(f"Known-ID filter {self.path.name} holds {self.count} IDs, over its capacity of "
+                           f"{self.capacity}; false positives will rise")
+        return added
+
+    def save(self):
+        """Write the filter (atomically, so an interrupted run leaves the old file)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix('.tmp.npz')
+        np.savez(tmp_file, bits=self.bits, num_bits=self.num_bits, num_hashes=self.num_hashes,
+                 capacity=self.capacity, count=self.count)
+        tmp_file.replace(self.path)
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive rate for the IDs added so far"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def measured_false_positive_rate(self, samples: int = 10_000) -> float:
+        """Share of random, never-added IDs the filter reports as known"""
+        return sum(uuid.uuid4().hex in self for _ in range(samples)) / samples
+
+    def report(self) -> Dict:
+        """Size, fill and false-positive rates of the filter"""
+        return {
+            'ids': self.count,
+            'capacity': self.capacity,
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'memory_bytes': int(self.bits.nbytes),
+            'fill_ratio': round(float(np.unpackbits(self.bits).sum()) / self.num_bits, 6),
+            'estimated_false_positive_rate': self.estimated_false_positive_rate(),
+            'measured_false_positive_rate': self.measured_false_positive_rate(),
+        }
@@ -8,16 +8,110 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import argparse
 from pathlib import Path
 import logging
 from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from fuzzywuzzy import fuzz
 import geopy.distance
+from description_index import DescriptionIndex, ratio_scores
+from incident_store import load_incidents, read_incidents, write_incidents, export_csv, STORE_SUFFIX
+from date_parser import parse_dates, merge_reports, describe_report
+from bias_classifier import BiasClassifier
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_MILES = 3958.7613
+
+# Typed incident table: dates are int32 days since the epoch, written back
+# out as DATE_FORMAT strings only when the CSV is saved
+DATE_FORMAT = '%m/%d/%Y'
+MISSING_DAY = np.iinfo(np.int32).min
+CATEGORICAL_COLUMNS = ['state', 'source', 'bias_motivation_cleaned']
+TYPED_COLUMNS = ['day', 'lat', 'lon']
+
+# Columns where a missing value matches any value during deduplication
+WILDCARD_COLUMNS = ['state', 'bias_motivation_cleaned']
+
+def is_missing(value) -> bool:
+    """True for None, NaN and blank strings, which all mean the value is unknown"""
+    return not value.strip() if isinstance(value, str) else bool(pd.isna(value))
+
+def to_day_ordinals(dates: pd.Series, report: Dict = None) -> Tuple[np.ndarray, Dict]:
+    """Parse a date column to int32 day ordinals, MISSING_DAY where unparseable
+
+    Returns the ordinals and this column's parse report, whose counts are
+    also added to ``report`` if one is given.
+    """
+    parsed, parse_report = parse_dates(dates)
+    if report is not None:
+        merge_reports(report, parse_report)
+    days = (parsed - pd.Timestamp(0)).dt.days
+    return days.fillna(MISSING_DAY).to_numpy(dtype=np.int32), parse_report
+
+def format_day_ordinals(days: pd.Series) -> pd.Series:
+    """Render int32 day ordinals as DATE_FORMAT strings, NaN where missing"""
+    days = pd.Series(days)
+    parsed = pd.to_datetime(days.where(days != MISSING_DAY), unit='D')
+    return parsed.dt.strftime(DATE_FORMAT)
+
+# Which source pairs can describe the same incident and which match rules
+# they use.  With distinct_ids, two records of the same source whose
+# incident IDs are both present and differ are never duplicates (police
+# complaint numbers).  An entry may also set description_threshold or
+# location_threshold to override the integrator defaults for that pair.
+# Pairs of known sources that are not listed never become candidate pairs:
+# FBI rows are monthly state totals, not incidents, and NYPD and LAPD never
+# overlap, even when a record's missing state would otherwise pair them.
+SOURCE_PAIR_POLICY = {
+    ('ADL', 'ADL'): {'fields': ['incident_id', 'description', 'location']},
+    ('NYPD', 'NYPD'): {'fields': ['incident_id', 'description', 'location'], 'distinct_ids': True},
+    ('LAPD', 'LAPD'): {'fields': ['incident_id', 'description', 'location'], 'distinct_ids': True},
+    ('FBI', 'FBI'): {'fields': ['incident_id']},
+    ('ADL', 'NYPD'): {'fields': ['description', 'location']},
+    ('ADL', 'LAPD'): {'fields': ['description', 'location']},
+}
+
+# Sources outside the table are compared with every rule
+DEFAULT_PAIR_POLICY = {'fields': ['incident_id', 'description', 'location']}
+
+def score_partition(integrator: 'MultiSourceIntegrator', df: pd.DataFrame,
+                    pos_a: np.ndarray, pos_b: np.ndarray) -> List[Tuple[int, int, str]]:
+    """Process pool entry point for MultiSourceIntegrator.score_candidate_pairs"""
+    return integrator.score_candidate_pairs(df, pos_a, pos_b)
+
+class UnionFind:
+    """Disjoint-set forest over record positions"""
+    
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+    
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+    
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+    
+    def roots(self) -> np.ndarray:
+        """Root of every item; the lowest position in each set"""
+        return np.array([self.find(item) for item in range(len(self.parent))], dtype=np.int64)
+
+def haversine_miles(lat_a: np.ndarray, lon_a: np.ndarray, lat_b: np.ndarray, lon_b: np.ndarray) -> np.ndarray:
+    """Great-circle distance in miles between arrays of coordinate pairs"""
+    lat_a, lon_a, lat_b, lon_b = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat_a, lon_a, lat_b, lon_b))
+    a = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
 class MultiSourceIntegrator:
     """Integrates multiple hate crime data sources with advanced deduplication"""
     
@@ -26,12 +120,32 @@ class MultiSourceIntegrator:
         self.output_dir = Path("data/integrated")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Rows parsed per date format, by source
+        self.date_parse_report = {}
+        self.bias_classifier = BiasClassifier()
+        
+        # Deduplication windows (days)
+        self.match_window_days = 3
+        self.id_match_window_days = 30
+        
+        # Geographic proximity: haversine is within ~0.5% of the ellipsoidal
+        # distance, so exact mode only re-checks pairs inside that band
+        self.max_distance_miles = 2.0
+        self.exact_distance = False
+        self.exact_distance_band = 0.01
+        
+        # Text similarity (fuzz.ratio must exceed these)
+        self.description_similarity_threshold = 80
+        self.location_similarity_threshold = 85
+        
+        # Worker processes for partitioned dedup (1 runs serially)
+        self.dedup_workers = 1
+        
     def load_existing_data(self) -> pd.DataFrame:
         """Load existing NYPD/LAPD unified data"""
         try:
-            existing_file = self.data_dir / "unified_hate_crimes_corrected.csv"
-            if existing_file.exists():
-                df = pd.read_csv(existing_file)
+            df = load_incidents(self.data_dir / "unified_hate_crimes_corrected")
+            if not df.empty:
                 logger.info(f"Loaded {len(df)} existing incidents from NYPD/LAPD")
                 return df
             else:
@@ -44,9 +158,8 @@ class MultiSourceIntegrator:
     def load_adl_data(self) -> pd.DataFrame:
         """Load ADL data if available"""
         try:
-            adl_file = self.data_dir / "adl" / "adl_unified.csv"
-            if adl_file.exists():
-                df = pd.read_csv(adl_file)
+            df = load_incidents(self.data_dir / "adl" / "adl_unified")
+            if not df.empty:
                 logger.info(f"Loaded {len(df)} ADL incidents")
                 return df
             else:
@@ -59,12 +172,13 @@ class MultiSourceIntegrator:
     def load_fbi_data(self) -> pd.DataFrame:
         """Load FBI data if available"""
         try:
-            # Look for FBI data files
-            fbi_files = list(self.data_dir.glob("fbi/fbi_hate_crimes*.csv"))
+            # Look for FBI data files (store files, or CSVs from older collections)
+            fbi_files = list(self.data_dir.glob(f"fbi/fbi_hate_crimes*{STORE_SUFFIX}")) or \
+                list(self.data_dir.glob("fbi/fbi_hate_crimes*.csv"))
             if fbi_files:
                 # Use the most recent file
                 fbi_file = max(fbi_files, key=lambda x: x.stat().st_mtime)
-                df = pd.read_csv(fbi_file)
+                df = read_incidents(fbi_file) if fbi_file.suffix == STORE_SUFFIX else pd.read_csv(fbi_file)
                 logger.info(f"Loaded {len(df)} FBI monthly data points from {fbi_file.name}")
                 
                 # Transform FBI data to match our schema
@@ -121,173 +235,669 @@ class MultiSourceIntegrator:
                 if col not in fbi_df.columns:
                     fbi_df[col] = ''
         
-        # Standardize date formats
-        existing_df['date'] = pd.to_datetime(existing_df['date'], errors='coerce').dt.strftime('%m/%d/%Y')
+        # Parse dates once into day ordinals
+        existing_df['day'] = self.parse_days(existing_df)
         if not adl_df.empty:
-            adl_df['date'] = pd.to_datetime(adl_df['date'], errors='coerce').dt.strftime('%m/%d/%Y')
+            adl_df['day'] = self.parse_days(adl_df)
         if fbi_df is not None and not fbi_df.empty:
-            fbi_df['date'] = pd.to_datetime(fbi_df['date'], errors='coerce').dt.strftime('%m/%d/%Y')
+            fbi_df['day'] = self.parse_days(fbi_df)
         
         # Standardize bias motivations
-        existing_df['bias_motivation_cleaned'] = existing_df['bias_motivation'].apply(self.clean_bias_motivation)
+        existing_df['bias_motivation_cleaned'] = self.clean_bias_column(existing_df['bias_motivation'])
         if not adl_df.empty:
-            adl_df['bias_motivation_cleaned'] = adl_df['bias_motivation'].apply(self.clean_bias_motivation)
+            adl_df['bias_motivation_cleaned'] = self.clean_bias_column(adl_df['bias_motivation'])
         if fbi_df is not None and not fbi_df.empty:
-            fbi_df['bias_motivation_cleaned'] = fbi_df['bias_motivation'].apply(self.clean_bias_motivation)
+            fbi_df['bias_motivation_cleaned'] = self.clean_bias_column(fbi_df['bias_motivation'])
+        self.bias_classifier.save()
         
         return existing_df, adl_df, fbi_df if fbi_df is not None else pd.DataFrame()
     
+    def parse_days(self, df: pd.DataFrame) -> np.ndarray:
+        """Day ordinals for a frame's dates, with date formats detected per source"""
+        days = np.full(len(df), MISSING_DAY, dtype=np.int32)
+        sources = df['source'].fillna('').astype(str)
+        for source, rows in sources.groupby(sources, sort=False).indices.items():
+            report = self.date_parse_report.setdefault(source or 'unknown', {})
+            days[rows], parse_report = to_day_ordinals(df['date'].iloc[rows], report)
+            logger.info(f"Parsed {source or 'unknown'} dates ({describe_report(parse_report)})")
+        return days
+    
+    def build_incident_table(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine standardized frames into the typed incident table
+
+        Dates live in the int32 ``day`` column, coordinates in float32
+        ``lat``/``lon`` columns and state, source and cleaned bias are
+        categoricals.  The original latitude/longitude values ride along
+        untouched so the CSV output keeps their full precision.
+        """
+        table = pd.concat(frames, ignore_index=True).drop(columns=['date'])
+        table['day'] = table['day'].astype(np.int32)
+        table['lat'] = pd.to_numeric(table['latitude'], errors='coerce').astype(np.float32)
+        table['lon'] = pd.to_numeric(table['longitude'], errors='coerce').astype(np.float32)
+        # Blank and None states or biases become NaN, the one missing value blocking and matching know
+        for col in WILDCARD_COLUMNS:
+            table[col] = table[col].where(~table[col].map(is_missing))
+        for col in CATEGORICAL_COLUMNS:
+            table[col] = table[col].astype('category')
+        
+        # Chronological order (undated records last)
+        undated = table['day'] == MISSING_DAY
+        return pd.concat([table[~undated].sort_values('day', kind='mergesort'), table[undated]], ignore_index=True)
+    
+    def to_output_frame(self, table: pd.DataFrame) -> pd.DataFrame:
+        """Convert the typed incident table back to the CSV schema"""
+        output_df = table.drop(columns=TYPED_COLUMNS)
+        output_df.insert(0, 'date', format_day_ordinals(table['day']).values)
+        return output_df
+    
     def clean_bias_motivation(self, bias: str) -> str:
         """Clean and standardize bias motivation categories"""
-        if pd.isna(bias) or bias == '':
-            return 'UNKNOWN'
-        
-        bias_str = str(bias).upper().strip()
-        
-        # Standard mappings
-        if any(term in bias_str for term in ['JEWISH', 'JUDAISM', 'ANTISEMIT', 'ANTI-SEMIT']):
-            return 'ANTI-JEWISH'
-        elif any(term in bias_str for term in ['MUSLIM', 'ISLAM', 'ISLAMIC']):
-            return 'ANTI-ISLAMIC'
-        elif any(term in bias_str for term in ['BLACK', 'AFRICAN']):
-            return 'ANTI-BLACK'
-        elif any(term in bias_str for term in ['HISPANIC', 'LATINO']):
-            return 'ANTI-HISPANIC'
-        elif any(term in bias_str for term in ['ASIAN', 'PACIFIC']):
-            return 'ANTI-ASIAN'
-        elif any(term in bias_str for term in ['WHITE', 'CAUCASIAN']):
-            return 'ANTI-WHITE'
-        elif any(term in bias_str for term in ['GAY', 'LESBIAN', 'LGBTQ', 'TRANSGENDER', 'BISEXUAL']):
-            return 'ANTI-LGBTQ'
-        elif any(term in bias_str for term in ['CATHOLIC', 'CHRISTIAN', 'PROTESTANT']):
-            return 'ANTI-CHRISTIAN'
+        category = self.bias_classifier.classify(bias)
+        return 'UNKNOWN' if category is None else category
+    
+    def clean_bias_column(self, biases: pd.Series) -> pd.Series:
+        """Clean a bias motivation column, classifying each distinct value once"""
+        return self.bias_classifier.classify_column(biases).fillna('UNKNOWN')
+    
+    def build_candidate_pairs(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Block records and return the (i, j) positions worth comparing
+
+        is_duplicate can only match records that share a state and cleaned
+        bias and sit within ``match_window_days`` of each other, or records
+        from the same source with the same incident ID.  Records are grouped
+        into blocks on those keys (dates bucketed by the match window) and
+        pairs are only built inside a block and its neighbouring date bucket.
+        A missing state or bias matches any value, so records lacking one
+        are paired with every record in their date window instead.  Pairs
+        whose sources SOURCE_PAIR_POLICY rules out are dropped and counted
+        in ``policy_skipped_pairs``.
+        """
+        keys = pd.DataFrame({
+            'pos': np.arange(len(df)),
+            'day': df['day'].to_numpy(),
+            'state': df['state'].cat.codes.to_numpy(),
+            'bias': df['bias_motivation_cleaned'].cat.codes.to_numpy(),
+            'source': df['source'].cat.codes.to_numpy(),
+            'incident_id': df['incident_id'],
+        })
+        keys = keys[keys['day'] != MISSING_DAY].copy()
+        
+        window = self.match_window_days
+        keys['bucket'] = keys['day'] // window
+        wildcard = (keys['state'] < 0) | (keys['bias'] < 0)
+        blockable = keys[~wildcard]
+        
+        # A record in bucket k + 1 is also offered to bucket k so pairs that
+        # straddle a bucket boundary are still generated
+        neighbours = pd.concat([blockable, blockable.assign(bucket=blockable['bucket'] - 1)])
+        blocked = blockable.merge(neighbours, on=['state', 'bias', 'bucket'], suffixes=('_a', '_b'))
+        
+        # Records missing a state or bias meet every record in the buckets
+        # around theirs; pairs with a conflicting known value are dropped
+        spread = pd.concat([keys[wildcard].assign(bucket=keys['bucket'][wildcard] + shift) for shift in (-1, 0, 1)])
+        open_pairs = spread.merge(keys, on='bucket', suffixes=('_a', '_b'))
+        compatible = np.ones(len(open_pairs), dtype=bool)
+        for key in ['state', 'bias']:
+            a, b = open_pairs[f'{key}_a'], open_pairs[f'{key}_b']
+            compatible &= ((a < 0) | (b < 0) | (a == b)).to_numpy()
+        blocked = pd.concat([blocked[['pos_a', 'pos_b', 'day_a', 'day_b']],
+                             open_pairs[compatible][['pos_a', 'pos_b', 'day_a', 'day_b']]])
+        blocked = blocked[(blocked['day_a'] - blocked['day_b']).abs() <= window]
+        
+        # Same-source incident IDs match regardless of state or bias
+        with_ids = keys[keys['incident_id'].notna() & (keys['incident_id'].astype(str) != '')]
+        same_id = with_ids.merge(with_ids, on=['source', 'incident_id'], suffixes=('_a', '_b'))
+        same_id = same_id[(same_id['day_a'] - same_id['day_b']).abs() <= self.id_match_window_days]
+        
+        pos_a = np.concatenate([blocked['pos_a'].values, same_id['pos_a'].values])
+        pos_b = np.concatenate([blocked['pos_b'].values, same_id['pos_b'].values])
+        pairs = np.unique(np.stack([np.minimum(pos_a, pos_b), np.maximum(pos_a, pos_b)], axis=1), axis=0)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        
+        # Source pairs the policy rules out never become candidates
+        combos, labels = self.source_combinations(df, pairs[:, 0], pairs[:, 1])
+        compatible = np.array([self.pair_policy(*label.split('|')) is not None for label in labels], dtype=bool)
+        allowed = compatible[combos] if len(labels) else np.zeros(0, dtype=bool)
+        skipped = np.bincount(combos[~allowed], minlength=len(labels))
+        self.policy_skipped_pairs = {label: int(skipped[k]) for k, label in enumerate(labels) if skipped[k]}
+        pairs = pairs[allowed]
+        
+        total_pairs = len(df) * (len(df) - 1) // 2
+        if self.exact_distance:
+            logger.info(f"Distance check: haversine, exact geodesic within "
+                        f"{self.max_distance_miles * self.exact_distance_band:.2f} miles of the "
+                        f"{self.max_distance_miles} mile cutoff")
         else:
-            return bias_str
+            logger.info(f"Distance check: haversine, {self.max_distance_miles} mile cutoff")
+        logger.info(f"Blocking: {keys['bucket'].nunique()} date buckets ({int(wildcard.sum())} records without "
+                    f"state or bias), "
+                    f"{len(pairs)} candidate pairs, {total_pairs - len(pairs)} of {total_pairs} pairs skipped "
+                    f"({int(skipped.sum())} by the source pair policy)")
+        
+        return pairs[:, 0], pairs[:, 1]
     
-    def advanced_deduplication(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Advanced deduplication across multiple sources"""
-        logger.info("Starting advanced deduplication process")
+    def pair_policy(self, source_a: str, source_b: str) -> Dict:
+        """Comparison policy for a source pair, or None if the pair can never match"""
+        known_sources = {source for pair in SOURCE_PAIR_POLICY for source in pair}
+        pair = tuple(sorted([str(source_a), str(source_b)]))
+        if pair in SOURCE_PAIR_POLICY:
+            policy = SOURCE_PAIR_POLICY[pair]
+        elif pair[0] in known_sources and pair[1] in known_sources:
+            return None
+        else:
+            policy = DEFAULT_PAIR_POLICY
+        
+        return {
+            'fields': policy['fields'],
+            'distinct_ids': policy.get('distinct_ids', False),
+            'description_threshold': policy.get('description_threshold', self.description_similarity_threshold),
+            'location_threshold': policy.get('location_threshold', self.location_similarity_threshold),
+        }
+    
+    def source_combinations(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """Label each candidate pair with its source combination, e.g. 'ADL|NYPD'
+
+        Returns an index per pair into the list of combination labels.
+        """
+        names = np.array([''] + [str(c) for c in df['source'].cat.categories], dtype=object)
+        codes = df['source'].cat.codes.to_numpy().astype(np.int64) + 1
+        low = np.minimum(codes[pos_a], codes[pos_b])
+        high = np.maximum(codes[pos_a], codes[pos_b])
+        combos, index = np.unique(low * len(names) + high, return_inverse=True)
+        labels = [f"{names[c // len(names)]}|{names[c % len(names)]}" for c in combos]
+        return index.ravel(), labels
+    
+    def within_distance(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray) -> np.ndarray:
+        """Boolean mask of candidate pairs that pass the geographic proximity check
+
+        Pairs where either record lacks usable coordinates pass, as before.
+        """
+        lat = df['lat'].to_numpy()
+        lon = df['lon'].to_numpy()
+        
+        # Missing or zero coordinates skip the distance check
+        has_coords = np.isfinite(lat) & np.isfinite(lon) & (lat != 0) & (lon != 0)
+        comparable = has_coords[pos_a] & has_coords[pos_b]
         
-        duplicates_to_remove = set()
-        total_comparisons = 0
+        distance = np.full(len(pos_a), np.nan)
+        distance[comparable] = haversine_miles(lat[pos_a[comparable]], lon[pos_a[comparable]],
+                                               lat[pos_b[comparable]], lon[pos_b[comparable]])
         
-        # Sort by date for more efficient processing
-        df_sorted = df.sort_values('date').reset_index(drop=True)
+        if self.exact_distance:
+            band = self.max_distance_miles * self.exact_distance_band
+            near = np.flatnonzero(comparable & (np.abs(distance - self.max_distance_miles) <= band))
+            for k in near:
+                distance[k] = geopy.distance.geodesic((lat[pos_a[k]], lon[pos_a[k]]),
+                                                      (lat[pos_b[k]], lon[pos_b[k]])).miles
+            logger.debug(f"Exact distance re-checked for {len(near)} pairs near the {self.max_distance_miles} mile cutoff")
         
-        for i in range(len(df_sorted)):
-            if i in duplicates_to_remove:
+        return ~comparable | (distance <= self.max_distance_miles)
+    
+    def location_strings(self, df: pd.DataFrame) -> pd.Series:
+        """City and county text used for location name matching"""
+        return pd.Series([f"{city} {county}".lower() for city, county in zip(df['city'], df['county'])], index=df.index)
+    
+    def similar_locations(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray, threshold=None) -> np.ndarray:
+        """Mask of candidate pairs whose location names are similar enough to match
+
+        ``threshold`` may be a scalar or one threshold per pair.
+        """
+        threshold = self.location_similarity_threshold if threshold is None else np.asarray(threshold)
+        codes, texts = pd.factorize(self.location_strings(df))
+        texts = list(texts)
+        lengths = np.array([len(t.strip()) for t in texts])
+        
+        matches = np.zeros(len(pos_a), dtype=bool)
+        codes_a, codes_b = codes[pos_a], codes[pos_b]
+        comparable = np.flatnonzero((lengths[codes_a] > 5) & (lengths[codes_b] > 5))
+        scores = ratio_scores(texts, codes_a[comparable], codes_b[comparable])
+        matches[comparable] = scores > (threshold[comparable] if threshold.ndim else threshold)
+        return matches
+    
+    def link_matches(self, clusters: UnionFind, pos_a: np.ndarray, pos_b: np.ndarray,
+                     reasons: np.ndarray) -> np.ndarray:
+        """Merge matched pairs into ``clusters``; returns which matches were accepted
+
+        Incident ID matches always merge.  Description and location matches
+        use complete linkage: the sets already formed (stored clusters,
+        exact duplicates, ID matches) only merge when every set on one side
+        matched every set on the other, so a chain of near-matches cannot
+        pull distinct incidents into one cluster.
+        """
+        accepted = np.ones(len(pos_a), dtype=bool)
+        for a, b in zip(pos_a[reasons == 'incident_id'], pos_b[reasons == 'incident_id']):
+            clusters.union(a, b)
+        
+        fuzzy = np.flatnonzero(reasons != 'incident_id')
+        units = {}
+        linked = set()
+        for k in fuzzy:
+            unit_a, unit_b = clusters.find(pos_a[k]), clusters.find(pos_b[k])
+            linked.add((min(unit_a, unit_b), max(unit_a, unit_b)))
+            units[unit_a], units[unit_b] = [unit_a], [unit_b]
+        
+        for k in fuzzy:
+            root_a, root_b = clusters.find(pos_a[k]), clusters.find(pos_b[k])
+            if root_a == root_b:
                 continue
-                
-            incident_a = df_sorted.iloc[i]
-            
-            # Only compare with incidents within 30 days
-            incident_date = pd.to_datetime(incident_a['date'], errors='coerce')
-            if pd.isna(incident_date):
+            if not all((min(u, v), max(u, v)) in linked for u in units[root_a] for v in units[root_b]):
+                accepted[k] = False
                 continue
+            clusters.union(root_a, root_b)
+            root = clusters.find(root_a)
+            units[root] = units.pop(root_a) + units.pop(root_b)
+        return accepted
+    
+    def partition_candidate_pairs(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray) -> List[np.ndarray]:
+        """Split the records touched by candidate pairs into independent partitions
+
+        Records are partitioned by state and year.  The rare pair that
+        crosses partitions (a same-ID match across states, or a match
+        across New Year) merges its two partitions, so no pair is ever
+        split and every partition resolves exactly as the serial scan would.
+        """
+        years = pd.to_datetime(df['day'].where(df['day'] != MISSING_DAY), unit='D').dt.year.fillna(-1)
+        labels = pd.Series(list(zip(df['state'].cat.codes, years))).factorize()[0]
+        
+        # Union partitions that share a pair
+        parent = np.arange(labels.max() + 1 if len(labels) else 0)
+        
+        def find(label):
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+        
+        crossing = labels[pos_a] != labels[pos_b]
+        for a, b in set(zip(labels[pos_a[crossing]], labels[pos_b[crossing]])):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        
+        touched = np.unique(np.concatenate([pos_a, pos_b]))
+        roots = np.array([find(label) for label in labels[touched]], dtype=np.int64)
+        partitions = [touched[roots == root] for root in np.unique(roots)]
+        
+        logger.info(f"Partitioned {len(touched)} records into {len(partitions)} partitions "
+                    f"({int(crossing.sum())} cross-partition pairs)")
+        return partitions
+    
+    def exact_duplicate_links(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Link exact duplicates to the first record sharing their key
+
+        Two keys are hashed: ``(source, incident_id)`` and, for dated
+        records without an incident ID, a normalized content hash over
+        every column except collection metadata.  Records with different
+        IDs are never exact duplicates of each other.  Returns one row per duplicate with its
+        ``position``, the ``representative`` it collapses into and the
+        ``reason``.
+        """
+        positions = pd.Series(np.arange(len(df)))
+        links = []
+        
+        # Same source and incident ID
+        ids = df['incident_id'].astype(str).str.strip()
+        has_id = (df['incident_id'].notna() & (ids != '')).to_numpy()
+        id_keys = pd.DataFrame({'source': df['source'].astype(str).to_numpy(), 'incident_id': ids.to_numpy()})[has_id]
+        # dropna=False keeps rows without a source; they would otherwise get no representative
+        first = positions[has_id].groupby([id_keys['source'], id_keys['incident_id']], dropna=False).transform('first')
+        duplicate = first != positions[has_id]
+        links.append(pd.DataFrame({'position': positions[has_id][duplicate], 'representative': first[duplicate],
+                                   'reason': 'exact_incident_id'}))
+        
+        # Normalized content, among dated records that have no ID to go by
+        remaining = ~has_id & (df['day'] != MISSING_DAY).to_numpy()
+        content = df.drop(columns=[c for c in ['incident_id', 'raw_data', 'raw_ref', 'collection_date', 'lat', 'lon']
+                                   if c in df.columns])[remaining]
+        normalized = content.astype(str).apply(lambda col: col.str.strip().str.lower().str.replace(r'\s+', ' ', regex=True))
+        content_hash = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        first = positions[remaining].groupby(content_hash).transform('first')
+        duplicate = first != positions[remaining]
+        links.append(pd.DataFrame({'position': positions[remaining][duplicate], 'representative': first[duplicate],
+                                   'reason': 'exact_content'}))
+        
+        links = pd.concat(links, ignore_index=True)
+        logger.info(f"Exact-key pass: {int((links['reason'] == 'exact_incident_id').sum())} rows removed by "
+                    f"(source, incident_id), {int((links['reason'] == 'exact_content').sum())} by content hash")
+        return links
+    
+    def score_candidate_pairs(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray) -> List[Tuple[int, int, str]]:
+        """Score every candidate pair once and return the (i, j, reason) matches"""
+        records = df.to_dict('records')
+        matches = []
+        
+        # Per-pair rules and thresholds from the source pair policy
+        combos, labels = self.source_combinations(df, pos_a, pos_b)
+        policies = [self.pair_policy(*label.split('|')) for label in labels]
+        pair_policies = [policies[c] for c in combos]
+        uses = {field: np.array([field in p['fields'] for p in policies], dtype=bool)[combos]
+                for field in ['description', 'location']}
+        description_threshold = np.array([p['description_threshold'] for p in policies])[combos]
+        location_threshold = np.array([p['location_threshold'] for p in policies])[combos]
+        
+        nearby = self.within_distance(df, pos_a, pos_b)
+        
+        # Text similarity is scored in batches over the candidate pairs
+        description_index = DescriptionIndex(df['description'])
+        similar_descriptions = uses['description'] & description_index.similar(pos_a, pos_b, description_threshold)
+        similar_locations = uses['location'] & self.similar_locations(df, pos_a, pos_b, location_threshold)
+        
+        for i, j, within_distance, description_match, location_match, policy in zip(
+                pos_a, pos_b, nearby, similar_descriptions, similar_locations, pair_policies):
+            reason = self.match_reason(records[i], records[j], within_distance, description_match, location_match,
+                                       policy)
+            if reason:
+                matches.append((i, j, reason))
+        
+        return matches
+    
+    def select_survivors(self, df: pd.DataFrame, clusters: np.ndarray) -> np.ndarray:
+        """Pick one surviving record per cluster
+
+        ADL records win over police records in clusters that contain both;
+        otherwise the record with the longest description survives, and
+        ties go to the earliest record.
+        """
+        police = df['source'].isin(['NYPD', 'LAPD']).to_numpy()
+        adl = (df['source'] == 'ADL').to_numpy()
+        ranking = pd.DataFrame({
+            'cluster': clusters,
+            'adl_over_police': adl & pd.Series(police).groupby(clusters).transform('any').to_numpy(),
+            'description_length': [len(str(d)) for d in df['description']],
+            'position': np.arange(len(df)),
+        })
+        ranking = ranking.sort_values(['cluster', 'adl_over_police', 'description_length', 'position'],
+                                      ascending=[True, False, False, True], kind='mergesort')
+        survivor = np.zeros(len(df), dtype=bool)
+        survivor[ranking.drop_duplicates('cluster')['position'].to_numpy()] = True
+        return survivor
+    
+    def record_keys(self, df: pd.DataFrame) -> pd.Series:
+        """Stable key per record: content fingerprint plus occurrence number
+
+        Identical records share a fingerprint, so the occurrence suffix
+        numbers them in table order to keep every key unique.
+        """
+        content = df.drop(columns=['lat', 'lon']).astype(str)
+        fingerprints = pd.Series(pd.util.hash_pandas_object(content, index=False).to_numpy(dtype=np.uint64))
+        occurrence = fingerprints.groupby(fingerprints).cumcount()
+        return pd.Series([f"{fp:016x}-{n}" for fp, n in zip(fingerprints, occurrence)])
+    
+    def dedup_settings(self) -> Dict:
+        """Settings that invalidate the stored dedup state when changed"""
+        return {
+            'match_window_days': self.match_window_days,
+            'id_match_window_days': self.id_match_window_days,
+            'max_distance_miles': self.max_distance_miles,
+            'exact_distance': self.exact_distance,
+            'description_similarity_threshold': self.description_similarity_threshold,
+            'location_similarity_threshold': self.location_similarity_threshold,
+            'source_pair_policy': {'|'.join(pair): policy for pair, policy in SOURCE_PAIR_POLICY.items()},
+        }
+    
+    def load_dedup_state(self) -> pd.DataFrame:
+        """Load the cluster state saved by the previous run, if still valid"""
+        state_file = self.output_dir / "dedup_state.csv"
+        settings_file = self.output_dir / "dedup_state.json"
+        if not state_file.exists() or not settings_file.exists() or not (self.output_dir / "match_ledger.csv.gz").exists():
+            logger.info("No dedup state found - running full deduplication")
+            return None
+        
+        try:
+            with open(settings_file, 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+            if settings != self.dedup_settings():
+                logger.info("Dedup settings changed - running full deduplication")
+                return None
             
-            # Look ahead for potential duplicates
-            for j in range(i + 1, len(df_sorted)):
-                if j in duplicates_to_remove:
-                    continue
-                    
-                incident_b = df_sorted.iloc[j]
-                compare_date = pd.to_datetime(incident_b['date'], errors='coerce')
-                
-                if pd.isna(compare_date):
-                    continue
-                
-                # Stop if we're beyond 30 days
-                if (compare_date - incident_date).days > 30:
+            state = pd.read_csv(state_file, dtype={'record_key': str, 'source': str, 'incident_id': str,
+                                                 'cluster': str, 'survivor': bool})
+            logger.info(f"Loaded dedup state for {len(state)} records in {state['cluster'].nunique()} clusters")
+            return state
+        except Exception as e:
+            logger.error(f"Error loading dedup state: {e}")
+            return None
+    
+    def load_match_ledger(self) -> pd.DataFrame:
+        """Load the matched pairs recorded by the previous run"""
+        return pd.read_csv(self.output_dir / "match_ledger.csv.gz", dtype=str)
+    
+    def save_dedup_state(self, state: pd.DataFrame):
+        """Persist record fingerprints, cluster assignments, survivors and the match ledger"""
+        state.to_csv(self.output_dir / "dedup_state.csv", index=False)
+        self.match_ledger.to_csv(self.output_dir / "match_ledger.csv.gz", index=False)
+        with open(self.output_dir / "dedup_state.json", 'w', encoding='utf-8') as f:
+            json.dump(self.dedup_settings(), f, indent=2)
+    
+    def score_pairs(self, df: pd.DataFrame, pos_a: np.ndarray, pos_b: np.ndarray) -> pd.DataFrame:
+        """Score candidate pairs partition by partition; returns the matches as (a, b, reason) rows"""
+        # Partitions share no candidate pairs, so each one is scored on its own
+        partitions = self.partition_candidate_pairs(df, pos_a, pos_b)
+        jobs = []
+        for rows in partitions:
+            in_partition = np.isin(pos_a, rows)
+            jobs.append((df.iloc[rows],
+                         np.searchsorted(rows, pos_a[in_partition]),
+                         np.searchsorted(rows, pos_b[in_partition])))
+        
+        if self.dedup_workers > 1 and len(jobs) > 1:
+            logger.info(f"Scoring {len(jobs)} partitions across {self.dedup_workers} worker processes")
+            with ProcessPoolExecutor(max_workers=self.dedup_workers) as executor:
+                results = list(executor.map(score_partition, [self] * len(jobs), *zip(*jobs)))
+        else:
+            results = [self.score_candidate_pairs(*job) for job in jobs]
+        
+        return pd.DataFrame([(rows[i], rows[j], reason) for rows, matches in zip(partitions, results)
+                             for i, j, reason in matches], columns=['a', 'b', 'reason'])
+    
+    def advanced_deduplication(self, df: pd.DataFrame, previous_state: pd.DataFrame = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Advanced deduplication across multiple sources
+
+        Every candidate pair is scored once and matches are merged into
+        clusters with union-find under complete linkage (link_matches);
+        select_survivors keeps one record per cluster.  With
+        ``previous_state`` only pairs involving new or changed records are
+        scored; stored clusters they match are reopened and the rest are
+        reused, so the result equals a full run.
+        Returns the deduplicated table and the updated cluster state.
+        """
+        logger.info("Starting advanced deduplication process")
+        
+        # Keep chronological order (stable, undated records last)
+        undated = df['day'] == MISSING_DAY
+        df_sorted = pd.concat([df[~undated].sort_values('day', kind='mergesort'), df[undated]], ignore_index=True)
+        
+        keys = self.record_keys(df_sorted)
+        clusters = UnionFind(len(df_sorted))
+        is_new = np.ones(len(df_sorted), dtype=bool)
+        ledger = pd.DataFrame(columns=['record_a', 'record_b', 'reason'])
+        
+        if previous_state is not None:
+            known = pd.DataFrame({'record_key': keys}).merge(previous_state[['record_key', 'cluster']],
+                                                             on='record_key', how='left')
+            is_new = known['cluster'].isna().to_numpy()
+            stored_cluster = pd.factorize(known['cluster'])[0]
+            
+            # A cluster that lost a member may split, so it is re-scored from scratch
+            vanished = previous_state[~previous_state['record_key'].isin(keys)]
+            rescored = is_new | (~is_new & known['cluster'].isin(vanished['cluster']).to_numpy())
+        
+        # Exact duplicates collapse into their representative before fuzzy matching
+        exact = self.exact_duplicate_links(df_sorted)
+        exact_a, exact_b = exact['representative'].to_numpy(dtype=np.int64), exact['position'].to_numpy(dtype=np.int64)
+        for representative, position in zip(exact_a, exact_b):
+            clusters.union(representative, position)
+        
+        representatives = np.ones(len(df_sorted), dtype=bool)
+        representatives[exact_b] = False
+        representatives = np.flatnonzero(representatives)
+        pos_a, pos_b = self.build_candidate_pairs(df_sorted.iloc[representatives])
+        pos_a, pos_b = representatives[pos_a], representatives[pos_b]
+
+        
+        if previous_state is None:
+            matched = self.score_pairs(df_sorted, pos_a, pos_b)
+            scored = np.ones(len(pos_a), dtype=bool)
+        else:
+            # Under complete linkage a stored cluster only merges as separate
+            # members, so every stored cluster a rescored record matches is
+            # reopened too, until no match crosses into an unchanged cluster
+            scored = np.zeros(len(pos_a), dtype=bool)
+            matched = []
+            while True:
+                batch = ~scored & (rescored[pos_a] | rescored[pos_b])
+                matched.append(self.score_pairs(df_sorted, pos_a[batch], pos_b[batch]))
+                scored |= batch
+                links_a = np.concatenate([exact_a] + [m['a'].to_numpy(dtype=np.int64) for m in matched])
+                links_b = np.concatenate([exact_b] + [m['b'].to_numpy(dtype=np.int64) for m in matched])
+                crossing = rescored[links_a] != rescored[links_b]
+                if not crossing.any():
                     break
-                
-                total_comparisons += 1
-                
-                if self.is_duplicate(incident_a, incident_b):
-                    # Prefer ADL data over police data for verified incidents
-                    if incident_a['source'] == 'ADL' and incident_b['source'] in ['NYPD', 'LAPD']:
-                        duplicates_to_remove.add(j)
-                    elif incident_b['source'] == 'ADL' and incident_a['source'] in ['NYPD', 'LAPD']:
-                        duplicates_to_remove.add(i)
-                        break  # Current incident marked for removal
-                    else:
-                        # Both same source type, remove the one with less information
-                        if len(str(incident_a.get('description', ''))) >= len(str(incident_b.get('description', ''))):
-                            duplicates_to_remove.add(j)
-                        else:
-                            duplicates_to_remove.add(i)
-                            break
+                touched = np.where(rescored[links_a], links_b, links_a)[crossing]
+                rescored |= np.isin(stored_cluster, stored_cluster[touched])
+            matched = pd.concat(matched, ignore_index=True).sort_values(['a', 'b'], kind='mergesort')
+            
+            # Stored clusters are rebuilt without scoring their pairs again
+            kept = np.flatnonzero(~rescored)
+            for members in pd.Series(kept).groupby(stored_cluster[kept]):
+                for position in members[1].to_numpy()[1:]:
+                    clusters.union(members[1].iloc[0], position)
+            
+            previous_ledger = self.load_match_ledger()
+            unchanged = set(keys[~rescored])
+            ledger = previous_ledger[previous_ledger['record_a'].isin(unchanged) &
+                                     previous_ledger['record_b'].isin(unchanged)]
+            
+            logger.info(f"Incremental dedup: {int(is_new.sum())} new or changed records, "
+                        f"{int((rescored & ~is_new).sum())} reopened, {len(kept)} unchanged")
+            is_new = rescored
+        
+        exact_matches = [(keys[representative], keys[position], reason)
+                         for representative, position, reason in zip(exact_a, exact_b, exact['reason'])
+                         if is_new[position] or is_new[representative]]
+        
+        # Pair counts cover the candidate pairs scored in this run
+        pos_a, pos_b = pos_a[scored], pos_b[scored]
+        combos, labels = self.source_combinations(df_sorted, pos_a, pos_b)
+        compared = np.bincount(combos, minlength=len(labels))
+        pair_counts = {label: {'compared_pairs': int(compared[k]), 'matches': 0} for k, label in enumerate(labels)}
+        
+        match_a, match_b = matched['a'].to_numpy(dtype=np.int64), matched['b'].to_numpy(dtype=np.int64)
+        reasons = matched['reason'].to_numpy(dtype=object)
+        accepted = self.link_matches(clusters, match_a, match_b, reasons)
+        if not accepted.all():
+            logger.info(f"Complete linkage kept {int((~accepted).sum())} of {len(accepted)} matches from chaining clusters")
+        
+        new_matches = list(exact_matches)
+        sources = df_sorted['source'].astype(object).fillna('').astype(str).to_numpy()
+        for a, b, reason in zip(match_a[accepted], match_b[accepted], reasons[accepted]):
+            new_matches.append((keys[a], keys[b], reason))
+            pair_counts['|'.join(sorted([sources[a], sources[b]]))]['matches'] += 1
+        ledger = pd.concat([ledger[['record_a', 'record_b', 'reason']],
+                            pd.DataFrame(new_matches, columns=['record_a', 'record_b', 'reason'])],
+                           ignore_index=True)
+        
+        # Name both sides of every match by source and incident ID, so pairs trace back to incidents
+        identity = pd.DataFrame({'source': df_sorted['source'].to_numpy(),
+                                 'incident_id': df_sorted['incident_id'].to_numpy()}, index=keys.to_numpy())
+        for side in ['a', 'b']:
+            named = identity.loc[ledger[f'record_{side}']]
+            ledger[f'source_{side}'] = named['source'].to_numpy()
+            ledger[f'incident_id_{side}'] = named['incident_id'].to_numpy()
+        
+        # One survivor per cluster; clusters are named after their survivor
+        roots = clusters.roots()
+        survivor = self.select_survivors(df_sorted, roots)
+        survivor_key = pd.Series(keys[survivor].to_numpy(), index=roots[survivor])
+        state = pd.DataFrame({
+            'record_key': keys,
+            'source': df_sorted['source'].to_numpy(),
+            'incident_id': df_sorted['incident_id'].to_numpy(),
+            'cluster': survivor_key.loc[roots].to_numpy(),
+            'survivor': survivor
+        })
         
         # Remove duplicates
-        df_deduplicated = df_sorted.drop(duplicates_to_remove).reset_index(drop=True)
+        df_deduplicated = df_sorted[survivor].reset_index(drop=True)
         
         logger.info(f"Deduplication complete:")
-        logger.info(f"  Total comparisons: {total_comparisons}")
-        logger.info(f"  Duplicates removed: {len(duplicates_to_remove)}")
+        logger.info(f"  Total comparisons: {len(pos_a)}")
+        logger.info(f"  New matches: {len(new_matches)} ({ledger['reason'].value_counts().to_dict()} in ledger)")
+        logger.info(f"  Duplicate clusters: {int((pd.Series(roots).value_counts() > 1).sum())}")
+        logger.info(f"  Duplicates removed: {int((~survivor).sum())}")
         logger.info(f"  Original incidents: {len(df)}")
         logger.info(f"  Final incidents: {len(df_deduplicated)}")
         
-        return df_deduplicated
+        self.match_ledger = ledger
+        self.dedup_pair_counts = pair_counts
+        self.exact_duplicate_counts = exact['reason'].value_counts().to_dict()
+        return df_deduplicated, state
     
-    def is_duplicate(self, incident_a: pd.Series, incident_b: pd.Series) -> bool:
+    def is_duplicate(self, incident_a: pd.Series, incident_b: pd.Series, within_distance: bool = None,
+                     description_match: bool = None, location_match: bool = None) -> bool:
         """Determine if two incidents are duplicates using multiple criteria"""
+        return bool(self.match_reason(incident_a, incident_b, within_distance, description_match, location_match))
+    
+    def match_reason(self, incident_a: pd.Series, incident_b: pd.Series, within_distance: bool = None,
+                     description_match: bool = None, location_match: bool = None, policy: Dict = None) -> str:
+        """Return why two incidents match ('incident_id', 'description' or 'location'), or '' if they don't
+
+        ``within_distance``, ``description_match`` and ``location_match`` take
+        precomputed results of the batched checks; when omitted they are
+        computed for this pair under its source pair ``policy``.
+        """
+        if policy is None:
+            policy = self.pair_policy(incident_a['source'], incident_b['source'])
+            if policy is None:
+                return ''
         
         # Different sources can have duplicates
-        if incident_a['source'] == incident_b['source']:
+        if incident_a['source'] == incident_b['source'] and 'incident_id' in policy['fields']:
             # Same source - check incident IDs
             if (incident_a['incident_id'] and incident_b['incident_id'] and 
                 incident_a['incident_id'] == incident_b['incident_id']):
-                return True
+                return 'incident_id'
+            if policy.get('distinct_ids') and incident_a['incident_id'] and incident_b['incident_id']:
+                return ''
         
         # Time proximity check (within 3 days)
-        try:
-            date_a = pd.to_datetime(incident_a['date'])
-            date_b = pd.to_datetime(incident_b['date'])
-            if abs((date_a - date_b).days) > 3:
-                return False
-        except:
-            return False
+        if incident_a['day'] == MISSING_DAY or incident_b['day'] == MISSING_DAY:
+            return ''
+        if abs(int(incident_a['day']) - int(incident_b['day'])) > self.match_window_days:
+            return ''
         
         # Geographic proximity check (if coordinates available)
-        try:
-            lat_a, lon_a = float(incident_a.get('latitude', 0)), float(incident_a.get('longitude', 0))
-            lat_b, lon_b = float(incident_b.get('latitude', 0)), float(incident_b.get('longitude', 0))
-            
-            if lat_a and lon_a and lat_b and lon_b:
-                distance = geopy.distance.geodesic((lat_a, lon_a), (lat_b, lon_b)).miles
-                if distance > 2.0:  # More than 2 miles apart
-                    return False
-        except:
-            pass
-        
-        # State/county check
-        if (incident_a.get('state') and incident_b.get('state') and 
-            incident_a['state'] != incident_b['state']):
-            return False
-        
-        # Bias motivation check
-        if (incident_a.get('bias_motivation_cleaned') and incident_b.get('bias_motivation_cleaned') and
-            incident_a['bias_motivation_cleaned'] != incident_b['bias_motivation_cleaned']):
-            return False
+        if within_distance is None:
+            pair = pd.DataFrame([incident_a, incident_b], columns=['lat', 'lon'])
+            within_distance = self.within_distance(pair, np.array([0]), np.array([1]))[0]
+        if not within_distance:
+            return ''
         
-        # Description similarity check (if available)
-        desc_a = str(incident_a.get('description', ''))
-        desc_b = str(incident_b.get('description', ''))
+        # State and bias motivation checks (a missing value matches anything)
+        for col in WILDCARD_COLUMNS:
+            value_a, value_b = incident_a.get(col), incident_b.get(col)
+            if not is_missing(value_a) and not is_missing(value_b) and value_a != value_b:
+                return ''
         
-        if len(desc_a) > 20 and len(desc_b) > 20:
-            similarity = fuzz.ratio(desc_a.lower(), desc_b.lower())
-            if similarity > 80:
-                return True
+        # Description similarity check (if available)
+        if description_match is None:
+            desc_a = str(incident_a.get('description', ''))
+            desc_b = str(incident_b.get('description', ''))
+            description_match = ('description' in policy['fields'] and len(desc_a) > 20 and len(desc_b) > 20 and
+                                 fuzz.ratio(desc_a.lower(), desc_b.lower()) > policy['description_threshold'])
+        if description_match:
+            return 'description'
         
         # Location name similarity
-        location_a = f"{incident_a.get('city', '')} {incident_a.get('county', '')}"
-        location_b = f"{incident_b.get('city', '')} {incident_b.get('county', '')}"
-        
-        if len(location_a.strip()) > 5 and len(location_b.strip()) > 5:
-            location_similarity = fuzz.ratio(location_a.lower(), location_b.lower())
-            if location_similarity > 85:
-                return True
+        if location_match is None:
+            location_a = f"{incident_a.get('city', '')} {incident_a.get('county', '')}"
+            location_b = f"{incident_b.get('city', '')} {incident_b.get('county', '')}"
+            location_match = ('location' in policy['fields'] and len(location_a.strip()) > 5 and len(location_b.strip()) > 5 and
+                              fuzz.ratio(location_a.lower(), location_b.lower()) > policy['location_threshold'])
+        if location_match:
+            return 'location'
         
-        return False
+        return ''
     
     def generate_integration_report(self, original_df: pd.DataFrame, adl_df: pd.DataFrame, 
                                   final_df: pd.DataFrame, fbi_df: pd.DataFrame = None) -> Dict:
@@ -305,6 +915,10 @@ class MultiSourceIntegrator:
                 'final_incidents': len(final_df),
                 'duplicates_removed': len(original_df) + len(adl_df) + fbi_len - len(final_df)
             },
+            'exact_duplicates_removed': getattr(self, 'exact_duplicate_counts', {}),
+            'dedup_pair_counts': getattr(self, 'dedup_pair_counts', {}),
+            'dedup_pairs_skipped_by_policy': getattr(self, 'policy_skipped_pairs', {}),
+            'date_parsing': self.date_parse_report,
             'bias_motivation_breakdown': {},
             'temporal_coverage': {},
             'geographic_coverage': {},
@@ -318,31 +932,44 @@ class MultiSourceIntegrator:
             else:
                 subset = final_df[final_df['source'] == source]
             
-            bias_counts = subset['bias_motivation_cleaned'].value_counts().to_dict()
-            report['bias_motivation_breakdown'][source] = bias_counts
+            bias_counts = subset['bias_motivation_cleaned'].value_counts()
+            report['bias_motivation_breakdown'][source] = bias_counts[bias_counts > 0].to_dict()
         
         # Temporal coverage
-        final_df['year'] = pd.to_datetime(final_df['date'], errors='coerce').dt.year
-        yearly_counts = final_df['year'].value_counts().sort_index().to_dict()
-        report['temporal_coverage'] = {str(k): v for k, v in yearly_counts.items() if not pd.isna(k)}
+        days = final_df['day'][final_df['day'] != MISSING_DAY]
+        years = pd.to_datetime(days, unit='D').dt.year
+        report['temporal_coverage'] = {str(k): v for k, v in years.value_counts().sort_index().items()}
+        if not days.empty:
+            report['date_range'] = {
+                'start': format_day_ordinals([days.min()]).iloc[0],
+                'end': format_day_ordinals([days.max()]).iloc[0]
+            }
         
         # Geographic coverage
-        state_counts = final_df['state'].value_counts().to_dict()
-        report['geographic_coverage'] = state_counts
+        state_counts = final_df['state'].value_counts()
+        report['geographic_coverage'] = state_counts[state_counts > 0].to_dict()
+        
+        # Completeness is measured on the output columns
+        present = final_df.drop(columns=TYPED_COLUMNS).notna()
+        present['date'] = final_df['day'] != MISSING_DAY
         
         # Data quality metrics
         report['data_quality_metrics'] = {
-            'incidents_with_coordinates': len(final_df[final_df['latitude'].notna() & final_df['longitude'].notna()]),
+            'incidents_with_coordinates': len(final_df[final_df['lat'].notna() & final_df['lon'].notna()]),
             'incidents_with_descriptions': len(final_df[final_df['description'].str.len() > 10]),
             'verified_incidents': len(final_df[final_df.get('verified', False) == True]),
             'antisemitic_incidents': len(final_df[final_df['bias_motivation_cleaned'] == 'ANTI-JEWISH']),
-            'completeness_score': (final_df.notna().sum().sum() / (len(final_df) * len(final_df.columns))) * 100
+            'completeness_score': (present.sum().sum() / (len(final_df) * len(present.columns))) * 100
         }
         
         return report
     
-    def integrate_all_sources(self) -> Tuple[pd.DataFrame, Dict]:
-        """Main integration function"""
+    def integrate_all_sources(self, full: bool = False) -> Tuple[pd.DataFrame, Dict]:
+        """Main integration function
+
+        Deduplication is incremental against the stored cluster state unless
+        ``full`` is set or no usable state exists.
+        """
         logger.info("Starting multi-source data integration")
         
         # Load data
@@ -356,27 +983,30 @@ class MultiSourceIntegrator:
         # Standardize schemas
         existing_df, adl_df, fbi_df = self.standardize_schemas(existing_df, adl_df, fbi_df)
         
-        # Combine data
+        # Combine data into the typed incident table
         dataframes_to_combine = [df for df in [existing_df, adl_df, fbi_df] if not df.empty]
         
         if len(dataframes_to_combine) > 1:
-            combined_df = pd.concat(dataframes_to_combine, ignore_index=True)
+            combined_df = self.build_incident_table(dataframes_to_combine)
             logger.info(f"Combined {len(existing_df)} existing + {len(adl_df)} ADL + {len(fbi_df)} FBI = {len(combined_df)} total incidents")
         elif len(dataframes_to_combine) == 1:
-            combined_df = dataframes_to_combine[0]
+            combined_df = self.build_incident_table(dataframes_to_combine)
             logger.info(f"Using single data source with {len(combined_df)} incidents")
         else:
             raise ValueError("No valid data to integrate")
         
         # Advanced deduplication
-        final_df = self.advanced_deduplication(combined_df)
+        previous_state = None if full else self.load_dedup_state()
+        final_table, dedup_state = self.advanced_deduplication(combined_df, previous_state)
+        self.save_dedup_state(dedup_state)
         
         # Generate integration report
-        report = self.generate_integration_report(existing_df, adl_df, final_df, fbi_df)
+        report = self.generate_integration_report(existing_df, adl_df, final_table, fbi_df)
         
-        # Save integrated data
-        output_file = self.output_dir / "integrated_hate_crimes.csv"
-        final_df.to_csv(output_file, index=False, encoding='utf-8')
+        # Save integrated data (dates are formatted back to strings here)
+        final_df = self.to_output_frame(final_table)
+        output_file = write_incidents(final_df, self.output_dir / "integrated_hate_crimes")
+        export_csv(output_file)
         
         # Save report
         report_file = self.output_dir / "integration_report.json"
@@ -389,18 +1019,28 @@ class MultiSourceIntegrator:
 
 def main():
     """Main function to run integration"""
+    parser = argparse.ArgumentParser(description='Multi-Source Hate Crime Data Integrator')
+    parser.add_argument('--full', action='store_true', help='Ignore stored dedup state and rebuild all clusters')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for partitioned deduplication')
+    parser.add_argument('--exact-distance', action='store_true',
+                        help='Re-check pairs near the distance cutoff with the exact geodesic distance')
+    args = parser.parse_args()
+    
     integrator = MultiSourceIntegrator()
+    integrator.dedup_workers = args.workers
+    integrator.exact_distance = args.exact_distance
     
     print("Multi-Source Hate Crime Data Integrator")
     print("=====================================")
     
     try:
-        final_df, report = integrator.integrate_all_sources()
+        final_df, report = integrator.integrate_all_sources(full=args.full)
         
         print(f"\n✅ Integration Complete!")
         print(f"📊 Final dataset: {len(final_df)} incidents")
         print(f"🔍 Duplicates removed: {report['source_statistics']['duplicates_removed']}")
-        print(f"📅 Date range: {final_df['date'].min()} to {final_df['date'].max()}")
+        if 'date_range' in report:
+            print(f"📅 Date range: {report['date_range']['start']} to {report['date_range']['end']}")
         
         print(f"\n📋 Source breakdown:")
         source_counts = final_df['source'].value_counts()
@@ -412,8 +1052,9 @@ def main():
         print(f"✅ Data completeness: {report['data_quality_metrics']['completeness_score']:.1f}%")
         
         print(f"\n📁 Files created:")
-        print(f"   - data/integrated/integrated_hate_crimes.csv")
+        print(f"   - data/integrated/integrated_hate_crimes.parquet (and .csv export)")
         print(f"   - data/integrated/integration_report.json")
+        print(f"   - data/integrated/dedup_state.csv")
         
     except Exception as e:
         logger.error(f"Error in integration: {e}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Raw Payload Store
+Compressed sidecar for the raw source records behind unified incidents, so
+the incident tables only carry a reference (the incident ID) to each one
+"""
+
+import json
+import zlib
+import sqlite3
+import argparse
+from pathlib import Path
+import logging
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+def encode_payload(record: Dict) -> bytes:
+    """A record as stored: compressed UTF-8 JSON"""
+    return zlib.compress(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+class PayloadStore:
+    """Raw records keyed by incident ID, zlib-compressed in an SQLite file
+
+    Lookups by key are indexed, so single payloads can be read without
+    scanning the store.  Storing a key again replaces its payload.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("CREATE TABLE IF NOT EXISTS payloads (key TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]) -> int:
+        """Store ``(key, record)`` pairs in one transaction; returns how many were written"""
+        return self.put_encoded((key, encode_payload(record)) for key, record in items)
+
+    def put_encoded(self, items: Iterable[Tuple[str, bytes]]) -> int:
+        """Store ``(key, payload)`` pairs already encoded with ``encode_payload``"""
+        rows = [(str(key), payload) for key, payload in items]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO payloads (key, payload) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The record stored under a key, or None"""
+        row = self.db.execute("SELECT payload FROM payloads WHERE key = ?", (str(key),)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def __contains__(self, key) -> bool:
+        return self.db.execute("SELECT 1 FROM payloads WHERE key = ?", (str(key),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Every stored ``(key, record)`` pair, in key order"""
+        for key, payload in self.db.execute("SELECT key, payload FROM payloads ORDER BY key"):
+            yield key, json.loads(zlib.decompress(payload))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def main():
+    """Print the raw record stored for an incident"""
+    parser = argparse.ArgumentParser(description='Raw Payload Store')
+    parser.add_argument('store', help='Payload store file (e.g. data/adl/raw_payloads.sqlite)')
+    parser.add_argument('incident_id', nargs='?', help='Incident to look up (omit for a count)')
+    args = parser.parse_args()
+
+    with PayloadStore(args.store) as store:
+        if args.incident_id is None:
+            print(f"{len(store)} payloads in {args.store}")
+            return
+        record = store.get(args.incident_id)
+        if record is None:
+            raise SystemExit(f"No payload for {args.incident_id}")
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Data Pipeline Runner
+Runs the collection and integration stages as a DAG, starting independent
+stages in parallel and reporting the critical path
+"""
+
+import json
+import time
+import argparse
+import subprocess
+import threading
+from fnmatch import fnmatch
+from datetime import datetime
+from pathlib import Path
+import logging
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from stage_cache import StageCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Each stage declares the files it reads and writes (globs allowed); a stage
+# depends on every stage whose outputs match one of its inputs.
+#   required:        a failure stops the pipeline
+#   needs_fresh:     skip the stage if a stage it depends on failed
+#                    (otherwise it runs on the existing files)
+#   cached:          reuse outputs through the stage cache (outputs must be concrete files)
+#   run_report:      (JSON output, timestamp field) restamped when a cache hit restores it,
+#                    so the report describes this run rather than the cached one
+STAGES = [
+    {'name': 'download_nypd', 'command': ['python', 'data-tools/download_nypd_data.py'],
+     'inputs': [], 'outputs': ['data/nypd_hate_crimes.csv']},
+    {'name': 'download_lapd', 'command': ['python', 'data-tools/download_lapd_data.py'],
+     'inputs': [], 'outputs': ['data/lapd_hate_crimes.csv']},
+    {'name': 'download_fbi', 'command': ['python', 'data-tools/download_fbi_data.py'],
+     'inputs': [], 'outputs': ['data/fbi/fbi_hate_crimes_*.parquet']},
+    {'name': 'collect_adl', 'command': ['python', 'data-tools/collect_adl_data.py', '--auto-cookies'],
+     'inputs': [], 'outputs': ['data/adl/adl_incidents.ndjson.gz']},
+    {'name': 'process_adl', 'command': ['python', 'data-tools/process_manual_adl_data.py', '--stream'],
+     'inputs': ['data/adl/adl_incidents.ndjson.gz'], 'outputs': ['data/adl/adl_unified.parquet', 'data/adl/raw_payloads.sqlite'],
+     'needs_fresh': True},
+    {'name': 'trends', 'command': ['python', 'data-tools/final_trends_collector.py'],
+     'inputs': [], 'outputs': ['website-source/public/data/google_trends_*']},
+    {'name': 'integrate', 'command': ['python', 'data-tools/multi_source_integrator.py'],
+     'inputs': ['data/unified_hate_crimes_corrected.*', 'data/adl/adl_unified.*', 'data/fbi/fbi_hate_crimes*'],
+     'code': ['data-tools/description_index.py', 'data-tools/incident_store.py', 'data-tools/date_parser.py',
+              'data-tools/bias_classifier.py'],
+     'outputs': ['data/integrated/integrated_hate_crimes.parquet', 'data/integrated/integrated_hate_crimes.csv',
+                 'data/integrated/integration_report.json', 'data/integrated/dedup_state.csv',
+                 'data/integrated/dedup_state.json', 'data/integrated/match_ledger.csv.gz'],
+     'run_report': ('data/integrated/integration_report.json', 'integration_timestamp'),
+     'required': True, 'cached': True},
+    {'name': 'enhance_geographic', 'command': ['python', 'data-tools/enhance_geographic_data.py'],
+     'inputs': ['data/integrated/integrated_hate_crimes.parquet'], 'code': ['data-tools/incident_store.py'],
+     'outputs': ['data/integrated/integrated_hate_crimes_enhanced.parquet',
+                 'data/integrated/integrated_hate_crimes_enhanced.csv', 'data/integrated/map_data.json'],
+     'required': True, 'cached': True},
+]
+
+def stage_dependencies(stages: List[Dict]) -> Dict[str, List[str]]:
+    """Map each stage to the stages producing its inputs"""
+    dependencies = {}
+    for stage in stages:
+        dependencies[stage['name']] = [
+            other['name'] for other in stages
+            if other is not stage and any(fnmatch(out, pattern) or fnmatch(pattern, out)
+                                          for pattern in stage['inputs'] for out in other['outputs'])
+        ]
+    return dependencies
+
+def restamp_report(path: str, field: str):
+    """Mark a report restored from the stage cache with this run's time
+
+    The cached run's timestamp is kept under ``cache.computed_at``.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    now = datetime.now().isoformat()
+    report['cache'] = {'restored': True, 'restored_at': now, 'computed_at': report.get(field)}
+    report[field] = now
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def critical_path(timings: Dict[str, Dict], dependencies: Dict[str, List[str]]) -> List[str]:
+    """Chain of stages with the longest total duration through the DAG"""
+    finish, previous = {}, {}
+
+    def longest(name: str) -> float:
+        if name not in finish:
+            upstream = [d for d in dependencies[name] if d in timings]
+            before = max(upstream, key=longest) if upstream else None
+            previous[name] = before
+            finish[name] = timings[name]['duration'] + (longest(before) if before else 0.0)
+        return finish[name]
+
+    if not timings:
+        return []
+    name = max(timings, key=longest)
+    path = []
+    while name:
+        path.append(name)
+        name = previous[name]
+    return path[::-1]
+
+class PipelineRunner:
+    """Runs pipeline stages as soon as the stages they depend on have finished"""
+
+    def __init__(self, stages: List[Dict], max_parallel: int = 4, use_cache: bool = True):
+        self.stages = {stage['name']: stage for stage in stages}
+        self.dependencies = stage_dependencies(stages)
+        self.max_parallel = max_parallel
+        self.cache = StageCache() if use_cache else None
+        self.cache_lock = threading.Lock()
+        self.log_dir = Path("data/logs")
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.timings = {}
+
+    def run_stage(self, name: str, started: float) -> Dict:
+        """Run one stage, logging its output to data/logs/<stage>.log"""
+        stage = self.stages[name]
+        start = time.perf_counter()
+        log_file = self.log_dir / f"{name}.log"
+
+        def run_command():
+            with open(log_file, 'w', encoding='utf-8') as log:
+                subprocess.run(stage['command'], stdout=log, stderr=subprocess.STDOUT, check=True)
+
+        status, cache_hit = 'success', False
+        try:
+            if stage.get('cached') and self.cache is not None:
+                # The cache index is shared, so cached stages take turns
+                with self.cache_lock:
+                    cache_hit = self.cache.run(name, run_command, stage['inputs'], stage['outputs'],
+                                               {'command': stage['command']},
+                                               stage.get('code', []) + [stage['command'][1]])
+                if cache_hit and 'run_report' in stage:
+                    restamp_report(*stage['run_report'])
+            else:
+                run_command()
+        except subprocess.CalledProcessError as e:
+            status = 'failed'
+            logger.error(f"Stage {name} failed with exit code {e.returncode} (see {log_file})")
+
+        end = time.perf_counter()
+        return {'status': status, 'cache_hit': cache_hit, 'start': round(start - started, 3),
+                'end': round(end - started, 3), 'duration': round(end - start, 3)}
+
+    def run(self) -> Dict:
+        """Run every stage and return the timing report"""
+        pending = set(self.stages)
+        running = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            while pending or running:
+                skipped = False
+                for name in sorted(pending):
+                    upstream = self.dependencies[name]
+                    if any(d in pending or d in running.values() for d in upstream):
+                        continue
+                    pending.discard(name)
+                    failed = [d for d in upstream if self.timings[d]['status'] != 'success']
+                    if failed and self.stages[name].get('needs_fresh'):
+                        logger.warning(f"Skipping {name}: {', '.join(failed)} failed")
+                        self.timings[name] = {'status': 'skipped', 'cache_hit': False, 'start': 0.0, 'end': 0.0,
+                                              'duration': 0.0}
+                        skipped = True
+                        continue
+                    logger.info(f"Starting {name}")
+                    running[pool.submit(self.run_stage, name, started)] = name
+
+                if not running:
+                    if pending and not skipped:
+                        raise ValueError(f"Stages {sorted(pending)} depend on each other and can never start")
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.timings[name] = future.result()
+                    logger.info(f"Finished {name}: {self.timings[name]['status']} "
+                                f"in {self.timings[name]['duration']:.1f}s")
+                    if self.timings[name]['status'] == 'failed' and self.stages[name].get('required'):
+                        for other in list(running):
+                            other.cancel()
+                        pending.clear()
+
+        path = critical_path({n: t for n, t in self.timings.items() if t['status'] != 'skipped'}, self.dependencies)
+        return {
+            'run_date': datetime.now().isoformat(),
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'critical_path': path,
+            'critical_path_seconds': round(sum(self.timings[n]['duration'] for n in path), 3),
+            'stages': {name: dict(self.timings[name], depends_on=self.dependencies[name])
+                       for name in sorted(self.timings, key=lambda n: self.timings[n]['start'])},
+            'cache': self.cache.report() if self.cache is not None else None,
+        }
+
+def main():
+    """Main function to run the pipeline"""
+    parser = argparse.ArgumentParser(description='Hate Crime Data Pipeline Runner')
+    parser.add_argument('--full', action='store_true', help='Rebuild dedup clusters from scratch')
+    parser.add_argument('--parallel', type=int, default=4, help='Stages to run at the same time')
+    parser.add_argument('--skip', nargs='*', default=[], help='Stages to leave out')
+    parser.add_argument('--no-cache', action='store_true', help='Always run cached stages')
+    parser.add_argument('--exact-distance', action='store_true',
+                        help='Use exact geodesic distances near the dedup distance cutoff')
+    args = parser.parse_args()
+
+    stages = [dict(stage) for stage in STAGES if stage['name'] not in args.skip]
+    for stage in stages:
+        if stage['name'] == 'integrate':
+            if args.full:
+                stage['command'] = stage['command'] + ['--full']
+            if args.exact_distance:
+                stage['command'] = stage['command'] + ['--exact-distance']
+
+    print("Hate Crime Data Pipeline")
+    print("========================")
+
+    runner = PipelineRunner(stages, args.parallel, not args.no_cache)
+    report = runner.run()
+
+    report_file = Path("data/pipeline_report.json")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n⏱️  Stage timings:")
+    for name, timing in report['stages'].items():
+        marker = '★' if name in report['critical_path'] else ' '
+        cached = ' (cached)' if timing['cache_hit'] else ''
+        print(f"  {marker} {name:<20} {timing['start']:>8.1f}s → {timing['end']:>8.1f}s  "
+              f"{timing['status']}{cached}")
+    print(f"\n🎯 Critical path ({report['critical_path_seconds']:.1f}s of {report['wall_seconds']:.1f}s wall): "
+          f"{' → '.join(report['critical_path'])}")
+    print(f"📁 Report saved to {report_file}")
+
+    failed = [name for name, timing in report['stages'].items()
+              if timing['status'] == 'failed' and runner.stages[name].get('required')]
+    if failed or any(name not in report['stages'] for name in runner.stages):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,39 +5,126 @@ Processes ADL data that was manually collected via curl commands
 """
 
 import json
+import hashlib
+import argparse
 import pandas as pd
 import glob
 from pathlib import Path
 from datetime import datetime
 import logging
 import re
+from itertools import islice
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from incident_store import write_incidents, load_incidents, iter_incident_batches, IncidentWriter, store_path
+from known_ids import KnownIdFilter, ADL_ID_FIELDS, record_id
+from adl_archive import ARCHIVE_NAME, read_archive
+from bias_classifier import BiasClassifier
+from payload_store import PayloadStore, encode_payload
+from date_parser import DATE_FORMATS, parse_dates, format_dates, merge_reports, describe_report
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Candidate keys for each unified column, in order of preference
+FIELD_CANDIDATES = {
+    'county': ['county', 'County'],
+    'city': ['city', 'City', 'location_city'],
+    'incident_id': ADL_ID_FIELDS,
+    'offense_type': ['type', 'incident_type', 'Type', 'offense_type'],
+    'victim_type': ['victim_type', 'Victim_Type', 'target'],
+    'description': ['description', 'Description', 'summary', 'details'],
+    'latitude': ['latitude', 'lat', 'Latitude'],
+    'longitude': ['longitude', 'lng', 'Longitude'],
+    'verified': ['verified', 'Verified'],
+    'adl_category': ['category', 'Category', 'bias_type'],
+}
+DATE_FIELDS = ['date', 'incident_date', 'Date', 'created_date', 'timestamp']
+STATE_FIELDS = ['state', 'State', 'location_state', 'region']
+LOCATION_FIELDS = ['location', 'Location', 'address', 'full_location']
+BIAS_FIELDS = ['bias_motivation', 'category', 'Category', 'type', 'bias_type', 'incident_type']
+
+# Every key any unified column reads; records sharing a plan agree on which of these they have
+CANDIDATE_KEYS = frozenset(
+    [key for keys in FIELD_CANDIDATES.values() for key in keys]
+    + STATE_FIELDS + LOCATION_FIELDS + BIAS_FIELDS
+)
+
+def first_values(records: list, keys: list, truthy: bool = False) -> list:
+    """Per record, the value of the first key that is set (non-None, or truthy), else None"""
+    if truthy:
+        return [next((r[k] for k in keys if r[k]), None) for r in records]
+    return [next((r[k] for k in keys if r[k] is not None), None) for r in records]
+
+def common_fields(sample: list) -> list:
+    """The set of keys shared by the most records in a sample"""
+    shapes = Counter(frozenset(record) for record in sample if isinstance(record, dict))
+    return sorted(shapes.most_common(1)[0][0]) if shapes else []
+
+def fallback_id(incident) -> str:
+    """Incident ID for a record without one, from a hash of its content
+
+    The key stays the same however the record's position in the stream
+    changes between runs, so stored rows and payloads keep matching it.
+    """
+    content = json.dumps(incident, sort_keys=True, ensure_ascii=False, default=str)
+    return f"ADL-{hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()}"
+
+def map_distinct(values: list, func) -> list:
+    """Apply ``func`` once per distinct value"""
+    results = {}
+    mapped = []
+    for value in values:
+        try:
+            if value not in results:
+                results[value] = func(value)
+            mapped.append(results[value])
+        except TypeError:
+            # Unhashable (a list or dict) – convert it on its own
+            mapped.append(func(value))
+    return mapped
+
 class ManualADLProcessor:
     """Process manually collected ADL data files"""
     
-    def __init__(self):
+    def __init__(self, payloads: bool = True):
         self.data_dir = Path("data/adl")
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        
-    def combine_json_files(self) -> list:
-        """Combine all manually collected JSON files"""
-        all_incidents = []
+        self.date_report = {}
+        self.bias_classifier = BiasClassifier()
+        # Raw ADL records live here, keyed by incident_id; tables carry raw_ref.
+        # Worker processes go without one and hand their payloads to the parent.
+        self.payload_store = PayloadStore(self.data_dir / "raw_payloads.sqlite") if payloads else None
+        
+    def collection_finished(self) -> bool:
+        """Whether the collector's current sweep is complete, or the collector has stopped short of it"""
+        try:
+            with open(self.data_dir / "collection_checkpoint.json", 'r') as f:
+                checkpoint = json.load(f)
+            # Checkpoints from before the collecting flag only say whether the sweep is complete
+            return bool(checkpoint.get('complete')) or not checkpoint.get('collecting', True)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return True
+    
+    def iter_incidents(self, follow: bool = False):
+        """Stream incidents from the collector's archive, then from manually saved page files
+
+        With ``follow`` the archive is read while the collector is still
+        appending to it, until its sweep is complete.
+        """
+        archive_file = self.data_dir / ARCHIVE_NAME
+        if archive_file.exists() or follow:
+            logger.info(f"Reading {archive_file}")
+            for record in read_archive(archive_file, follow, self.collection_finished):
+                yield record['incident']
+        
+        # Pages saved by hand with curl
         page_files = []
-        
-        # Find all ADL page files
         for pattern in ["adl_page_*.json", "adl_test_response.json", "manual_page_*.json"]:
             page_files.extend(glob.glob(str(self.data_dir / pattern)))
         
-        if not page_files:
-            logger.warning("No ADL JSON files found. Please collect data first.")
-            return []
-        
-        logger.info(f"Found {len(page_files)} ADL data files")
-        
         for json_file in sorted(page_files):
             try:
                 logger.info(f"Processing {json_file}")
@@ -47,7 +134,7 @@ class ManualADLProcessor:
                 # Handle different response formats
                 incidents = self.extract_incidents(data)
                 if incidents:
-                    all_incidents.extend(incidents)
+                    yield from incidents
                     logger.info(f"  Added {len(incidents)} incidents")
                 else:
                     logger.warning(f"  No incidents found in {json_file}")
@@ -56,14 +143,21 @@ class ManualADLProcessor:
                 logger.error(f"Error parsing {json_file}: {e}")
             except Exception as e:
                 logger.error(f"Error processing {json_file}: {e}")
-        
+    
+    def combine_json_files(self, follow: bool = False) -> list:
+        """Combine the archive and manually collected JSON files
+
+        An incident collected more than once keeps its latest copy, in the
+        position it was first seen.
+        """
+        by_id = {}
+        for incident in self.iter_incidents(follow):
+            by_id[record_id(incident) or fallback_id(incident)] = incident
+        all_incidents = list(by_id.values())
+        
+        if not all_incidents:
+            logger.warning("No ADL incidents found. Please collect data first.")
         logger.info(f"Total incidents collected: {len(all_incidents)}")
-        
-        # Save combined data
-        if all_incidents:
-            with open(self.data_dir / "adl_all_incidents.json", 'w', encoding='utf-8') as f:
-                json.dump(all_incidents, f, indent=2, ensure_ascii=False)
-        
         return all_incidents
     
     def extract_incidents(self, data) -> list:
@@ -125,6 +219,7 @@ class ManualADLProcessor:
             'total_incidents': len(incidents),
             'sample_incident': sample,
             'field_analysis': field_stats,
+            'common_fields': common_fields(incidents[:100]),
             'analysis_timestamp': datetime.now().isoformat()
         }
         
@@ -134,62 +229,378 @@ class ManualADLProcessor:
         
         return analysis
     
-    def convert_to_unified_schema(self, incidents: list) -> pd.DataFrame:
-        """Convert ADL incidents to unified schema"""
-        unified_data = []
+    def unify_incident(self, incident: dict, date: str = None) -> dict:
+        """Convert one ADL incident to the unified schema
+
+        ``date`` is the incident's already parsed date, if there is one.
+        """
+        incident_id = self.get_field(incident, FIELD_CANDIDATES['incident_id']) or fallback_id(incident)
+        unified_incident = {
+            'date': self.parse_date(incident) if date is None else date,
+            'state': self.parse_state(incident),
+            'county': self.get_field(incident, FIELD_CANDIDATES['county']),
+            'city': self.get_field(incident, FIELD_CANDIDATES['city']),
+            'bias_motivation': self.standardize_bias_motivation(incident),
+            'source': 'ADL',
+            'incident_id': incident_id,
+            'offense_type': self.get_field(incident, FIELD_CANDIDATES['offense_type']),
+            'victim_type': self.get_field(incident, FIELD_CANDIDATES['victim_type']),
+            'description': self.get_field(incident, FIELD_CANDIDATES['description']),
+            'latitude': self.safe_float(self.get_field(incident, FIELD_CANDIDATES['latitude'])),
+            'longitude': self.safe_float(self.get_field(incident, FIELD_CANDIDATES['longitude'])),
+            'verified': self.get_field(incident, FIELD_CANDIDATES['verified'], default=True),
+            'adl_category': self.get_field(incident, FIELD_CANDIDATES['adl_category']),
+            'raw_ref': incident_id
+        }
         
-        logger.info(f"Converting {len(incidents)} incidents to unified schema")
+        # Apply NCVS correction for antisemitic incidents
+        unified_incident['incidents_corrected'] = self.ncvs_correction(unified_incident['bias_motivation'])
+        
+        # Clean up empty strings
+        for key, value in unified_incident.items():
+            if value == '':
+                unified_incident[key] = None
+        
+        return unified_incident
+    
+    def ncvs_correction(self, bias: str) -> float:
+        """NCVS under-reporting correction for a standardized bias motivation"""
+        if bias and ('JEWISH' in bias.upper() or 'ANTISEMIT' in bias.upper()):
+            return 1.45
+        return 1.0
+    
+    def build_field_plan(self, field_names) -> dict:
+        """Which keys hold each unified column, for records with exactly the sampled candidate keys"""
+        shape = CANDIDATE_KEYS.intersection(field_names)
+        
+        def present(keys):
+            return [key for key in keys if key in shape]
+        
+        return {
+            'shape': shape,
+            'fields': {column: present(keys) for column, keys in FIELD_CANDIDATES.items()},
+            'state': present(STATE_FIELDS),
+            'location': present(LOCATION_FIELDS),
+            'bias': present(BIAS_FIELDS),
+        }
+    
+    def parse_date_column(self, records: list) -> list:
+        """Parse every record's date in bulk (MM/DD/YYYY, '' where there is none)
+
+        Like ``parse_date``, a record whose date field cannot be parsed
+        falls through to its next date field.  Counts go to ``date_report``.
+        """
+        dates = pd.Series(pd.NaT, index=range(len(records)), dtype='datetime64[ns]')
+        tried = pd.Series(False, index=dates.index)
+        report = {'rows': len(records), 'formats': {}, 'inferred': 0}
+        for field in DATE_FIELDS:
+            pending = dates.index[dates.isna()]
+            values = pd.Series([records[i].get(field) or None if isinstance(records[i], dict) else None
+                                for i in pending], index=pending, dtype=object).dropna()
+            if values.empty:
+                continue
+            tried[values.index] = True
+            parsed, field_report = parse_dates(values)
+            dates[values.index] = parsed
+            for fmt, count in field_report['formats'].items():
+                report['formats'][fmt] = report['formats'].get(fmt, 0) + count
+            report['inferred'] += field_report['inferred']
+        
+        report['missing'] = int((~tried).sum())
+        report['failed'] = int((tried & dates.isna()).sum())
+        merge_reports(self.date_report, report)
+        return format_dates(dates, '%m/%d/%Y').fillna('').tolist()
+    
+    def unify_with_plan(self, records: list, positions: list, plan: dict, dates: list) -> pd.DataFrame:
+        """Convert records matching ``plan`` a column at a time
+
+        Gives the same rows as ``unify_incident``; parsing and mapping run
+        once per distinct value.
+        """
+        def text(column, default=''):
+            return [default if v is None else str(v).strip() for v in first_values(records, plan['fields'][column])]
+        
+        states = map_distinct(first_values(records, plan['state'], truthy=True),
+                              lambda v: None if v is None else self.normalize_state(str(v).strip()))
+        locations = map_distinct(first_values(records, plan['location'], truthy=True),
+                                 lambda v: '' if v is None else self.extract_state_from_location(str(v)))
+        bias = map_distinct(first_values(records, plan['bias'], truthy=True),
+                            lambda v: '' if v is None else self.standardize_bias_value(v))
+        
+        incident_ids = [value or fallback_id(record) for value, record in zip(text('incident_id'), records)]
+        columns = {
+            'date': dates,
+            'state': [location if state is None else state for state, location in zip(states, locations)],
+            'county': text('county'),
+            'city': text('city'),
+            'bias_motivation': bias,
+            'source': ['ADL'] * len(records),
+            'incident_id': incident_ids,
+            'offense_type': text('offense_type'),
+            'victim_type': text('victim_type'),
+            'description': text('description'),
+            'latitude': map_distinct(text('latitude'), self.safe_float),
+            'longitude': map_distinct(text('longitude'), self.safe_float),
+            'verified': text('verified', default=True),
+            'adl_category': text('adl_category'),
+            'raw_ref': incident_ids,
+            'incidents_corrected': map_distinct(bias, self.ncvs_correction),
+        }
         
-        for i, incident in enumerate(incidents):
+        # Clean up empty strings
+        for column, values in columns.items():
+            columns[column] = [None if v == '' else v for v in values]
+        
+        return pd.DataFrame(columns, index=positions)
+    
+    def unify_batch(self, incidents: list, start: int = 0, field_names=None) -> pd.DataFrame:
+        """Convert a list of incidents whose stream positions begin at ``start``
+
+        Records whose candidate keys match the field plan are converted in
+        bulk; the rest go through ``unify_incident`` one by one.  The plan
+        is built from ``field_names``, by default the most common key set
+        among the first 100 records (the sample ``analyze_data_structure``
+        inspects).
+        """
+        df = self.unify_rows(incidents, start, field_names)
+        if not df.empty:
+            # The index still holds stream positions, which locate each row's raw record
+            self.payload_store.put_many(
+                (incident_id, incidents[i - start]) for i, incident_id in zip(df.index, df['incident_id'])
+            )
+        return df.reset_index(drop=True)
+    
+    def unify_rows(self, incidents: list, start: int = 0, field_names=None, dates: list = None) -> pd.DataFrame:
+        """``unify_batch`` without storing payloads, indexed by stream position
+
+        ``dates`` are the incidents' already parsed dates, if there are any.
+        """
+        if field_names is None:
+            field_names = common_fields(incidents[:100])
+        plan = self.build_field_plan(field_names)
+        if dates is None:
+            dates = self.parse_date_column(incidents)
+        
+        planned, other = [], []
+        for i, incident in enumerate(incidents, start):
+            if isinstance(incident, dict) and CANDIDATE_KEYS.intersection(incident) == plan['shape']:
+                planned.append(i)
+            else:
+                other.append(i)
+        
+        parts = []
+        if planned:
             try:
-                unified_incident = {
-                    'date': self.parse_date(incident),
-                    'state': self.parse_state(incident),
-                    'county': self.get_field(incident, ['county', 'County']),
-                    'city': self.get_field(incident, ['city', 'City', 'location_city']),
-                    'bias_motivation': self.standardize_bias_motivation(incident),
-                    'source': 'ADL',
-                    'incident_id': self.get_field(incident, ['id', 'incident_id', 'ID']) or f"ADL_{i}",
-                    'offense_type': self.get_field(incident, ['type', 'incident_type', 'Type', 'offense_type']),
-                    'victim_type': self.get_field(incident, ['victim_type', 'Victim_Type', 'target']),
-                    'description': self.get_field(incident, ['description', 'Description', 'summary', 'details']),
-                    'latitude': self.safe_float(self.get_field(incident, ['latitude', 'lat', 'Latitude'])),
-                    'longitude': self.safe_float(self.get_field(incident, ['longitude', 'lng', 'Longitude'])),
-                    'verified': self.get_field(incident, ['verified', 'Verified'], default=True),
-                    'adl_category': self.get_field(incident, ['category', 'Category', 'bias_type']),
-                    'raw_data': json.dumps(incident)
-                }
-                
-                # Apply NCVS correction for antisemitic incidents
-                bias = unified_incident['bias_motivation']
-                if bias and ('JEWISH' in bias.upper() or 'ANTISEMIT' in bias.upper()):
-                    unified_incident['incidents_corrected'] = 1.45
-                else:
-                    unified_incident['incidents_corrected'] = 1.0
-                
-                # Clean up empty strings
-                for key, value in unified_incident.items():
-                    if value == '':
-                        unified_incident[key] = None
-                
-                unified_data.append(unified_incident)
-                
+                parts.append(self.unify_with_plan([incidents[i - start] for i in planned], planned, plan,
+                                                  [dates[i - start] for i in planned]))
+            except Exception as e:
+                logger.warning(f"Field plan failed ({e}), converting incidents one by one")
+                other = sorted(other + planned)
+        if other:
+            logger.info(f"Field plan matched {len(planned)} of {len(incidents)} incidents")
+        
+        unified_data, positions = [], []
+        for i in other:
+            try:
+                unified_data.append(self.unify_incident(incidents[i - start], dates[i - start]))
+                positions.append(i)
             except Exception as e:
                 logger.warning(f"Error processing incident {i}: {e}")
                 continue
+        if unified_data:
+            parts.append(pd.DataFrame(unified_data, index=positions))
         
-        df = pd.DataFrame(unified_data)
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts).sort_index() if len(parts) > 1 else parts[0]
         
         # Remove rows with no useful data
         essential_fields = ['date', 'state', 'bias_motivation']
-        df = df.dropna(subset=essential_fields, how='all')
+        return df.dropna(subset=essential_fields, how='all')
+    
+    def unify_parallel(self, incidents: list, field_names=None, workers: int = 2) -> pd.DataFrame:
+        """Convert incidents in worker processes, giving the same frame as ``unify_batch``
+
+        The incidents are split into contiguous chunks, a few per worker.
+        The field plan and the dates are settled here for the whole list,
+        so each chunk converts exactly as it would have in one batch.  The
+        parts are joined back in order, and only this process writes the
+        payload store.
+        """
+        if field_names is None:
+            field_names = common_fields(incidents[:100])
+        dates = self.parse_date_column(incidents)
+        
+        chunk_size = max(1, -(-len(incidents) // (workers * 4)))
+        chunks = [(incidents[start:start + chunk_size], start, field_names, dates[start:start + chunk_size])
+                  for start in range(0, len(incidents), chunk_size)]
+        logger.info(f"Converting {len(chunks)} chunks of up to {chunk_size} incidents with {workers} workers")
+        
+        parts = []
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            for df, payloads, classified in pool.map(unify_chunk, chunks):
+                self.payload_store.put_encoded(payloads)
+                self.bias_classifier.merge(classified)
+                if not df.empty:
+                    parts.append(df)
+        
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True)
+    
+    def migrate_stored_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Bring rows from a previously stored table up to date
+
+        Rows keyed by their old stream position are dropped; their records
+        are read again from the inputs and keyed by content.  A row only
+        counts as position-keyed when its ID looks like ``ADL_<n>`` and its
+        stored raw record carries no ID of its own, so real ADL IDs of that
+        shape are kept.  Any raw_data JSON moves into the payload store.
+        """
+        if df.empty:
+            return df
+        looks_positional = df['incident_id'].astype(str).str.fullmatch(r'ADL_\d+')
+        if looks_positional.any():
+            raw_data = df['raw_data'] if 'raw_data' in df.columns else [None] * len(df)
+            positional = [looks and self.keyed_by_position(incident_id, raw)
+                          for looks, incident_id, raw in zip(looks_positional, df['incident_id'], raw_data)]
+            if any(positional):
+                logger.info(f"Dropping {sum(positional)} stored incidents keyed by stream position")
+                df = df[[not p for p in positional]]
+        if 'raw_data' not in df.columns:
+            return df
+        has_raw = df['raw_data'].notna()
+        raw = df[has_raw]
+        self.payload_store.put_many(
+            (incident_id, json.loads(payload)) for incident_id, payload in zip(raw['incident_id'], raw['raw_data'])
+        )
+        df = df.drop(columns=['raw_data'])
+        df['raw_ref'] = df['incident_id'].where(has_raw)
+        return df
+    
+    def keyed_by_position(self, incident_id: str, raw_data=None) -> bool:
+        """Whether a stored row's raw record (raw_data JSON or payload) has no ID of its own
+
+        Rows whose raw record cannot be found are kept.
+        """
+        record = json.loads(raw_data) if isinstance(raw_data, str) else self.payload_store.get(incident_id)
+        return record is not None and not record_id(record)
+    
+    def convert_to_unified_schema(self, incidents: list, field_names=None, workers: int = 1) -> pd.DataFrame:
+        """Convert ADL incidents to unified schema"""
+        logger.info(f"Converting {len(incidents)} incidents to unified schema")
+        
+        if workers > 1:
+            df = self.unify_parallel(incidents, field_names, workers)
+        else:
+            df = self.unify_batch(incidents, field_names=field_names)
+        
+        # The collector only saves incidents it has not seen before, so keep
+        # earlier incidents unless this batch has a newer copy
+        existing = self.migrate_stored_rows(load_incidents(self.data_dir / "adl_unified"))
+        if not existing.empty:
+            if df.empty:
+                logger.warning("No incidents converted in this run")
+                df = existing.reset_index(drop=True)
+            else:
+                existing = existing[~existing['incident_id'].astype(str).isin(df['incident_id'].astype(str))]
+                df = pd.concat([existing, df], ignore_index=True)
+            logger.info(f"Keeping {len(existing)} previously processed incidents")
         
         # Save unified data
-        df.to_csv(self.data_dir / "adl_unified.csv", index=False, encoding='utf-8')
+        write_incidents(df, self.data_dir / "adl_unified")
         
+        self.bias_classifier.save()
+        logger.info(f"Parsed dates ({describe_report(self.date_report)})")
         logger.info(f"Successfully converted {len(df)} incidents to unified schema")
         return df
     
+    def convert_streaming(self, incidents, batch_size: int = 5000) -> dict:
+        """Convert an incident stream in fixed-size batches, appending each to the store
+
+        Only one batch of incidents is held at a time.  Converted batches
+        go to a staging table; a second pass then writes the stored
+        incidents this run did not replace, followed by the latest copy of
+        each converted incident, into ``adl_unified``.  What grows with the
+        data is the map of incident IDs to their latest position.
+        """
+        staging = self.data_dir / "adl_unified_stream"
+        known_ids = KnownIdFilter(self.data_dir / "known_ids.npz")
+        latest = {}
+        analysis = None
+        position = 0
+        
+        try:
+            with IncidentWriter(staging) as writer:
+                stream = iter(incidents)
+                start = 0
+                while True:
+                    batch = list(islice(stream, batch_size))
+                    if not batch:
+                        break
+                    if analysis is None:
+                        analysis = self.analyze_data_structure(batch)
+                    df = self.unify_batch(batch, start)
+                    start += len(batch)
+                    for incident_id in df['incident_id'] if not df.empty else []:
+                        latest[incident_id] = position
+                        position += 1
+                    writer.write(df)
+                    known_ids.update(filter(None, map(record_id, batch)))
+                    logger.info(f"Converted {start} incidents")
+            
+            if not latest:
+                # The IDs were still ingested, so later collections can stop at them
+                known_ids.save()
+                self.bias_classifier.save()
+                return {'incidents': 0}
+            
+            states, antisemitic = {}, 0
+            with IncidentWriter(self.data_dir / "adl_unified") as writer:
+                def write(df):
+                    nonlocal antisemitic
+                    antisemitic += int((df['bias_motivation'] == 'ANTI-JEWISH').sum())
+                    for state, count in df['state'].value_counts().items():
+                        states[state] = states.get(state, 0) + int(count)
+                    writer.write(df)
+                
+                for df in iter_incident_batches(self.data_dir / "adl_unified", batch_size):
+                    df = self.migrate_stored_rows(df)
+                    write(df[[incident_id not in latest for incident_id in df['incident_id'].astype(str)]])
+                if writer.rows:
+                    logger.info(f"Keeping {writer.rows} previously processed incidents")
+                
+                position = 0
+                for df in iter_incident_batches(staging, batch_size):
+                    keep = [latest[incident_id] == position + j for j, incident_id in enumerate(df['incident_id'])]
+                    position += len(df)
+                    write(df[keep])
+                total = writer.rows
+        finally:
+            # Staged batches are only needed within this run, whichever way it ends
+            store_path(staging).unlink(missing_ok=True)
+        known_ids.save()
+        
+        self.bias_classifier.save()
+        logger.info(f"Parsed dates ({describe_report(self.date_report)})")
+        logger.info(f"Successfully converted {total} incidents to unified schema")
+        return {
+            'incidents': total,
+            'antisemitic': antisemitic,
+            'top_states': dict(sorted(states.items(), key=lambda item: -item[1])[:5]),
+            'fields_found': len(analysis['field_analysis']),
+            'known_ids': known_ids.report(),
+            'dates': self.date_report,
+        }
+    
+    def record_known_ids(self, incidents: list) -> dict:
+        """Add ingested incident IDs to the collector's known-ID filter and report on it"""
+        known_ids = KnownIdFilter(self.data_dir / "known_ids.npz")
+        added = known_ids.update(filter(None, (record_id(incident) for incident in incidents)))
+        known_ids.save()
+        logger.info(f"Recorded {added} new incident IDs ({known_ids.count} known)")
+        return known_ids.report()
+    
     def get_field(self, incident: dict, field_names: list, default='') -> str:
         """Get field value trying multiple possible field names"""
         for field_name in field_names:
@@ -208,43 +619,46 @@ class ManualADLProcessor:
     
     def parse_date(self, incident: dict) -> str:
         """Parse date from incident data"""
-        date_fields = ['date', 'incident_date', 'Date', 'created_date', 'timestamp']
-        
-        for field in date_fields:
+        for field in DATE_FIELDS:
             if field in incident and incident[field]:
+                parsed = self.parse_date_value(incident[field])
+                if parsed:
+                    return parsed
+        
+        return ''
+    
+    def parse_date_value(self, value) -> str:
+        """Parse one date value to MM/DD/YYYY, or '' if it cannot be parsed"""
+        try:
+            date_str = str(value)
+            
+            # Try different date formats
+            for fmt in DATE_FORMATS:
                 try:
-                    date_str = str(incident[field])
-                    
-                    # Try different date formats
-                    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ']:
-                        try:
-                            dt = datetime.strptime(date_str[:19], fmt)
-                            return dt.strftime('%m/%d/%Y')
-                        except ValueError:
-                            continue
-                    
-                    # Try pandas parsing as last resort
-                    dt = pd.to_datetime(date_str, errors='coerce')
-                    if not pd.isna(dt):
-                        return dt.strftime('%m/%d/%Y')
-                        
-                except Exception:
+                    dt = datetime.strptime(date_str if '%p' in fmt else date_str[:19], fmt)
+                    return dt.strftime('%m/%d/%Y')
+                except ValueError:
                     continue
+            
+            # Try pandas parsing as last resort
+            dt = pd.to_datetime(date_str, errors='coerce')
+            if not pd.isna(dt):
+                return dt.strftime('%m/%d/%Y')
+                
+        except Exception:
+            pass
         
         return ''
     
     def parse_state(self, incident: dict) -> str:
         """Parse state from incident data"""
-        state_fields = ['state', 'State', 'location_state', 'region']
-        
-        for field in state_fields:
+        for field in STATE_FIELDS:
             if field in incident and incident[field]:
                 state_val = str(incident[field]).strip()
                 return self.normalize_state(state_val)
         
         # Try to extract from full location string
-        location_fields = ['location', 'Location', 'address', 'full_location']
-        for field in location_fields:
+        for field in LOCATION_FIELDS:
             if field in incident and incident[field]:
                 return self.extract_state_from_location(str(incident[field]))
         
@@ -293,44 +707,65 @@ class ManualADLProcessor:
     
     def standardize_bias_motivation(self, incident: dict) -> str:
         """Standardize bias motivation field"""
-        bias_fields = ['bias_motivation', 'category', 'Category', 'type', 'bias_type', 'incident_type']
-        
-        for field in bias_fields:
+        for field in BIAS_FIELDS:
             if field in incident and incident[field]:
-                bias_str = str(incident[field]).lower().strip()
-                
-                # Map to standard categories
-                if any(term in bias_str for term in ['jewish', 'antisemit', 'anti-semit', 'judaism']):
-                    return 'ANTI-JEWISH'
-                elif any(term in bias_str for term in ['muslim', 'islam', 'islamic']):
-                    return 'ANTI-ISLAMIC'
-                elif any(term in bias_str for term in ['black', 'african']):
-                    return 'ANTI-BLACK'
-                elif any(term in bias_str for term in ['hispanic', 'latino']):
-                    return 'ANTI-HISPANIC'
-                elif any(term in bias_str for term in ['asian', 'pacific']):
-                    return 'ANTI-ASIAN'
-                elif any(term in bias_str for term in ['white', 'caucasian']):
-                    return 'ANTI-WHITE'
-                elif any(term in bias_str for term in ['gay', 'lesbian', 'lgbtq', 'transgender']):
-                    return 'ANTI-LGBTQ'
-                else:
-                    return str(incident[field]).upper()
+                return self.standardize_bias_value(incident[field])
         
         return ''
+    
+    def standardize_bias_value(self, value) -> str:
+        """Map one bias or category value to a standard category"""
+        return self.bias_classifier.classify(value) or ''
+
+# The processor each worker process converts its chunks with
+_worker = None
+
+def init_worker():
+    """Set up a worker process for ``unify_parallel``"""
+    global _worker
+    _worker = ManualADLProcessor(payloads=False)
+
+def unify_chunk(chunk: tuple) -> tuple:
+    """Convert one chunk in a worker: its rows, encoded payloads and new bias classifications"""
+    incidents, start, field_names, dates = chunk
+    classifier = _worker.bias_classifier
+    known = set(classifier.known)
+    df = _worker.unify_rows(incidents, start, field_names, dates)
+    payloads = [] if df.empty else [
+        (incident_id, encode_payload(incidents[i - start])) for i, incident_id in zip(df.index, df['incident_id'])
+    ]
+    classified = {text: category for text, category in classifier.known.items() if text not in known}
+    return df.reset_index(drop=True), payloads, classified
 
 def main():
     """Main processing function"""
+    parser = argparse.ArgumentParser(description='Process collected ADL data')
+    parser.add_argument('--follow', action='store_true',
+                        help='Read the archive while the collector is still running, until its sweep completes')
+    parser.add_argument('--stream', action='store_true',
+                        help='Convert in fixed-size batches with flat memory instead of loading every incident')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Incidents per batch in --stream mode')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes converting incidents in parallel (not with --stream)')
+    args = parser.parse_args()
+    if args.workers > 1 and args.stream:
+        parser.error('--workers cannot be combined with --stream')
+    
     processor = ManualADLProcessor()
     
     print("Manual ADL Data Processor")
     print("========================")
     
     try:
-        # Combine JSON files
-        incidents = processor.combine_json_files()
-        
-        if not incidents:
+        if args.stream:
+            # Convert batch by batch straight from the archive
+            summary = processor.convert_streaming(processor.iter_incidents(args.follow), args.batch_size)
+        else:
+            # Combine JSON files
+            incidents = processor.combine_json_files(args.follow)
+            summary = {'incidents': len(incidents)}
+        
+        if not summary['incidents']:
             print("❌ No ADL incidents found.")
             print("\nTo collect ADL data manually:")
             print("1. Use your working curl command to save pages:")
@@ -339,29 +774,45 @@ def main():
             print("3. Run this script again")
             return
         
-        print(f"✅ Found {len(incidents)} total incidents")
+        if not args.stream:
+            print(f"✅ Found {len(incidents)} total incidents")
+            
+            # Analyze structure
+            analysis = processor.analyze_data_structure(incidents)
+            
+            # Convert to unified schema
+            unified_df = processor.convert_to_unified_schema(incidents, analysis['common_fields'], args.workers)
+            
+            # Later collections stop at these incidents
+            summary = {
+                'incidents': len(unified_df),
+                'antisemitic': int((unified_df['bias_motivation'] == 'ANTI-JEWISH').sum()),
+                'top_states': {state: int(n) for state, n in unified_df['state'].value_counts().head().items()},
+                'fields_found': len(analysis['field_analysis']),
+                'known_ids': processor.record_known_ids(incidents),
+                'dates': processor.date_report,
+            }
         
-        # Analyze structure
-        analysis = processor.analyze_data_structure(incidents)
         print(f"📊 Data structure analyzed")
-        print(f"   Fields found: {len(analysis['field_analysis'])}")
+        print(f"   Fields found: {summary['fields_found']}")
+        print(f"🔄 Converted to unified schema: {summary['incidents']} incidents")
+        print(f"📅 Dates parsed: {describe_report(summary['dates'])}")
         
-        # Convert to unified schema
-        unified_df = processor.convert_to_unified_schema(incidents)
-        print(f"🔄 Converted to unified schema: {len(unified_df)} incidents")
+        filter_report = summary['known_ids']
+        print(f"🔑 Known IDs: {filter_report['ids']} ({filter_report['memory_bytes'] / 1024:.0f} KB, "
+              f"false positives ~{filter_report['estimated_false_positive_rate']:.1e} estimated, "
+              f"{filter_report['measured_false_positive_rate']:.1e} measured)")
         
         # Show antisemitic incidents
-        antisemitic = unified_df[unified_df['bias_motivation'] == 'ANTI-JEWISH']
-        print(f"🎯 Antisemitic incidents: {len(antisemitic)}")
+        print(f"🎯 Antisemitic incidents: {summary['antisemitic']}")
         
         # Show geographic distribution
-        state_counts = unified_df['state'].value_counts().head()
-        print(f"🗺️  Top states: {dict(state_counts)}")
+        print(f"🗺️  Top states: {summary['top_states']}")
         
         print(f"\n📁 Files created:")
-        print(f"   - data/adl/adl_all_incidents.json")
         print(f"   - data/adl/adl_data_analysis.json")
-        print(f"   - data/adl/adl_unified.csv")
+        print(f"   - data/adl/adl_unified.parquet")
+        print(f"   - data/adl/raw_payloads.sqlite")
         
         print(f"\n🚀 Next steps:")
         print(f"   1. python code/multi_source_integrator.py")
@@ -370,6 +821,8 @@ def main():
     except Exception as e:
         logger.error(f"Error in processing: {e}")
         raise
+    finally:
+        processor.payload_store.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Pipeline Stage Cache
+Skips pipeline stages whose inputs, parameters and code are unchanged by
+restoring their outputs from a content-addressed cache
+"""
+
+import json
+import glob
+import shutil
+import hashlib
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+import logging
+from typing import Callable, Dict, List
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def expand_patterns(patterns: List[str]) -> List[Path]:
+    """Files matching glob patterns, sorted so fingerprints are stable"""
+    return sorted({Path(p) for pattern in patterns for p in glob.glob(pattern) if Path(p).is_file()})
+
+class StageCache:
+    """Content-addressed cache of stage outputs with LRU eviction
+
+    A stage's key hashes the contents of its input files, its parameters
+    and the source of the code it runs.  Outputs are copied into
+    ``cache_dir/<stage>/<key>/`` after a successful run and copied back on
+    a later run with the same key.  The index tracks entry sizes and last
+    use; the least recently used entries are evicted once the cache grows
+    past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache", max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.index = self.load_index()
+
+    def load_index(self) -> Dict:
+        """Load the cache index, starting fresh if it is missing or unreadable"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'entries': {}, 'stats': {}}
+
+    def save_index(self):
+        """Write the cache index"""
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+
+    def fingerprint(self, stage: str, inputs: List[str], params: Dict, code: List[str]) -> str:
+        """Hash a stage's input files, parameters and code into a cache key"""
+        digest = hashlib.sha256()
+        digest.update(stage.encode('utf-8'))
+        for label, patterns in [('input', inputs), ('code', code)]:
+            for path in expand_patterns(patterns):
+                digest.update(f"{label}:{path.as_posix()}:{file_digest(path)}\n".encode('utf-8'))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    def record(self, stage: str, outcome: str):
+        """Count a cache hit or miss for a stage"""
+        stats = self.index['stats'].setdefault(stage, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+    def cached_file(self, entry_dir: Path, position: int, output: str) -> Path:
+        """Where an entry keeps its copy of an output (flat, so any output path works)"""
+        return entry_dir / f"{position:02d}-{Path(output).name}"
+
+    def restore(self, stage: str, key: str, outputs: List[str]) -> bool:
+        """Copy a cached entry's outputs back into place; False if there is no usable entry"""
+        entry = self.index['entries'].get(f"{stage}/{key}")
+        entry_dir = self.cache_dir / stage / key
+        if entry is None or sorted(entry['outputs']) != sorted(outputs):
+            return False
+        cached = [self.cached_file(entry_dir, i, out) for i, out in enumerate(entry['outputs'])]
+        if not all(path.is_file() for path in cached):
+            return False
+
+        for path, out in zip(cached, entry['outputs']):
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, out)
+        entry['last_used'] = time.time()
+        return True
+
+    def store(self, stage: str, key: str, outputs: List[str]):
+        """Copy a stage's outputs into the cache and evict old entries if needed"""
+        entry_dir = self.cache_dir / stage / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        for i, out in enumerate(outputs):
+            shutil.copy2(out, self.cached_file(entry_dir, i, out))
+
+        self.index['entries'][f"{stage}/{key}"] = {
+            'stage': stage,
+            'outputs': outputs,
+            'size': sum(Path(out).stat().st_size for out in outputs),
+            'last_used': time.time(),
+        }
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``"""
+        entries = self.index['entries']
+        total = sum(e['size'] for e in entries.values())
+        for name in sorted(entries, key=lambda n: entries[n]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries[name]['size']
+            shutil.rmtree(self.cache_dir / name, ignore_errors=True)
+            del entries[name]
+            logger.info(f"Evicted cache entry {name}")
+
+    def run(self, stage: str, func: Callable[[], None], inputs: List[str], outputs: List[str],
+            params: Dict = None, code: List[str] = None) -> bool:
+        """Run a stage unless its outputs are cached; returns True on a cache hit
+
+        ``inputs`` and ``code`` may be glob patterns; ``outputs`` are the
+        files the stage writes.  Outputs are only cached if ``func``
+        returns without raising and every output exists.
+        """
+        key = self.fingerprint(stage, inputs, params or {}, code or [])
+
+        if self.restore(stage, key, outputs):
+            self.record(stage, 'hits')
+            self.save_index()
+            logger.info(f"Cache hit for {stage} ({key[:12]}), restored {len(outputs)} outputs")
+            return True
+
+        self.record(stage, 'misses')
+        logger.info(f"Cache miss for {stage} ({key[:12]}), running stage")
+        func()
+
+        missing = [out for out in outputs if not Path(out).is_file()]
+        if missing:
+            logger.warning(f"Not caching {stage}: outputs missing after run: {missing}")
+        else:
+            self.store(stage, key, outputs)
+        self.save_index()
+        return False
+
+    def report(self) -> Dict:
+        """Hit/miss counts per stage and the current cache size"""
+        return {
+            'stages': self.index['stats'],
+            'entries': len(self.index['entries']),
+            'size_bytes': sum(e['size'] for e in self.index['entries'].values()),
+            'max_bytes': self.max_bytes,
+        }
+
+def main():
+    """Run a pipeline command through the stage cache, or show cache stats"""
+    parser = argparse.ArgumentParser(description='Pipeline Stage Cache')
+    parser.add_argument('--cache-dir', default='data/cache', help='Cache directory')
+    parser.add_argument('--max-size-mb', type=int, default=500, help='Cache size limit before LRU eviction')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run a stage command (given after --) unless its outputs are cached')
+    run_parser.add_argument('stage', help='Stage name')
+    run_parser.add_argument('--input', action='append', default=[], help='Input file or glob (repeatable)')
+    run_parser.add_argument('--output', action='append', default=[], help='Output file (repeatable)')
+    run_parser.add_argument('--code', action='append', default=[], help='Code file or glob (repeatable)')
+
+    subparsers.add_parser('stats', help='Show cache hits, misses and size')
+
+    # Everything after -- is the stage command
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1:]
+
+    cache = StageCache(args.cache_dir, args.max_size_mb * 1024 * 1024)
+
+    if args.command == 'stats':
+        print(json.dumps(cache.report(), indent=2))
+        return
+
+    if not command:
+        parser.error('run needs a command after --')
+
+    # The script being run is part of the code version, and its arguments are parameters
+    code = args.code + [arg for arg in command if arg.endswith('.py')]
+
+    def run_command():
+        subprocess.run(command, check=True)
+
+    try:
+        hit = cache.run(args.stage, run_command, args.input, args.output, {'command': command}, code)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Stage {args.stage} failed with exit code {e.returncode}")
+        sys.exit(e.returncode)
+
+    stats = cache.report()['stages'][args.stage]
+    print(f"{'♻️  Reused cached' if hit else '✅ Ran'} {args.stage} "
+          f"(hits: {stats['hits']}, misses: {stats['misses']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The data tools are standalone scripts that import their siblings directly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,51 @@
+import gzip
+import threading
+import time
+
+from adl_archive import append_page, read_archive
+
+def page(start, n=3):
+    return [{'id': f"adl-{i}", 'description': f"Incident {i} – ünïcode"} for i in range(start, start + n)]
+
+def test_pages_read_back_in_order(tmp_path):
+    archive = tmp_path / "adl_incidents.ndjson.gz"
+    append_page(archive, 'run-1', 0, page(0))
+    append_page(archive, 'run-1', 1, page(3))
+
+    records = list(read_archive(archive))
+
+    assert [r['incident']['id'] for r in records] == [f"adl-{i}" for i in range(6)]
+    assert [r['page'] for r in records] == [0, 0, 0, 1, 1, 1]
+    assert {r['run'] for r in records} == {'run-1'}
+    assert records[0]['incident']['description'] == "Incident 0 – ünïcode"
+
+def test_incomplete_trailing_page_is_skipped(tmp_path, caplog):
+    archive = tmp_path / "adl_incidents.ndjson.gz"
+    append_page(archive, 'run-1', 0, page(0))
+    # A run killed just after it started writing its second page
+    member = gzip.compress(b'{"run": "run-1", "page": 1, "incident": {"id": "adl-3"}}\n')
+    with open(archive, 'ab') as f:
+        f.write(member[:16])
+
+    ids = [r['incident']['id'] for r in read_archive(archive)]
+
+    assert ids == ['adl-0', 'adl-1', 'adl-2']
+    assert 'incomplete page' in caplog.text
+
+def test_missing_archive_reads_as_empty(tmp_path):
+    assert list(read_archive(tmp_path / "missing.ndjson.gz")) == []
+
+def test_follow_picks_up_pages_appended_while_reading(tmp_path):
+    archive = tmp_path / "adl_incidents.ndjson.gz"
+    append_page(archive, 'run-1', 0, page(0))
+    done = threading.Event()
+
+    def collector():
+        time.sleep(0.2)
+        append_page(archive, 'run-1', 1, page(3))
+        done.set()
+
+    threading.Thread(target=collector).start()
+    records = list(read_archive(archive, follow=True, finished=done.is_set, poll_seconds=0.05))
+
+    assert len(records) == 6
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_dedup import generate_incidents, pairwise_scores, run_benchmark
+
+def test_generator_is_reproducible_and_labels_injected_duplicates():
+    frames = generate_incidents(1000, duplicate_rate=0.1, seed=3)
+    again = generate_incidents(1000, duplicate_rate=0.1, seed=3)
+
+    combined = pd.concat(frames.values(), ignore_index=True)
+    assert len(combined) == 1000
+    assert combined['benchmark_cluster'].nunique() == 900
+    for source, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, again[source])
+
+def test_generator_only_shares_keys_between_injected_duplicates():
+    frames = generate_incidents(20000, duplicate_rate=0.1, seed=7)
+
+    # Within each source, records that share a key belong to the same injected cluster
+    keys = {'NYPD': ['incident_id'], 'LAPD': ['incident_id'], 'ADL': ['incident_id'],
+            'FBI': ['state', 'month_year']}
+    for source, columns in keys.items():
+        clusters = frames[source].groupby(columns)['benchmark_cluster'].nunique()
+        assert (clusters == 1).all(), source
+    places = frames['ADL'][~frames['ADL']['incident_id'].str.startswith('adl_x')]
+    assert places.groupby(['city', 'county'])['benchmark_cluster'].nunique().max() == 1
+
+def test_pairwise_scores():
+    # Truth: {0, 1, 2} and {3}; the prediction splits off 2 and wrongly adds 3
+    scores = pairwise_scores(np.array(['a', 'a', 'b', 'b']), np.array([0, 0, 0, 1]))
+
+    assert (scores['predicted_pairs'], scores['true_pairs'], scores['correct_pairs']) == (2, 3, 1)
+    assert scores['precision'] == 0.5
+    assert scores['recall'] == pytest.approx(1 / 3)
+
+def test_benchmark_finds_most_injected_duplicates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = run_benchmark(3000, 0.1, seed=1, workers=1)
+
+    assert result['rows'] == 3000
+    assert result['injected_duplicates'] == 300
+    assert result['accuracy']['recall'] > 0.9
+    assert result['accuracy']['precision'] > 0.97
+
+def test_benchmark_keeps_synthetic_bias_values_out_of_the_real_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_benchmark(500, 0.1, seed=2, workers=1)
+
+    assert not (tmp_path / "data" / "cache").exists()
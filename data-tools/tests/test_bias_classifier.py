@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+
+import bias_classifier
+from bias_classifier import BiasClassifier
+
+def test_first_category_in_precedence_order_wins(tmp_path):
+    classifier = BiasClassifier(tmp_path / "bias.json")
+
+    assert classifier.classify('Anti-Black or African American') == 'ANTI-BLACK'
+    assert classifier.classify('anti-black and antisemitic graffiti') == 'ANTI-JEWISH'
+    assert classifier.classify(' Anti-Disability ') == 'ANTI-DISABILITY'
+    assert classifier.classify('') is None
+    assert classifier.classify('   ') == ''
+    assert classifier.classify(float('nan')) is None
+
+def test_column_is_classified_once_per_distinct_value(tmp_path):
+    classifier = BiasClassifier(tmp_path / "bias.json")
+    values = pd.Series(['Anti-Jewish', None, 'Anti-Jewish', 'ANTI-MUSLIM'] * 100, index=range(10, 410))
+
+    classified = classifier.classify_column(values)
+
+    assert classified.index.equals(values.index)
+    assert classified[:4].tolist() == ['ANTI-JEWISH', None, 'ANTI-JEWISH', 'ANTI-ISLAMIC']
+    assert classifier.new_values == 2
+
+def test_classifications_are_cached_until_the_rules_change(tmp_path, monkeypatch):
+    cache_file = tmp_path / "bias.json"
+    first = BiasClassifier(cache_file)
+    first.classify('Anti-Jewish')
+    first.save()
+
+    second = BiasClassifier(cache_file)
+    assert second.known == {'ANTI-JEWISH': 'ANTI-JEWISH'}
+    second.classify('Anti-Jewish')
+    second.save()
+    assert second.new_values == 0
+
+    monkeypatch.setattr(bias_classifier, 'BIAS_RULES', bias_classifier.BIAS_RULES[1:])
+    assert BiasClassifier(cache_file).known == {}
+    assert json.loads(cache_file.read_text())['classifications'] == {'ANTI-JEWISH': 'ANTI-JEWISH'}
+
+def test_merge_adopts_worker_classifications(tmp_path):
+    parent, worker = BiasClassifier(tmp_path / "bias.json"), BiasClassifier(tmp_path / "unused.json")
+    worker.classify('Anti-Asian')
+
+    parent.merge(worker.known)
+    parent.save()
+
+    assert BiasClassifier(tmp_path / "bias.json").known == {'ANTI-ASIAN': 'ANTI-ASIAN'}
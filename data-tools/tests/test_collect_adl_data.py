@@ -0,0 +1,130 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from adl_archive import read_archive
+from collect_adl_data import ADLDataCollector
+from process_manual_adl_data import ManualADLProcessor
+
+class StandInFeed(BaseHTTPRequestHandler):
+    """ADL heat map feed: ``total`` incidents, newest first, 50 per page"""
+    total = 0
+    pages = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query)['page'][0])
+        self.pages.append(page)
+        newest = self.total - 1 - page * 50
+        incidents = [{'id': f"adl-{i}", 'date': '2024-01-05', 'state': 'NY', 'description': f"Incident {i}"}
+                     for i in range(newest, max(newest - 50, -1), -1)]
+        body = json.dumps({'incidents': incidents}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    # The collector keeps its archive and checkpoint under data/adl
+    monkeypatch.chdir(tmp_path)
+    handler = type('Handler', (StandInFeed,), {'total': 230, 'pages': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/json", handler
+    server.shutdown()
+    server.server_close()
+
+def collector_for(url):
+    collector = ADLDataCollector(url, heatmap_page='', max_in_flight=1, requests_per_second=100)
+    collector.backoff_seconds = 0
+    return collector
+
+def test_interrupted_sweep_resumes_from_its_checkpoint(feed):
+    url, server = feed
+    interrupted = collector_for(url)
+    collect_page = interrupted.collect_page
+
+    def lose_connection_on_page_two(session, page):
+        if page == 2:
+            raise RuntimeError('connection lost')
+        return collect_page(session, page)
+
+    interrupted.collect_page = lose_connection_on_page_two
+    with pytest.raises(RuntimeError):
+        interrupted.collect_all_pages(interrupted.init_session())
+    server.pages.clear()
+
+    resumed = collector_for(url)
+    assert resumed.collect_all_pages(resumed.init_session())
+
+    # Pages 0 and 1 were saved before the interruption and are not fetched again
+    assert sorted(server.pages) == [2, 3, 4]
+    ids = [record['incident']['id'] for record in read_archive(resumed.archive_file)]
+    assert sorted(ids) == sorted(f"adl-{i}" for i in range(230))
+    assert json.loads(resumed.checkpoint_file.read_text())['complete']
+
+def test_finished_sweep_starts_over(feed):
+    url, server = feed
+    first = collector_for(url)
+    first.known_ids = None
+    assert first.collect_all_pages(first.init_session())
+    server.pages.clear()
+
+    second = collector_for(url)
+    second.known_ids = None
+    assert second.collect_all_pages(second.init_session())
+
+    assert sorted(server.pages) == [0, 1, 2, 3, 4]
+
+def test_pages_fetched_past_the_end_are_not_archived(feed):
+    url, server = feed
+    collector = collector_for(url)
+    collector.max_in_flight = 5
+    # An earlier run ingested page 2, so the sweep ends there; pages 3 and 4 still hold unseen incidents
+    collector.known_ids.update(f"adl-{i}" for i in range(80, 130))
+
+    assert collector.collect_all_pages(collector.init_session())
+
+    assert {3, 4} <= set(server.pages)
+    ids = [record['incident']['id'] for record in read_archive(collector.archive_file)]
+    assert sorted(ids) == sorted(f"adl-{i}" for i in range(130, 230))
+    checkpoint = json.loads(collector.checkpoint_file.read_text())
+    assert checkpoint['pages'] == {'0': 50, '1': 50, '2': 0}
+    assert checkpoint['end_page'] == 2
+
+def test_follower_stops_when_the_first_page_fails(feed):
+    url, server = feed
+    collector = collector_for(url)
+    fetching, fail = threading.Event(), threading.Event()
+
+    def failing_first_page(session, page):
+        fetching.set()
+        fail.wait(5)
+        return None
+
+    collector.collect_page = failing_first_page
+    collecting = threading.Thread(target=collector.collect_all_pages, args=(collector.init_session(),))
+    collecting.start()
+    assert fetching.wait(5)
+
+    followed = []
+    follower = threading.Thread(target=lambda: followed.extend(ManualADLProcessor().iter_incidents(follow=True)))
+    follower.start()
+    follower.join(0.5)
+    assert follower.is_alive()
+
+    fail.set()
+    collecting.join(5)
+    follower.join(5)
+    assert not follower.is_alive()
+    assert followed == []
+    checkpoint = json.loads(collector.checkpoint_file.read_text())
+    assert checkpoint['failed_pages'] == [0]
+    assert not checkpoint['collecting'] and not checkpoint['complete']
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from date_parser import detect_formats, parse_dates
+from process_manual_adl_data import ManualADLProcessor
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    # The processor keeps its files under data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return ManualADLProcessor()
+
+def test_ambiguous_dates_stay_month_first_alongside_day_first_only_values():
+    values = pd.Series(['25/12/2023', '13/01/2023', '31/05/2023', '01/06/2023', '2023-02-03'])
+    parsed, report = parse_dates(values)
+
+    assert parsed[3] == pd.Timestamp('2023-01-06')
+    assert parsed[0] == pd.Timestamp('2023-12-25')
+    assert report['failed'] == 0
+
+def test_day_first_only_when_no_sampled_date_parses_month_first():
+    def day_first(values):
+        formats = detect_formats(pd.Series(values))
+        return formats.index('%d/%m/%Y') < formats.index('%m/%d/%Y')
+
+    assert day_first(['25/12/2023', '13/01/2023'])
+    assert not day_first(['25/12/2023', '01/06/2023'])
+    assert not day_first(['2023-12-25'])
+
+def test_bulk_and_per_record_paths_agree_on_ambiguous_dates(processor):
+    records = [{'date': d} for d in ['25/12/2023', '13/01/2023', '31/05/2023', '01/06/2023', '02/03/2023']]
+    bulk = processor.parse_date_column(records)
+
+    assert bulk == [processor.parse_date(record) for record in records]
+    assert bulk[3] == '01/06/2023'
+
+def test_twelve_hour_timestamps_parse_by_format():
+    values = pd.Series(['03/15/2023 12:00:00 AM', '03/15/2023 01:30:00 PM', '11/02/2023 11:59:59 PM'])
+    parsed, report = parse_dates(values)
+
+    assert parsed.tolist() == [pd.Timestamp('2023-03-15 00:00'), pd.Timestamp('2023-03-15 13:30'),
+                               pd.Timestamp('2023-11-02 23:59:59')]
+    assert report['formats'] == {'%m/%d/%Y %I:%M:%S %p': 3}
+    assert report['inferred'] == 0
+
+def test_free_form_leftovers_keep_their_wall_clock_time():
+    values = pd.Series(['March 3, 2023', 'Fri, 03 Feb 2023 10:11:12 +0200', '2023-01-01 10:00 UTC', 'garbage'])
+    parsed, report = parse_dates(values)
+
+    assert parsed[:3].tolist() == [pd.Timestamp('2023-03-03'), pd.Timestamp('2023-02-03 10:11:12'),
+                                   pd.Timestamp('2023-01-01 10:00')]
+    assert pd.isna(parsed[3])
+    assert (report['inferred'], report['failed']) == (3, 1)
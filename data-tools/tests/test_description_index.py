@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+from description_index import DescriptionIndex, ratio_scores
+
+DESCRIPTIONS = pd.Series([
+    'Swastika painted on the wall of a synagogue in Brooklyn',
+    'Swastika painted on the wall of the synagogue in Brooklyn',
+    'Flyers with antisemitic slurs distributed outside a school',
+    'short text',
+    'short text',
+])
+
+def test_similar_matches_exact_ratio_above_threshold():
+    index = DescriptionIndex(DESCRIPTIONS)
+    pos_a, pos_b = np.array([0, 0, 3]), np.array([1, 2, 4])
+
+    matches = index.similar(pos_a, pos_b, threshold=80)
+
+    # Near-identical descriptions match; unrelated ones and short ones never do
+    assert matches.tolist() == [True, False, False]
+
+def test_similar_takes_per_pair_thresholds():
+    index = DescriptionIndex(DESCRIPTIONS)
+    score = fuzz.ratio(DESCRIPTIONS[0].lower(), DESCRIPTIONS[1].lower())
+
+    matches = index.similar(np.array([0, 0]), np.array([1, 1]), threshold=np.array([score - 1, score]))
+
+    assert matches.tolist() == [True, False]
+
+def test_ratio_scores_match_fuzz_ratio():
+    texts = ['abc def', 'abc deg', 'xyz']
+    scores = ratio_scores(texts, np.array([0, 0, 1, 0]), np.array([1, 2, 2, 0]))
+
+    assert scores.tolist() == [fuzz.ratio('abc def', 'abc deg'), fuzz.ratio('abc def', 'xyz'),
+                               fuzz.ratio('abc deg', 'xyz'), 100]
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pandas as pd
+import pytest
+
+from download_fbi_data import FBIDataCollector
+
+class StandInCDE(BaseHTTPRequestHandler):
+    """CDE state endpoint serving ``months`` per state, after any scripted ``errors`` and ``delays``
+
+    Responses carry an ETag and a matching If-None-Match gets a 304.
+    """
+    months = {}
+    errors = {}
+    delays = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        state = url.path.strip('/').split('/')[-1]
+        self.requests.append((state, dict(self.headers)))
+        time.sleep(self.delays.get(state, 0))
+        if self.errors.get(state):
+            self.send_response(self.errors[state].pop(0))
+            self.end_headers()
+            return
+        body = json.dumps({'actuals': {f"{self.server.names[state]} Incidents": self.months.get(state, {})}}).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def cde(tmp_path, monkeypatch):
+    # The collector writes data/fbi relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    handler = type('Handler', (StandInCDE,), {'months': {}, 'errors': {}, 'delays': {}, 'requests': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    collector = FBIDataCollector(f"http://127.0.0.1:{server.server_port}", max_in_flight=2, requests_per_second=100)
+    collector.backoff_seconds = 0
+    server.names = collector.state_names
+    yield collector, handler
+    server.shutdown()
+    server.server_close()
+
+def test_states_without_new_months_count_as_collected(cde):
+    collector, server = cde
+    server.months = {'NY': {'01-2024': 5}, 'VT': {}}
+    server.errors = {'TX': [404]}
+
+    df = collector.collect_all_states(last_refresh='2024-03-01',
+                                      windows={code: ('01-2024', '01-2024') for code in ['NY', 'VT', 'TX']})
+
+    summary = json.loads(collector.summary_file.read_text())
+    assert summary['successful_state_codes'] == ['NY', 'VT']
+    assert summary['failed_state_codes'] == ['TX']
+    assert df['month_year'].tolist() == ['01-2024']
+
+def test_sweep_with_nothing_new_is_current(cde):
+    collector, server = cde
+    server.months = {'NY': {'01-2024': 5}}
+    stored = collector.collect_all_states(last_refresh='2024-03-01', windows={'NY': ('01-2024', '01-2024')})
+    server.months = {}
+
+    df = collector.collect_all_states(last_refresh='2024-04-01', existing=stored,
+                                      windows={'NY': ('02-2024', '02-2024'), 'VT': ('01-2024', '02-2024')})
+
+    pd.testing.assert_frame_equal(df, stored)
+    assert collector.sweep_is_current('2024-04-01')
+
+def test_throttled_requests_are_retried_with_backoff(cde):
+    collector, server = cde
+    server.months = {'NY': {'01-2024': 5}, 'TX': {'01-2024': 7}}
+    server.errors = {'NY': [429, 429], 'TX': [429] * (collector.max_retries + 1)}
+
+    df = collector.collect_all_states(last_refresh='2024-03-01',
+                                      windows={code: ('01-2024', '01-2024') for code in ['TX', 'NY']})
+
+    requested = [state for state, headers in server.requests]
+    assert requested.count('NY') == 3
+    assert requested.count('TX') == collector.max_retries + 1
+    assert df['state'].tolist() == ['NY']
+
+def test_results_are_gathered_in_state_order(cde):
+    collector, server = cde
+    states = ['TX', 'AL', 'NY', 'CA', 'WY']
+    server.months = {code: {'01-2024': n} for n, code in enumerate(states)}
+    # The first states answer last
+    server.delays = {'TX': 0.3, 'AL': 0.2}
+
+    collector.collect_all_states(last_refresh='2024-03-01',
+                                 windows={code: ('01-2024', '01-2024') for code in states})
+
+    summary = json.loads(collector.summary_file.read_text())
+    assert summary['successful_state_codes'] == states
+
+def test_unchanged_responses_are_served_from_the_cache(cde):
+    collector, server = cde
+    server.months = {'NY': {'01-2024': 5}}
+    first = collector.collect_state_data('NY', '01-2024', '01-2024')
+
+    # A later run revalidates the cached response instead of downloading it
+    later = FBIDataCollector(collector.base_url, requests_per_second=100)
+    again = later.collect_state_data('NY', '01-2024', '01-2024')
+
+    assert 'If-None-Match' in server.requests[-1][1]
+    assert (later.response_cache.not_modified, later.response_cache.downloaded) == (1, 0)
+    assert [row['incident_count'] for row in again] == [row['incident_count'] for row in first]
+
+def test_changed_responses_are_downloaded_again(cde):
+    collector, server = cde
+    server.months = {'NY': {'01-2024': 5}}
+    collector.collect_state_data('NY', '01-2024', '01-2024')
+    server.months = {'NY': {'01-2024': 6}}
+
+    revised = collector.collect_state_data('NY', '01-2024', '01-2024')
+
+    assert revised[0]['incident_count'] == 6
+    assert collector.response_cache.downloaded == 2
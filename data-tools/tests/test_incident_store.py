@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+from incident_store import (IncidentWriter, export_csv, iter_incident_batches, load_incidents,
+                            read_incidents, write_incidents)
+
+def incidents(n=3, start=0):
+    return pd.DataFrame({
+        'date': [f'01/{day + 1:02d}/2024' for day in range(start, start + n)],
+        'state': ['NY'] * n,
+        'source': ['ADL'] * n,
+        'incident_id': [f'a{i}' for i in range(start, start + n)],
+        'latitude': [40.7] * n,
+        'description': ['Swastika on a wall'] + [''] * (n - 1),
+    })
+
+def test_round_trip_keeps_values_and_empties_become_missing(tmp_path):
+    stored = write_incidents(incidents(), tmp_path / "adl_unified.csv")
+
+    df = read_incidents(tmp_path / "adl_unified")
+
+    assert stored.name == "adl_unified.parquet"
+    assert df['incident_id'].tolist() == ['a0', 'a1', 'a2']
+    assert df['latitude'].tolist() == [40.7] * 3
+    assert df['description'].isna().tolist() == [False, True, True]
+    assert read_incidents(tmp_path / "adl_unified", categorical=True)['state'].dtype == 'category'
+
+def test_writer_aligns_batches_and_reads_back_in_batches(tmp_path):
+    with IncidentWriter(tmp_path / "table") as writer:
+        writer.write(incidents(3))
+        writer.write(incidents(2, start=3).drop(columns=['latitude']).assign(extra='x'))
+
+    batches = list(iter_incident_batches(tmp_path / "table", batch_size=2))
+    combined = pd.concat(batches, ignore_index=True)
+
+    assert max(len(batch) for batch in batches) == 2
+    assert len(combined) == 5
+    assert combined.columns.tolist() == incidents().columns.tolist()
+    assert combined['latitude'].isna().tolist() == [False, False, False, True, True]
+
+def test_failed_writer_leaves_the_previous_table(tmp_path):
+    write_incidents(incidents(1), tmp_path / "table")
+
+    with pytest.raises(RuntimeError):
+        with IncidentWriter(tmp_path / "table") as writer:
+            writer.write(incidents(3))
+            raise RuntimeError('interrupted')
+
+    assert len(read_incidents(tmp_path / "table")) == 1
+    assert not list(tmp_path.glob("*.tmp*"))
+
+def test_legacy_csv_fallback_and_export(tmp_path):
+    incidents().to_csv(tmp_path / "legacy.csv", index=False)
+
+    assert load_incidents(tmp_path / "legacy")['incident_id'].tolist() == ['a0', 'a1', 'a2']
+    assert load_incidents(tmp_path / "missing").empty
+
+    write_incidents(incidents(), tmp_path / "table")
+    exported = pd.read_csv(export_csv(tmp_path / "table"))
+    assert exported['incident_id'].tolist() == ['a0', 'a1', 'a2']
+
+def test_fbi_counts_and_extra_columns_keep_their_types(tmp_path):
+    fbi = pd.DataFrame({
+        'date': ['01/01/2024', '02/01/2024', '03/01/2024'],
+        'month_year': ['01-2024', '02-2024', '03-2024'],
+        'state': ['NY'] * 3,
+        'incident_count': [12, 0, 7],
+        'incidents_corrected': [12, 0, 7],
+        'source': ['FBI'] * 3,
+        'data_type': ['monthly_total'] * 3,
+        'year': [2024, 2024, 2024],
+        'share': [0.5, 0.25, 0.25],
+        'complete': [True, False, True],
+    })
+    write_incidents(fbi, tmp_path / "fbi")
+
+    df = read_incidents(tmp_path / "fbi")
+
+    typed = ['incident_count', 'incidents_corrected', 'year', 'share', 'complete']
+    assert df[typed].dtypes.astype(str).tolist() == ['int64', 'int64', 'int64', 'float64', 'bool']
+    pd.testing.assert_frame_equal(df, fbi, check_dtype=False)
+    with open(export_csv(tmp_path / "fbi"), encoding='utf-8') as f:
+        assert f.read().splitlines()[1] == '01/01/2024,01-2024,NY,12,12,FBI,monthly_total,2024,0.5,True'
+
+def test_missing_counts_stay_integers(tmp_path):
+    fbi = pd.DataFrame({'state': ['NY', 'NJ'], 'incident_count': [12.0, None]})
+    write_incidents(fbi, tmp_path / "fbi")
+
+    df = read_incidents(tmp_path / "fbi")
+
+    assert df['incident_count'].dtype == 'Int64'
+    assert df['incident_count'].tolist() == [12, pd.NA]
+    assert pd.read_csv(export_csv(tmp_path / "fbi"), dtype=str)['incident_count'].fillna('').tolist() == ['12', '']
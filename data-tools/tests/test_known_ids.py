@@ -0,0 +1,26 @@
+from known_ids import KnownIdFilter, record_id
+
+def test_added_ids_are_known_and_survive_a_reload(tmp_path):
+    known = KnownIdFilter(tmp_path / "known_ids.npz", capacity=1000)
+    assert known.update(f"adl-{i}" for i in range(500)) == 500
+    assert not known.add('adl-7')
+    known.save()
+
+    reloaded = KnownIdFilter(tmp_path / "known_ids.npz", capacity=10)
+
+    assert all(f"adl-{i}" in reloaded for i in range(500))
+    assert ' adl-7 ' in reloaded
+    assert (reloaded.count, reloaded.capacity) == (500, 1000)
+
+def test_false_positive_rate_stays_near_the_target(tmp_path):
+    known = KnownIdFilter(tmp_path / "known_ids.npz", capacity=2000, error_rate=0.01)
+    known.update(f"adl-{i}" for i in range(2000))
+
+    unseen = sum(f"other-{i}" in known for i in range(20_000)) / 20_000
+    assert unseen < 0.02
+    assert abs(known.estimated_false_positive_rate() - 0.01) < 0.005
+
+def test_record_id_takes_the_first_non_empty_id_field():
+    assert record_id({'id': ' ', 'incident_id': 'b2', 'ID': 'c3'}) == 'b2'
+    assert record_id({'id': 12}) == '12'
+    assert record_id({'date': '2024-01-05'}) == ''
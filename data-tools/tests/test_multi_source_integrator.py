@@ -0,0 +1,259 @@
+import geopy.distance
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_dedup import generate_incidents, generate_nypd
+from multi_source_integrator import MultiSourceIntegrator
+
+@pytest.fixture
+def integrator(tmp_path, monkeypatch):
+    # The integrator reads and writes data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return MultiSourceIntegrator()
+
+def incident_table(integrator, police):
+    police, adl, fbi = integrator.standardize_schemas(police, pd.DataFrame(), pd.DataFrame())
+    return integrator.build_incident_table([police])
+
+def test_exact_links_keep_rows_without_a_source(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 3, '2023-01-01', '2023-01-31')
+    orphans = nypd.iloc[[0, 0]].assign(source=None)
+    table = incident_table(integrator, pd.concat([nypd, orphans], ignore_index=True))
+
+    links = integrator.exact_duplicate_links(table)
+    id_links = links[links['reason'] == 'exact_incident_id']
+
+    # The two source-less copies collapse into each other, not into the NYPD record
+    assert len(id_links) == 1
+    assert id_links['representative'].notna().all()
+    linked = table.iloc[id_links[['position', 'representative']].to_numpy().ravel()]
+    assert linked['source'].isna().all()
+
+def test_deduplication_handles_rows_without_a_source(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 3, '2023-01-01', '2023-01-31')
+    orphan = nypd.iloc[[0]].assign(source=None)
+    table = incident_table(integrator, pd.concat([nypd, orphan], ignore_index=True))
+
+    deduplicated, state = integrator.advanced_deduplication(table)
+
+    assert len(state) == len(table)
+    assert 0 < len(deduplicated) <= len(table)
+
+def test_candidate_pairs_include_records_without_a_state(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 3, '2023-01-01', '2023-01-31')
+    nypd['date'] = ['01/10/2023', '01/11/2023', '03/01/2023']
+    nypd['bias_motivation'] = 'ANTI-JEWISH'
+    table = incident_table(integrator, nypd.assign(state=['NY', None, 'NY']))
+
+    pos_a, pos_b = integrator.build_candidate_pairs(table)
+
+    # The stateless record meets the NY record a day away, not the one in March
+    pairs = {tuple(sorted(table['state'].iloc[[a, b]].astype(object).fillna('-'))) for a, b in zip(pos_a, pos_b)}
+    assert pairs == {('-', 'NY')}
+    assert len(pos_a) == 1
+
+def chain_of_reports(days, incident_ids):
+    nypd = generate_nypd(np.random.RandomState(0), len(days), '2023-10-01', '2023-10-31')
+    return nypd.assign(date=[f'10/{day:02d}/2023' for day in days], incident_id=incident_ids,
+                       bias_motivation='ANTI-JEWISH', offense_type='HARRASSMENT 2',
+                       county='KINGS', latitude=40.65, longitude=-73.95)
+
+def test_fuzzy_matches_do_not_chain_clusters_past_the_match_window(integrator):
+    days = list(range(1, 22, 2))
+    table = incident_table(integrator, chain_of_reports(days, [''] * len(days)))
+
+    deduplicated, state = integrator.advanced_deduplication(table)
+
+    # Neighbours two days apart match, but no cluster stretches across the chain
+    spans = table['day'].groupby(state['cluster'].to_numpy()).agg(lambda day: day.max() - day.min())
+    assert spans.max() <= integrator.match_window_days
+    assert len(deduplicated) > 1
+
+def test_police_reports_with_different_ids_never_match(integrator):
+    table = incident_table(integrator, chain_of_reports([9, 10, 10], ['101', '102', '102']))
+
+    deduplicated, state = integrator.advanced_deduplication(table)
+
+    assert sorted(deduplicated['incident_id']) == ['101', '102']
+
+def test_content_hash_only_links_records_without_an_id(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 1, '2023-01-01', '2023-01-31')
+    copies = nypd.iloc[[0, 0, 0, 0]].assign(incident_id=['101', '102', '', ''])
+    table = incident_table(integrator, copies.reset_index(drop=True))
+
+    links = integrator.exact_duplicate_links(table)
+
+    # Two complaint numbers are two complaints; only the ID-less copies collapse
+    assert links[['position', 'representative', 'reason']].values.tolist() == [[3, 2, 'exact_content']]
+
+def test_blank_and_nan_states_match_a_known_state(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 1, '2023-01-01', '2023-01-31')
+    copies = nypd.iloc[[0, 0, 0]].assign(incident_id='', state=['NY', np.nan, ''], description='')
+    table = incident_table(integrator, copies.reset_index(drop=True))
+
+    assert table['state'].isna().sum() == 2
+    records = table.to_dict('records')
+    for other in records[1:]:
+        assert integrator.match_reason(records[0], other) == 'location'
+
+    deduplicated, state = integrator.advanced_deduplication(table)
+
+    # All three are one incident, whatever form the missing state took
+    assert len(deduplicated) == 1
+    assert state['cluster'].nunique() == 1
+
+def coordinate_pairs(pairs):
+    """Coordinate table with each (origin, destination) pair on consecutive rows"""
+    points = [point for pair in pairs for point in pair]
+    table = pd.DataFrame({'lat': [p[0] for p in points], 'lon': [p[1] for p in points]}, dtype=np.float32)
+    return table, np.arange(0, len(points), 2), np.arange(1, len(points), 2)
+
+def offset(miles, bearing, origin=(40.7, -74.0)):
+    point = geopy.distance.geodesic(miles=miles).destination(origin, bearing)
+    return origin, (point.latitude, point.longitude)
+
+def geodesic_miles(table, pos_a, pos_b):
+    return np.array([geopy.distance.geodesic(tuple(table.iloc[a]), tuple(table.iloc[b])).miles
+                     for a, b in zip(pos_a, pos_b)])
+
+def test_exact_distance_agrees_with_geodesic_near_the_cutoff(integrator):
+    integrator.exact_distance = True
+    table, pos_a, pos_b = coordinate_pairs([offset(miles, bearing) for bearing in [0, 45, 90, 135]
+                                            for miles in np.linspace(1.97, 2.03, 13)])
+
+    nearby = integrator.within_distance(table, pos_a, pos_b)
+
+    assert nearby.tolist() == (geodesic_miles(table, pos_a, pos_b) <= integrator.max_distance_miles).tolist()
+
+def test_exact_distance_rechecks_pairs_haversine_gets_wrong(integrator):
+    # Due north haversine runs long, due east it runs short, by more than the margins here
+    table, pos_a, pos_b = coordinate_pairs([offset(1.998, 0), offset(2.003, 90)])
+    assert geodesic_miles(table, pos_a, pos_b).tolist() == pytest.approx([1.998, 2.003], abs=1e-3)
+
+    assert integrator.within_distance(table, pos_a, pos_b).tolist() == [False, True]
+    integrator.exact_distance = True
+    assert integrator.within_distance(table, pos_a, pos_b).tolist() == [True, False]
+
+def test_pairs_without_coordinates_pass_the_distance_check(integrator):
+    far = ((40.7, -74.0), (34.05, -118.24))
+    table, pos_a, pos_b = coordinate_pairs([far, ((np.nan, -74.0), far[1]), (far[0], (34.05, np.nan)),
+                                            ((0.0, 0.0), far[1])])
+
+    for exact_distance in [False, True]:
+        integrator.exact_distance = exact_distance
+        assert integrator.within_distance(table, pos_a, pos_b).tolist() == [False, True, True, True]
+
+@pytest.fixture
+def benchmark_table(integrator):
+    frames = generate_incidents(600, duplicate_rate=0.2, seed=5, start='2023-01-01', end='2023-03-31')
+    police = pd.concat([frames['NYPD'], frames['LAPD']], ignore_index=True)
+    police, adl, fbi = integrator.standardize_schemas(police, frames['ADL'], frames['FBI'])
+    return integrator.build_incident_table([police, adl, fbi]).drop(columns=['benchmark_cluster'])
+
+def assert_incremental_matches_full(integrator, before, after):
+    """Deduplicate ``after`` against the state saved for ``before`` and from scratch"""
+    deduplicated, state = integrator.advanced_deduplication(before)
+    integrator.save_dedup_state(state)
+
+    incremental, incremental_state = integrator.advanced_deduplication(after, integrator.load_dedup_state())
+    full, full_state = MultiSourceIntegrator().advanced_deduplication(after)
+
+    pd.testing.assert_frame_equal(incremental, full)
+    pd.testing.assert_frame_equal(incremental_state, full_state)
+
+def clustered(state):
+    """Positions of records that share their cluster with another record"""
+    return np.flatnonzero(state['cluster'].duplicated(keep=False).to_numpy())
+
+def test_incremental_dedup_with_new_records(integrator, benchmark_table):
+    before = benchmark_table.sample(frac=0.8, random_state=0).sort_index().reset_index(drop=True)
+
+    assert_incremental_matches_full(integrator, before, benchmark_table)
+
+def test_incremental_dedup_with_changed_records(integrator, benchmark_table):
+    after = benchmark_table.copy()
+    changed = np.random.RandomState(0).choice(len(after), size=40, replace=False)
+    after.loc[changed, 'description'] = after.loc[changed, 'description'].fillna('') + ' Revised.'
+    after.loc[changed[:10], 'city'] = 'Brooklyn'
+
+    assert_incremental_matches_full(integrator, benchmark_table, after)
+
+def test_incremental_dedup_with_vanished_records(integrator, benchmark_table):
+    deduplicated, state = MultiSourceIntegrator().advanced_deduplication(benchmark_table)
+    # advanced_deduplication keeps benchmark_table's order, so state rows line up with it
+    vanished = clustered(state)[::3]
+    after = benchmark_table.drop(index=vanished).reset_index(drop=True)
+
+    assert_incremental_matches_full(integrator, benchmark_table, after)
+
+def test_incremental_dedup_reopens_a_cluster_for_a_new_member(integrator, benchmark_table):
+    deduplicated, state = MultiSourceIntegrator().advanced_deduplication(benchmark_table)
+    sizes = state['cluster'].map(state['cluster'].value_counts())
+    # Clusters of three or more lose one member in the first run and get it back in the second
+    joining = np.flatnonzero((sizes >= 3).to_numpy() & ~state['survivor'].to_numpy())
+    assert len(joining) > 0
+    before = benchmark_table.drop(index=joining).reset_index(drop=True)
+
+    assert_incremental_matches_full(integrator, before, benchmark_table)
+
+def test_incremental_dedup_rescores_a_fuzzy_cluster_a_new_record_matches(integrator):
+    # 1-3 and 3-5 match, 1-5 is outside the match window; 3 and 5 were clustered before 1 arrived
+    after = incident_table(integrator, chain_of_reports([1, 3, 5], [''] * 3))
+    before = after.iloc[[1, 2]].reset_index(drop=True)
+
+    assert_incremental_matches_full(integrator, before, after)
+
+def test_parallel_deduplication_matches_serial(integrator, benchmark_table):
+    serial, serial_state = integrator.advanced_deduplication(benchmark_table)
+    serial_ledger = integrator.match_ledger
+
+    parallel_integrator = MultiSourceIntegrator()
+    parallel_integrator.dedup_workers = 2
+    parallel, parallel_state = parallel_integrator.advanced_deduplication(benchmark_table)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    pd.testing.assert_frame_equal(parallel_state, serial_state)
+    pd.testing.assert_frame_equal(parallel_integrator.match_ledger, serial_ledger)
+    assert len(serial_ledger) > 0
+
+def test_source_pair_policy_keeps_nypd_and_lapd_apart(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 1, '2023-01-01', '2023-01-31').assign(state=None)
+    lapd = nypd.assign(source='LAPD', incident_id='2301')
+    table = incident_table(integrator, pd.concat([nypd, lapd], ignore_index=True))
+
+    # Without a state the NYPD record would be blocked with the LAPD one
+    pos_a, pos_b = integrator.build_candidate_pairs(table)
+    assert len(pos_a) == 0
+    assert integrator.policy_skipped_pairs == {'LAPD|NYPD': 1}
+
+    deduplicated, state = integrator.advanced_deduplication(table)
+    assert len(deduplicated) == 2
+    assert integrator.dedup_pair_counts == {}
+
+def test_sources_outside_the_policy_are_compared(integrator):
+    nypd = generate_nypd(np.random.RandomState(0), 1, '2023-01-01', '2023-01-31').assign(state=None)
+    other = nypd.assign(source='OTHER', incident_id='2301')
+    table = incident_table(integrator, pd.concat([nypd, other], ignore_index=True))
+
+    pos_a, pos_b = integrator.build_candidate_pairs(table)
+    assert len(pos_a) == 1
+    assert integrator.policy_skipped_pairs == {}
+
+def test_missing_bias_is_unknown_and_whitespace_stays_blank(integrator):
+    biases = pd.Series(['Anti-Jewish', None, '', '   ', 'Anti-Disability'])
+
+    assert integrator.clean_bias_column(biases).tolist() == ['ANTI-JEWISH', 'UNKNOWN', 'UNKNOWN', '',
+                                                              'ANTI-DISABILITY']
+    assert [integrator.clean_bias_motivation(bias) for bias in biases] == \
+        integrator.clean_bias_column(biases).tolist()
+
+def test_date_parse_log_shows_each_call_and_the_report_keeps_the_total(integrator, caplog):
+    caplog.set_level('INFO', logger='multi_source_integrator')
+    integrator.parse_days(pd.DataFrame({'source': ['ADL'] * 2, 'date': ['01/05/2023', 'not a date']}))
+    integrator.parse_days(pd.DataFrame({'source': ['ADL'] * 3, 'date': ['01/06/2023'] * 3}))
+
+    logged = [r.getMessage() for r in caplog.records if r.getMessage().startswith('Parsed ADL dates')]
+    assert logged == ['Parsed ADL dates (%m/%d/%Y: 1, failed: 1)', 'Parsed ADL dates (%m/%d/%Y: 3, failed: 0)']
+    report = integrator.date_parse_report['ADL']
+    assert (report['rows'], report['failed'], report['formats']) == (5, 1, {'%m/%d/%Y': 4})
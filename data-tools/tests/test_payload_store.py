@@ -0,0 +1,22 @@
+from payload_store import PayloadStore, encode_payload
+
+def test_payloads_round_trip_and_persist(tmp_path):
+    path = tmp_path / "payloads.sqlite"
+    with PayloadStore(path) as store:
+        assert store.put_many([('ADL_00001', {'id': 'ADL_00001', 'city': 'Kraków'}), ('b2', {'n': 2})]) == 2
+        store.put_encoded([('c3', encode_payload({'n': 3}))])
+
+    with PayloadStore(path) as store:
+        assert len(store) == 3
+        assert store.get('ADL_00001') == {'id': 'ADL_00001', 'city': 'Kraków'}
+        assert 'c3' in store and 'missing' not in store
+        assert store.get('missing') is None
+        assert [key for key, record in store.items()] == ['ADL_00001', 'b2', 'c3']
+
+def test_storing_a_key_again_replaces_its_payload(tmp_path):
+    with PayloadStore(tmp_path / "payloads.sqlite") as store:
+        store.put_many([('a1', {'revision': 1})])
+        store.put_many([('a1', {'revision': 2})])
+
+        assert len(store) == 1
+        assert store.get('a1') == {'revision': 2}
@@ -0,0 +1,80 @@
+import json
+import sys
+
+import pytest
+
+from pipeline import STAGES, PipelineRunner, critical_path, stage_dependencies
+
+def test_dependencies_follow_outputs_into_inputs():
+    dependencies = stage_dependencies(STAGES)
+
+    assert dependencies['process_adl'] == ['collect_adl']
+    assert sorted(dependencies['integrate']) == ['download_fbi', 'process_adl']
+    assert dependencies['enhance_geographic'] == ['integrate']
+    assert dependencies['download_nypd'] == []
+
+def test_critical_path_is_the_longest_chain():
+    timings = {'a': {'duration': 5.0}, 'b': {'duration': 1.0}, 'c': {'duration': 2.0}, 'd': {'duration': 6.0}}
+    dependencies = {'a': [], 'b': [], 'c': ['a', 'b'], 'd': []}
+
+    assert critical_path(timings, dependencies) == ['a', 'c']
+
+def stage(name, inputs=(), seconds=0.0, fail=False, **options):
+    code = f"import time; time.sleep({seconds}); open('{name}.out', 'w').close(); raise SystemExit({int(fail)})"
+    return dict({'name': name, 'command': [sys.executable, '-c', code], 'inputs': list(inputs),
+                 'outputs': [f'{name}.out']}, **options)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Stage logs go to data/logs relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def test_independent_stages_overlap_and_dependents_wait(workdir):
+    runner = PipelineRunner([stage('a', seconds=0.5), stage('b', seconds=0.5), stage('c', inputs=['a.out', 'b.out'])],
+                            max_parallel=2, use_cache=False)
+
+    report = runner.run()
+
+    stages = report['stages']
+    assert all(s['status'] == 'success' for s in stages.values())
+    assert stages['b']['start'] < stages['a']['end'] and stages['a']['start'] < stages['b']['end']
+    assert stages['c']['start'] >= max(stages['a']['end'], stages['b']['end'])
+    assert report['critical_path'][-1] == 'c'
+
+def test_failures_skip_stages_that_need_fresh_inputs(workdir):
+    runner = PipelineRunner([stage('collect', fail=True), stage('process', inputs=['collect.out'], needs_fresh=True),
+                             stage('report', inputs=['collect.out'])], use_cache=False)
+
+    stages = runner.run()['stages']
+
+    assert stages['collect']['status'] == 'failed'
+    assert stages['process']['status'] == 'skipped'
+    assert stages['report']['status'] == 'success'
+
+def test_a_failed_required_stage_stops_the_run(workdir):
+    runner = PipelineRunner([stage('integrate', fail=True, required=True),
+                             stage('enhance', inputs=['integrate.out'])], use_cache=False)
+
+    assert set(runner.run()['stages']) == {'integrate'}
+
+def test_cyclic_stages_are_rejected(workdir):
+    runner = PipelineRunner([stage('a', inputs=['b.out']), stage('b', inputs=['a.out'])], use_cache=False)
+
+    with pytest.raises(ValueError):
+        runner.run()
+
+def test_cached_stage_is_restored_and_its_report_restamped(workdir):
+    (workdir / "input.csv").write_text("a\n1\n")
+    code = "import json, datetime; json.dump({'generated': datetime.datetime.now().isoformat()}, open('report.json', 'w'))"
+    integrate = {'name': 'integrate', 'command': [sys.executable, '-c', code], 'inputs': ['input.csv'],
+                 'outputs': ['report.json'], 'run_report': ('report.json', 'generated'), 'cached': True}
+
+    PipelineRunner([integrate]).run()
+    computed = json.loads((workdir / "report.json").read_text())['generated']
+    second = PipelineRunner([integrate]).run()
+
+    report = json.loads((workdir / "report.json").read_text())
+    assert second['stages']['integrate']['cache_hit']
+    assert report['cache']['computed_at'] == computed
+    assert report['generated'] != computed
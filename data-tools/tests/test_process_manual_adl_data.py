@@ -0,0 +1,141 @@
+import json
+
+import pandas as pd
+import pytest
+
+from incident_store import read_incidents, write_incidents
+from known_ids import KnownIdFilter
+from process_manual_adl_data import ManualADLProcessor
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    # The processor keeps its files under data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return ManualADLProcessor()
+
+def incident(incident_id=None, date='01/05/2023', description='Swastika drawn on a school wall'):
+    record = {'date': date, 'state': 'NY', 'city': 'Brooklyn', 'description': description}
+    if incident_id:
+        record['id'] = incident_id
+    return record
+
+def test_migration_keeps_real_ids_shaped_like_stream_positions(processor):
+    stored = processor.unify_rows([incident('ADL_00001'), incident(description='Flyers left on cars')])
+    stored['incident_id'] = ['ADL_00001', 'ADL_1']
+    stored['raw_data'] = [json.dumps(incident('ADL_00001')), json.dumps(incident(description='Flyers left on cars'))]
+
+    migrated = processor.migrate_stored_rows(stored.drop(columns=['raw_ref']))
+
+    # Only the row whose raw record has no ID of its own was keyed by position
+    assert migrated['incident_id'].tolist() == ['ADL_00001']
+    assert processor.payload_store.get('ADL_00001')['id'] == 'ADL_00001'
+
+def test_stored_incidents_with_real_ids_survive_a_new_batch(processor):
+    stored = processor.convert_to_unified_schema([incident('ADL_00001'), incident('ADL_00002', date='01/06/2023')])
+    write_incidents(stored, processor.data_dir / "adl_unified")
+
+    combined = processor.convert_to_unified_schema([incident('ADL_00003', date='01/07/2023')])
+
+    assert sorted(combined['incident_id']) == ['ADL_00001', 'ADL_00002', 'ADL_00003']
+
+def save_pages(processor, pages):
+    for number, incidents in enumerate(pages):
+        with open(processor.data_dir / f"adl_page_{number}.json", 'w', encoding='utf-8') as f:
+            json.dump({'incidents': incidents}, f)
+
+def mixed_pages():
+    """Pages with a repeated incident, ID-less records and records shaped unlike the rest"""
+    first = [incident(f'ADL_{i:05d}', date=f'01/{i % 28 + 1:02d}/2023') for i in range(40)]
+    second = [incident(description=f'Flyers left on cars on street {i}') for i in range(15)]
+    second += [{'id': 'ADL_00003', 'incident_date': '2023-02-01', 'location': 'Newark, NJ', 'category': 'Vandalism'},
+               {'id': 'ADL_00100', 'Date': 'March 4, 2023', 'State': 'new jersey', 'summary': 'Graffiti'}]
+    return [first, second]
+
+def test_stream_mode_matches_the_in_memory_conversion(tmp_path, monkeypatch):
+    results = {}
+    for mode in ['memory', 'stream']:
+        (tmp_path / mode).mkdir()
+        monkeypatch.chdir(tmp_path / mode)
+        processor = ManualADLProcessor()
+        save_pages(processor, mixed_pages())
+        write_incidents(processor.unify_rows([incident('ADL_00200', date='12/01/2022')]).reset_index(drop=True),
+                        processor.data_dir / "adl_unified")
+        if mode == 'memory':
+            incidents = processor.combine_json_files()
+            processor.convert_to_unified_schema(incidents, processor.analyze_data_structure(incidents)['common_fields'])
+        else:
+            processor.convert_streaming(processor.iter_incidents(), batch_size=16)
+        processor.payload_store.close()
+        results[mode] = read_incidents(processor.data_dir / "adl_unified")
+
+    # Stream mode keeps a repeated incident at its latest position, so rows are compared by ID
+    memory, stream = (df.sort_values('incident_id', ignore_index=True) for df in results.values())
+    assert len(memory) == 57
+    pd.testing.assert_frame_equal(stream, memory)
+
+def test_stream_mode_records_ids_of_batches_that_convert_to_nothing(processor):
+    assert processor.convert_streaming(iter([{'id': 'ADL_00001', 'note': 'no date, state or bias'}])) == \
+        {'incidents': 0}
+
+    assert 'ADL_00001' in KnownIdFilter(processor.data_dir / "known_ids.npz")
+
+def as_objects(df):
+    """Rows as plain Python values, so frames built in different ways compare by value"""
+    return df.astype(object).where(df.notna(), None)
+
+def test_field_plan_gives_the_same_rows_as_per_record_conversion(processor):
+    # One shape throughout, so every record goes through the plan; values pick different keys
+    def record(**values):
+        fields = {'id': None, 'date': None, 'incident_date': None, 'state': None, 'location': None,
+                  'category': None, 'description': None, 'latitude': None, 'lat': None}
+        return {**fields, **values}
+
+    records = [
+        record(id='A1', date='01/05/2023', state='NY', category='Antisemitism', description=' Swastika ',
+               latitude='40.7'),
+        record(id='A2', incident_date='2023-01-06', location='Newark, NJ', category='Vandalism', lat='40.73'),
+        record(id='A3', date='not a date', incident_date='01/07/2023', state='', location='Boca Raton, Florida',
+               category='Harassment'),
+        record(date='01/08/2023', state='new york', category='White Supremacist Propaganda', latitude='n/a'),
+        record(id='A5', date='01/09/2023', state='California', location='Oakland, CA', category=''),
+    ]
+    assert all(set(r) == set(records[0]) for r in records)
+
+    planned = processor.unify_rows(records)
+    per_record = pd.DataFrame([processor.unify_incident(r) for r in records], columns=planned.columns)
+
+    assert planned.index.tolist() == [0, 1, 2, 3, 4]
+    pd.testing.assert_frame_equal(as_objects(planned), as_objects(per_record))
+    assert planned['state'].tolist() == ['NY', 'NJ', 'FL', 'NY', 'CA']
+    assert planned['date'].tolist() == ['01/05/2023', '01/06/2023', '01/07/2023', '01/08/2023', '01/09/2023']
+
+def test_records_unlike_the_sample_convert_as_they_would_alone(processor):
+    records = [incident(f'ADL_{i:05d}') for i in range(5)]
+    records += [{'id': 'B1', 'incident_date': '2023-02-01', 'location': 'Newark, NJ', 'category': 'Vandalism'},
+                {'id': 'B2', 'Date': 'March 4, 2023', 'State': 'new jersey', 'summary': 'Graffiti', 'lat': 40.7}]
+
+    converted = processor.unify_rows(records)
+    per_record = pd.DataFrame([processor.unify_incident(r) for r in records], columns=converted.columns)
+
+    pd.testing.assert_frame_equal(as_objects(converted), as_objects(per_record))
+
+def test_parallel_conversion_matches_serial(tmp_path, monkeypatch):
+    records = [r for page in mixed_pages() for r in page] * 4
+    records += [incident(f'ADL_{i:05d}', date=f'02/{i % 28 + 1:02d}/2023', description=f'Incident {i}')
+                for i in range(200, 500)]
+
+    results = {}
+    for workers in [1, 3]:
+        (tmp_path / str(workers)).mkdir()
+        monkeypatch.chdir(tmp_path / str(workers))
+        processor = ManualADLProcessor()
+        df = processor.convert_to_unified_schema(records, workers=workers)
+        payloads = {incident_id: processor.payload_store.get(incident_id) for incident_id in df['incident_id']}
+        processor.payload_store.close()
+        results[workers] = df, read_incidents(processor.data_dir / "adl_unified"), payloads
+
+    (serial, serial_stored, serial_payloads), (parallel, parallel_stored, parallel_payloads) = results.values()
+    assert len(serial) == len(records)
+    pd.testing.assert_frame_equal(as_objects(parallel), as_objects(serial))
+    pd.testing.assert_frame_equal(parallel_stored, serial_stored)
+    assert parallel_payloads == serial_payloads
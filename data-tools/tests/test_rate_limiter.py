@@ -0,0 +1,27 @@
+import threading
+import time
+
+from rate_limiter import TokenBucket
+
+def test_requests_are_spaced_at_the_bucket_rate():
+    bucket = TokenBucket(rate=50)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # The first token is in the bucket; the other five take a fiftieth of a second each
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+def test_threads_share_one_bucket():
+    bucket = TokenBucket(rate=50, capacity=2)
+    taken = []
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: taken.append(bucket.acquire() or time.monotonic()))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(taken) == 8
+    assert max(taken) - started >= 6 / 50 * 0.9
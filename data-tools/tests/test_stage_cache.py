@@ -0,0 +1,65 @@
+import pytest
+
+from stage_cache import StageCache
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "input.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "stage.py").write_text("# version 1\n")
+    return tmp_path
+
+def stage(workdir, runs):
+    def func():
+        runs.append(1)
+        (workdir / "output.csv").write_text(f"run {len(runs)}\n")
+    return func
+
+def test_unchanged_stage_is_restored_from_the_cache(workdir):
+    cache, runs = StageCache("cache"), []
+    args = ("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"], {'full': False}, ["stage.py"])
+
+    assert not cache.run(*args)
+    (workdir / "output.csv").unlink()
+    assert StageCache("cache").run(*args)
+
+    assert len(runs) == 1
+    assert (workdir / "output.csv").read_text() == "run 1\n"
+    assert StageCache("cache").report()['stages']['integrate'] == {'hits': 1, 'misses': 1}
+
+@pytest.mark.parametrize('change', ['input', 'code', 'params'])
+def test_changed_inputs_code_or_params_rerun_the_stage(workdir, change):
+    cache, runs = StageCache("cache"), []
+    cache.run("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"], {'full': False}, ["stage.py"])
+    if change == 'input':
+        (workdir / "input.csv").write_text("a,b\n1,3\n")
+    elif change == 'code':
+        (workdir / "stage.py").write_text("# version 2\n")
+
+    params = {'full': change == 'params'}
+    assert not cache.run("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"], params, ["stage.py"])
+    assert len(runs) == 2
+
+def test_failed_stage_is_not_cached(workdir):
+    cache = StageCache("cache")
+
+    def fail():
+        raise RuntimeError('stage failed')
+
+    with pytest.raises(RuntimeError):
+        cache.run("integrate", fail, ["input.csv"], ["output.csv"])
+    assert cache.report()['entries'] == 0
+
+def test_least_recently_used_entries_are_evicted(workdir):
+    cache, runs = StageCache("cache", max_bytes=20), []
+    for version in range(3):
+        (workdir / "input.csv").write_text(f"version {version}\n")
+        cache.run("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"])
+
+    # Each entry holds a 6-byte output, so only the three newest fit
+    (workdir / "input.csv").write_text("version 3\n")
+    cache.run("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"])
+
+    assert cache.report()['entries'] == 3
+    (workdir / "input.csv").write_text("version 0\n")
+    assert not cache.run("integrate", stage(workdir, runs), ["input.csv"], ["output.csv"])
@@ -59,64 +59,20 @@ if [ "$1" = "--full" ]; then
     info_log "Running full update with complete data refresh"
 fi
 
-# 1. Update NYPD Data
-info_log "Step 1: Updating NYPD data..."
-if python data-tools/download_nypd_data.py; then
-    success_log "NYPD data updated successfully"
-else
-    error_log "NYPD data update failed, continuing with existing data"
-fi
-
-# 2. Update LAPD Data
-info_log "Step 2: Updating LAPD data..."
-if python data-tools/download_lapd_data.py; then
-    success_log "LAPD data updated successfully"
-else
-    error_log "LAPD data update failed, continuing with existing data"
-fi
-
-# 3. Update FBI Data (Official Federal Data)
-info_log "Step 3: Updating FBI data..."
-if python data-tools/download_fbi_data.py; then
-    success_log "FBI data updated successfully"
-else
-    error_log "FBI data update failed, continuing with existing data"
-fi
-
-# 4. Check for ADL data updates
-info_log "Step 4: Checking ADL data updates..."
-if [ -f "data-tools/collect_adl_data.py" ]; then
-    info_log "ADL collector found, attempting automatic update..."
-    if python data-tools/collect_adl_data.py --auto-cookies; then
-        success_log "ADL data updated successfully"
-        # Process the collected ADL data
-        python data-tools/process_manual_adl_data.py
-    else
-        warning_log "ADL automatic update failed - using existing data"
-        info_log "To update ADL data manually:"
-        info_log "1. Extract fresh cookies from browser"
-        info_log "2. Run: python data-tools/collect_adl_data.py --cookies 'YOUR_COOKIES'"
-        info_log "3. Then run: python data-tools/process_manual_adl_data.py"
-    fi
-else
-    info_log "Using existing ADL data"
-fi
-
-# 5. Integrate all data sources
-info_log "Step 11: Integrating all data sources..."
-if python data-tools/multi_source_integrator.py; then
-    success_log "Data integration completed successfully"
-else
-    error_log "Data integration failed"
-    exit 1
+# 1-5. Collect, integrate and enhance data
+# The pipeline runner starts the NYPD, LAPD, FBI, ADL and Google Trends
+# collectors in parallel; ADL processing, integration and geographic
+# enhancement start as soon as their inputs are ready. Unchanged stages are
+# restored from the stage cache. Timings land in data/pipeline_report.json.
+info_log "Step 1: Running data pipeline..."
+PIPELINE_ARGS=""
+if [ "$FULL_UPDATE" = true ]; then
+    PIPELINE_ARGS="--full"  # Rebuild dedup clusters from scratch
 fi
-
-# 5. Enhance geographic data
-info_log "Step 11: Enhancing geographic data..."
-if python data-tools/enhance_geographic_data.py; then
-    success_log "Geographic enhancement completed"
+if python data-tools/pipeline.py $PIPELINE_ARGS; then
+    success_log "Data pipeline completed successfully"
 else
-    error_log "Geographic enhancement failed"
+    error_log "Data pipeline failed (stage logs are in data/logs/)"
     exit 1
 fi
 
@@ -130,14 +86,6 @@ if [ "$FULL_UPDATE" = true ]; then
     fi
 fi
 
-# 6. Collect Google Trends data
-info_log "Step 11: Collecting Google Trends data..."
-if python data-tools/final_trends_collector.py; then
-    success_log "Google Trends data collected successfully"
-else
-    warning_log "Google Trends data collection failed"
-fi
-
 # 7. Update website data
 info_log "Step 11: Updating website data files..."
 # Copy enhanced data to website
@@ -151,6 +99,18 @@ fi
 
 success_log "Website data files updated"
 
+# State summary for the website (skipped when the website data is unchanged)
+CACHED_STAGE="python data-tools/stage_cache.py run"
+if $CACHED_STAGE state_summary \
+    --input website-source/public/data/unified_hate_crimes_corrected.csv \
+    --output website-source/public/data/state_analysis.json \
+    -- python data-tools/generate_state_summary.py; then
+    success_log "State summary generated"
+else
+    warning_log "State summary generation failed"
+fi
+python data-tools/stage_cache.py stats
+
 # 8. Rebuild website
 if [ "$CI" = "true" ]; then
     info_log "Step 11: Skipping website build in CI"